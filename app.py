@@ -1,9 +1,25 @@
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
+from flask import Flask, Response, g, render_template, request, jsonify, flash, redirect, url_for, stream_with_context
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from config import Config
 from binance_client import BinanceClient
+from market_stream import MarketStream
+from order_book import OrderBookManager
+from execution_engine import ExecutionEngine
+from exchange_info import ExchangeInfoCache
+from push_feed import PushHub
+from user_stream import UserDataStream
+from history_store import OrderHistoryStore
+from risk_engine import RiskEngine, RiskRejected
+from gateway import GatewayClient, is_gateway_process
+from execution_analytics import ExecutionAnalyticsStore
 from utils.logger import logger
+from utils.cache import TTLCache
+from utils.metrics import profiler, registry
+from utils.rate_limit import RateLimitExceeded
+from warmup import Warmup
 import os
 from dotenv import load_dotenv
 
@@ -16,17 +32,428 @@ app.config.from_object(Config)
 def inject_now():
     return {'now': datetime.utcnow()}
 
+# In gateway mode workers build no client or streams of their own and
+# forward service calls to the shared gateway process (python -m gateway)
+gateway = GatewayClient() if Config.GATEWAY_ENABLED and not is_gateway_process() else None
+
 # Initialize Binance client
 binance_client = None
-try:
-    binance_client = BinanceClient(
-        api_key=Config.API_KEY,
-        api_secret=Config.API_SECRET,
-        testnet=Config.TESTNET
-    )
-    logger.info("Binance client initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize Binance client: {str(e)}")
+if not gateway:
+    try:
+        binance_client = BinanceClient(
+            api_key=Config.API_KEY,
+            api_secret=Config.API_SECRET,
+            testnet=Config.TESTNET
+        )
+        logger.info("Binance client initialized successfully")
+    except Exception as e:
+        logger.error(f"Failed to initialize Binance client: {str(e)}")
+
+# Trading rules for local order validation; loaded during warm-up
+exchange_info = None
+if binance_client:
+    try:
+        exchange_info = ExchangeInfoCache(binance_client)
+        binance_client.exchange_info = exchange_info
+    except Exception as e:
+        logger.error(f"Failed to create exchange info cache: {str(e)}")
+
+# Start the live market data stream
+market_stream = None
+if Config.STREAM_ENABLED:
+    try:
+        market_stream = MarketStream(Config.SUPPORTED_SYMBOLS)
+        market_stream.start()
+        if binance_client:
+            binance_client.ticker_store = market_stream.store
+    except Exception as e:
+        logger.error(f"Failed to start market stream: {str(e)}")
+        market_stream = None
+
+# Maintain local order books for pre-trade liquidity checks
+order_books = None
+if Config.ORDER_BOOK_ENABLED and binance_client:
+    try:
+        order_books = OrderBookManager(binance_client, Config.SUPPORTED_SYMBOLS)
+        order_books.start()
+        binance_client.order_books = order_books
+    except Exception as e:
+        logger.error(f"Failed to start order books: {str(e)}")
+        order_books = None
+
+# Follow orders, fills, balances and positions from the user data stream
+user_stream = None
+if Config.USER_STREAM_ENABLED and binance_client:
+    try:
+        user_stream = UserDataStream(binance_client)
+        user_stream.start()
+    except Exception as e:
+        logger.error(f"Failed to start user data stream: {str(e)}")
+        user_stream = None
+
+# Keep the full order history in a local database
+history_store = None
+if Config.HISTORY_ENABLED and binance_client:
+    try:
+        history_store = OrderHistoryStore(binance_client)
+        history_store.start()
+        if user_stream:
+            # Order updates from the stream are written through as they happen
+            user_stream.listeners.append(lambda order: history_store.upsert_orders([order]))
+    except Exception as e:
+        logger.error(f"Failed to open order history store: {str(e)}")
+        history_store = None
+
+# Check every order against position, notional, price band, rate and margin
+# limits kept in memory; loaded during warm-up
+risk_engine = None
+if Config.RISK_ENABLED and binance_client:
+    risk_engine = RiskEngine(binance_client, user_stream)
+    binance_client.risk_engine = risk_engine
+    if user_stream:
+        user_stream.listeners.append(risk_engine.on_order_update)
+
+# Historical klines and trades, downloaded on demand and cached on disk;
+# created during warm-up so numpy is not imported on the startup path
+market_history = None
+
+# Run algorithmic orders in the background instead of on request threads
+execution_engine = None
+if binance_client:
+    execution_engine = ExecutionEngine(binance_client)
+    execution_engine.start()
+
+# Record execution quality of every finished algorithmic order
+execution_analytics = None
+if Config.ANALYTICS_ENABLED and execution_engine:
+    try:
+        execution_analytics = ExecutionAnalyticsStore(market_history)
+        execution_engine.listeners.append(execution_analytics.on_job_finished)
+    except Exception as e:
+        logger.error(f"Failed to open execution analytics store: {str(e)}")
+        execution_analytics = None
+
+
+def _open_connections():
+    """Open pooled keep-alive connections so early requests skip the TCP/TLS handshake"""
+    with ThreadPoolExecutor(max_workers=Config.WARMUP_CONNECTIONS) as pool:
+        list(pool.map(lambda _: binance_client.ping(), range(Config.WARMUP_CONNECTIONS)))
+
+
+def _sync_server_clock():
+    """Align signed request timestamps with the exchange clock, then keep them aligned"""
+    binance_client.server_clock.sync()
+    binance_client.server_clock.start()
+
+
+def _load_exchange_info():
+    exchange_info.load()
+    exchange_info.start()
+
+
+def _sync_risk_engine():
+    risk_engine.sync()
+    risk_engine.start()
+
+
+def _load_market_history():
+    global market_history
+    from market_history import MarketHistory
+    market_history = MarketHistory(binance_client)
+    if execution_analytics:
+        execution_analytics.market_history = market_history
+
+
+# Network-bound startup runs in the background: the app answers /healthz
+# at once and /readyz once the required steps have succeeded
+warmup = None
+if binance_client:
+    warmup = Warmup()
+    warmup.add_step('connections', _open_connections, required=False)
+    warmup.add_step('server_clock', _sync_server_clock)
+    if exchange_info:
+        warmup.add_step('exchange_info', _load_exchange_info)
+    if risk_engine:
+        warmup.add_step('risk_engine', _sync_risk_engine)
+    warmup.add_step('market_history', _load_market_history, required=False)
+    warmup.start()
+
+# Cache shared by all read-only routes; entries are keyed by (endpoint, args...)
+api_cache = TTLCache(max_entries=Config.CACHE_MAX_ENTRIES)
+
+
+def cached(endpoint, loader, *args):
+    """Serve an upstream call through the response cache using the endpoint's TTL"""
+    return api_cache.get_or_load((endpoint,) + args, loader, ttl=Config.CACHE_TTLS.get(endpoint, 0))
+
+
+def load_market_data(symbol=None):
+    """Get 24hr tickers from the live stream, falling back to cached REST data"""
+    symbols = [symbol] if symbol else Config.SUPPORTED_SYMBOLS
+    
+    if market_stream:
+        tickers = market_stream.store.get_many(symbols, max_age=Config.STREAM_MAX_AGE)
+        if tickers is not None:
+            return tickers
+    
+    return cached('market-data', lambda: binance_client.get_market_data(symbols), symbol)
+
+
+def user_store():
+    """Return the user data store while it is live and reconciled, else None"""
+    if user_stream and user_stream.is_ready():
+        return user_stream.store
+    return None
+
+
+def load_account():
+    """Get account information from the user data store, falling back to cached REST"""
+    store = user_store()
+    if store:
+        return store.get_account()
+    return cached('account', binance_client.get_account_info)
+
+
+def load_positions():
+    """Get positions from the user data store, falling back to cached REST"""
+    store = user_store()
+    if store:
+        return store.get_positions()
+    return cached('positions', binance_client.get_positions)
+
+
+def load_open_orders(symbol=None):
+    """Get open orders from the user data store, falling back to cached REST"""
+    store = user_store()
+    if store:
+        return store.get_open_orders(symbol)
+    return cached('open-orders', lambda: binance_client.get_open_orders(symbol=symbol), symbol)
+
+
+def load_orders(symbol=None, limit=50, offset=0, **filters):
+    """
+    Get orders newest first from the local history database when it is synced
+    
+    Filters (status, side, start_time, end_time) and offset need the history
+    database; without it recent orders come from the user data store or cached REST.
+    REST order history needs a symbol, so for all symbols only open orders
+    are returned until one of the stores is ready.
+    """
+    if history_store and history_store.is_ready():
+        return history_store.query_orders(symbol=symbol, limit=limit, offset=offset, **filters)
+    
+    store = user_store()
+    if store:
+        return store.get_orders(symbol, limit)
+    if symbol:
+        return cached('orders', lambda: binance_client.get_order_history(symbol=symbol, limit=limit), symbol, limit)
+    open_orders = sorted(load_open_orders(), key=lambda order: order.get('time', 0), reverse=True)
+    return open_orders[:limit]
+
+
+# Threads fetching the dashboard sections side by side
+dashboard_executor = ThreadPoolExecutor(max_workers=Config.DASHBOARD_MAX_WORKERS, thread_name_prefix='dashboard')
+
+
+def load_dashboard(sections=None):
+    """
+    Fetch dashboard sections concurrently from the local stores or response cache
+    
+    A failing section is reported under 'errors' instead of failing the whole
+    snapshot, so one slow or rejected upstream call costs the others nothing.
+    """
+    loaders = {
+        'account': load_account,
+        'positions': lambda: [
+            position for position in load_positions()
+            if float(position.get('positionAmt', 0)) != 0
+        ],
+        'open_orders': load_open_orders,
+        'tickers': load_market_data,
+    }
+    # Recent orders of every symbol need a synced store; open_orders covers them until then
+    if (history_store and history_store.is_ready()) or user_store():
+        loaders['orders'] = lambda: load_orders(limit=Config.DASHBOARD_ORDER_LIMIT)
+    if sections:
+        loaders = {name: loader for name, loader in loaders.items() if name in sections}
+    
+    futures = {name: dashboard_executor.submit(loader) for name, loader in loaders.items()}
+    snapshot = {}
+    errors = {}
+    for name, future in futures.items():
+        try:
+            snapshot[name] = future.result()
+        except Exception as e:
+            logger.error(f"Error fetching dashboard {name}: {str(e)}")
+            errors[name] = str(e)
+    
+    snapshot['errors'] = errors
+    return snapshot
+
+
+def load_push_state():
+    """Index the dashboard sections browsers follow live by key, for delta computation"""
+    snapshot = load_dashboard(['account', 'open_orders', 'tickers'])
+    state = {}
+    if 'tickers' in snapshot:
+        state['tickers'] = {
+            ticker['symbol']: {
+                'lastPrice': ticker.get('lastPrice'),
+                'priceChangePercent': ticker.get('priceChangePercent'),
+                'volume': ticker.get('volume'),
+            }
+            for ticker in snapshot['tickers']
+        }
+    if 'account' in snapshot:
+        state['balances'] = {
+            asset['asset']: {
+                'walletBalance': asset.get('walletBalance'),
+                'unrealizedProfit': asset.get('unrealizedProfit'),
+                'availableBalance': asset.get('availableBalance'),
+            }
+            for asset in snapshot['account'].get('assets', [])
+        }
+    if 'open_orders' in snapshot:
+        state['orders'] = {str(order['orderId']): order for order in snapshot['open_orders']}
+    return state
+
+
+def load_order_book(symbol, depth=10):
+    """Top levels of the local order book of a symbol, or None without a synced book"""
+    book = order_books.get_book(symbol) if order_books else None
+    return book.depth(depth) if book is not None else None
+
+
+def load_klines(symbol, interval, start_time, end_time, window=20):
+    """Historical klines as columns for charts, with rolling VWAP and volatility"""
+    from market_history import rolling_volatility, rolling_vwap
+    if not market_history:
+        raise ValueError('Market history is not available')
+    klines = market_history.get_klines(symbol, interval, start_time, end_time)
+    volatility = rolling_volatility(klines['close'], window)
+    return {
+        'symbol': symbol,
+        'interval': interval,
+        'time': klines['open_time'].tolist(),
+        'open': klines['open'].tolist(),
+        'high': klines['high'].tolist(),
+        'low': klines['low'].tolist(),
+        'close': klines['close'].tolist(),
+        'volume': klines['volume'].tolist(),
+        'vwap': [None if v != v else v for v in rolling_vwap(klines, window).tolist()],
+        # Aligned to the time column; the first `window` klines have no full window yet
+        'volatility': [None] * (len(klines) - len(volatility)) + volatility.tolist(),
+    }
+
+
+def _bind_gateway():
+    """Replace the services and loaders with the gateway's proxies; raises while the gateway is unreachable"""
+    global binance_client, api_cache, user_stream, history_store, execution_engine, execution_analytics
+    global warmup, risk_engine, load_market_data, load_account, load_positions, load_open_orders
+    global load_orders, load_dashboard, load_push_state, load_order_book, load_klines
+    remote = gateway.connect()
+    binance_client = remote.get('binance_client')
+    api_cache = remote.get('api_cache', api_cache)
+    user_stream = remote.get('user_stream')
+    history_store = remote.get('history_store')
+    execution_engine = remote.get('execution_engine')
+    execution_analytics = remote.get('execution_analytics')
+    warmup = remote.get('warmup')
+    risk_engine = remote.get('risk_engine')
+    load_market_data = remote.get('load_market_data', load_market_data)
+    load_account = remote.get('load_account', load_account)
+    load_positions = remote.get('load_positions', load_positions)
+    load_open_orders = remote.get('load_open_orders', load_open_orders)
+    load_orders = remote.get('load_orders', load_orders)
+    load_dashboard = remote.get('load_dashboard', load_dashboard)
+    load_push_state = remote.get('load_push_state', load_push_state)
+    load_order_book = remote.get('load_order_book', load_order_book)
+    load_klines = remote.get('load_klines', load_klines)
+
+
+# The gateway may come up after the workers: connect in the background,
+# retrying until it answers; /readyz reports not ready until then
+gateway_warmup = None
+if gateway:
+    gateway_warmup = Warmup()
+    gateway_warmup.add_step('gateway', _bind_gateway)
+    gateway_warmup.start()
+
+# One shared feed pushed to every connected browser; in gateway mode each
+# worker polls the gateway's cached state instead of the exchange
+push_hub = None
+if binance_client or gateway:
+    # Looked up per poll, since binding the gateway replaces load_push_state
+    push_hub = PushHub(lambda: load_push_state())
+    push_hub.start()
+
+# Request metrics; gauges read existing stats only when /metrics is scraped
+ROUTE_LATENCY = registry.histogram('http_request_duration_seconds', 'Flask route latency', ('method', 'route'))
+ROUTE_RESPONSES = registry.counter('http_responses_total', 'Flask responses by status', ('method', 'route', 'status'))
+
+
+def _cache_metrics():
+    namespaces = api_cache.get_stats()['namespaces']
+    return {(namespace,): stats['hit_rate'] for namespace, stats in namespaces.items()}
+
+
+def _rate_limit_metrics():
+    if not binance_client:
+        return {}
+    stats = binance_client.get_rate_limit_stats()
+    values = {('weight', label): bucket['available'] for label, bucket in stats['weight'].items()}
+    values.update({('orders', label): bucket['available'] for label, bucket in stats['orders'].items()})
+    return values
+
+
+def _algo_job_metrics(field):
+    if not execution_engine:
+        return {}
+    return {
+        (job['job_id'], job['symbol'], job['side']): job[field]
+        for job in execution_engine.list_jobs() if job['status'] in ('RUNNING', 'PAUSED')
+    }
+
+
+def _risk_metrics():
+    if not risk_engine:
+        return {}
+    stats = risk_engine.get_stats()
+    balance = stats['margin_balance']
+    return {(): stats['margin_used'] / balance if balance else None}
+
+
+registry.gauge('api_cache_hit_ratio', 'Response cache hit ratio per endpoint', ('endpoint',), _cache_metrics)
+registry.gauge('binance_rate_limit_available', 'Unused rate limit budget per window',
+               ('kind', 'window'), _rate_limit_metrics)
+registry.gauge('algo_job_progress', 'Sent fraction of running algorithmic orders',
+               ('job_id', 'symbol', 'side'), lambda: _algo_job_metrics('progress'))
+registry.gauge('algo_job_filled_quantity', 'Filled quantity of running algorithmic orders',
+               ('job_id', 'symbol', 'side'), lambda: _algo_job_metrics('filled_quantity'))
+registry.gauge('risk_margin_usage_ratio', 'Margin used by positions and open orders over the margin balance',
+               callback=_risk_metrics)
+
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    # A push stream would hold the profiler for its whole lifetime
+    g.profile = profiler.start() if request.endpoint != 'stream' else None
+
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    ROUTE_LATENCY.observe(time.perf_counter() - g.request_started, request.method, route)
+    ROUTE_RESPONSES.inc(request.method, route, response.status_code)
+    return response
+
+
+@app.teardown_request
+def stop_request_profile(exc):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profiler.stop(profile)
 
 
 @app.route('/')
@@ -38,12 +465,12 @@ def index():
         market_data = []
         
         if binance_client:
-            try:
-                account_info = binance_client.get_account_info()
-                market_data = binance_client.get_market_data()
-            except Exception as e:
-                logger.error(f"Error fetching data: {str(e)}")
-                flash(f"Error fetching data: {str(e)}", "error")
+            # Account and tickers are fetched side by side
+            snapshot = load_dashboard(['account', 'tickers'])
+            account_info = snapshot.get('account', {})
+            market_data = snapshot.get('tickers', [])
+            for error in snapshot['errors'].values():
+                flash(f"Error fetching data: {error}", "error")
         
         # Format market data for display
         formatted_market_data = []
@@ -90,19 +517,144 @@ def get_market_data():
         
         if symbol:
             # Get 24hr data for a specific symbol (fix: use get_market_data)
-            data = binance_client.get_market_data([symbol])
+            data = load_market_data(symbol)
             # Return single object for consistency with frontend expectations
             return jsonify(data[0] if data else {})
         else:
             # Get data for all supported symbols
-            data = binance_client.get_market_data()
+            data = load_market_data()
             return jsonify(data)
     
+    except RateLimitExceeded as e:
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
         logger.error(f"Error getting market data: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/dashboard')
+def get_dashboard():
+    """API endpoint to get account, positions, orders and tickers in one snapshot"""
+    try:
+        if not binance_client:
+            return jsonify({'error': 'Binance client not initialized'}), 500
+        
+        snapshot = load_dashboard()
+        
+        # Compact body with an ETag so unchanged polls are answered with 304
+        body = json.dumps(snapshot, separators=(',', ':'), sort_keys=True)
+        response = app.response_class(body, mimetype='application/json')
+        response.add_etag()
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+    
+    except Exception as e:
+        logger.error(f"Error getting dashboard: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/stream')
+def stream():
+    """Server-Sent Events stream: a snapshot, then ticker/balance/order deltas"""
+    if not push_hub:
+        return jsonify({'error': 'Binance client not initialized'}), 500
+    
+    client = push_hub.subscribe()
+    response = Response(stream_with_context(push_hub.stream(client)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # keep reverse proxies from buffering events
+    return response
+
+
+@app.route('/api/fills')
+def get_fills():
+    """API endpoint to get recent fills received on the user data stream"""
+    if not user_stream:
+        return jsonify({'error': 'User data stream not running'}), 503
+    
+    symbol = request.args.get('symbol')
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify(user_stream.store.get_fills(symbol, limit))
+
+
+@app.route('/api/klines')
+def get_klines():
+    """API endpoint to get historical klines with VWAP and volatility columns for charts"""
+    try:
+        if not binance_client:
+            return jsonify({'error': 'Binance client not initialized'}), 500
+        
+        from market_history import DAY_MS, interval_ms
+        symbol = request.args.get('symbol')
+        if not symbol:
+            return jsonify({'error': 'symbol is required'}), 400
+        interval = request.args.get('interval', '1m')
+        end_time = request.args.get('end_time', int(datetime.utcnow().timestamp() * 1000), type=int)
+        start_time = request.args.get('start_time', end_time - DAY_MS, type=int)
+        window = request.args.get('window', 20, type=int)
+        interval_ms(interval)  # rejects unknown intervals with ValueError/KeyError
+        if end_time - start_time > Config.MARKET_HISTORY_MAX_RANGE * DAY_MS:
+            raise ValueError(f"Range is longer than {Config.MARKET_HISTORY_MAX_RANGE} days")
+        
+        return jsonify(load_klines(symbol, interval, start_time, end_time, window))
+    
+    except (ValueError, KeyError) as e:
+        return jsonify({'error': f"Invalid request: {str(e)}"}), 400
+    except RateLimitExceeded as e:
+        return jsonify({'error': str(e)}), 429
+    except Exception as e:
+        logger.error(f"Error getting klines: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/history-stats')
+def get_history_stats():
+    """API endpoint to get stored order counts and sync cursors of the history database"""
+    if not history_store:
+        return jsonify({'error': 'Order history store not running'}), 503
+    
+    return jsonify(history_store.get_stats())
+
+
+@app.route('/api/user-stream-stats')
+def get_user_stream_stats():
+    """API endpoint to get user data stream connection and reconciliation state"""
+    if not user_stream:
+        return jsonify({'error': 'User data stream not running'}), 503
+    
+    return jsonify(user_stream.get_stats())
+
+
+@app.route('/api/stream-stats')
+def get_stream_stats():
+    """API endpoint to get push channel client and delta counters"""
+    if not push_hub:
+        return jsonify({'error': 'Binance client not initialized'}), 500
+    
+    return jsonify(push_hub.get_stats())
+
+
+@app.route('/api/order-book')
+def get_order_book():
+    """API endpoint to get top-of-book levels from the local order book"""
+    try:
+        symbol = request.args.get('symbol')
+        depth = request.args.get('depth', 10, type=int)
+        
+        if not symbol:
+            return jsonify({'error': 'Missing required parameters'}), 400
+        
+        levels = load_order_book(symbol, depth)
+        if levels is None:
+            return jsonify({'error': f'Order book for {symbol} is not available'}), 503
+        
+        return jsonify(levels)
+    
+    except Exception as e:
+        logger.error(f"Error getting order book: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/account')
 def get_account():
     """API endpoint to get account information"""
@@ -110,14 +662,110 @@ def get_account():
         if not binance_client:
             return jsonify({'error': 'Binance client not initialized'}), 500
         
-        account_info = binance_client.get_account_info()
+        account_info = load_account()
         return jsonify(account_info)
     
+    except RateLimitExceeded as e:
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
         logger.error(f"Error getting account info: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/transport-stats')
+def get_transport_stats():
+    """API endpoint to get HTTP connection reuse and latency breakdown"""
+    try:
+        if not binance_client:
+            return jsonify({'error': 'Binance client not initialized'}), 500
+        
+        return jsonify(binance_client.get_transport_stats())
+    
+    except Exception as e:
+        logger.error(f"Error getting transport stats: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/risk')
+def get_risk():
+    """API endpoint to get the risk engine's exposure, limits and rejection counts"""
+    if not risk_engine:
+        return jsonify({'error': 'Risk engine not running'}), 503
+    
+    return jsonify({
+        'stats': risk_engine.get_stats(),
+        'symbols': risk_engine.get_exposure(request.args.get('symbol')),
+    })
+
+
+@app.route('/api/rate-limit-stats')
+def get_rate_limit_stats():
+    """API endpoint to get the remaining request weight / order budget"""
+    if not binance_client:
+        return jsonify({'error': 'Binance client not initialized'}), 500
+    
+    return jsonify(binance_client.get_rate_limit_stats())
+
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'ok'})
+
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: 200 once warm-up has finished its required steps, 503 with per-step state until then"""
+    if gateway_warmup and not gateway_warmup.is_ready():
+        return jsonify(gateway_warmup.get_status()), 503
+    if not warmup:
+        return jsonify({'ready': False, 'error': 'Warm-up not running'}), 503
+    
+    try:
+        status = warmup.get_status()
+    except Exception as e:
+        return jsonify({'ready': False, 'error': str(e)}), 503
+    return jsonify(status), 200 if status['ready'] else 503
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of request, upstream, cache, rate limit and algo job metrics"""
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/api/profiling', methods=['GET', 'POST'])
+def request_profiling():
+    """API endpoint to switch per-request profiling on or off and read the accumulated profile"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            profiler.configure(
+                enabled=data.get('enabled'),
+                sample_every=data.get('sample_every'),
+                reset=bool(data.get('reset')),
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f"Invalid profiling settings: {str(e)}"}), 400
+        return jsonify(profiler.get_stats())
+    
+    stats = profiler.get_stats()
+    try:
+        stats['report'] = profiler.report(
+            limit=request.args.get('limit', 30, type=int),
+            sort=request.args.get('sort', 'cumulative'),
+        )
+    except KeyError as e:
+        return jsonify({'error': f"Invalid sort key: {str(e)}"}), 400
+    return jsonify(stats)
+
+
+@app.route('/api/cache-stats')
+def get_cache_stats():
+    """API endpoint to get response cache hit/miss counters and entry ages"""
+    return jsonify(api_cache.get_stats())
+
+
 @app.route('/api/orders', methods=['GET'])
 def get_orders():
     """API endpoint to get order history"""
@@ -126,11 +774,20 @@ def get_orders():
             return jsonify({'error': 'Binance client not initialized'}), 500
         
         symbol = request.args.get('symbol')
-        limit = request.args.get('limit', 50, type=int)
+        limit = min(request.args.get('limit', 50, type=int), 1000)
+        offset = request.args.get('offset', 0, type=int)
+        filters = {
+            'status': request.args.get('status'),
+            'side': request.args.get('side'),
+            'start_time': request.args.get('start_time', type=int),
+            'end_time': request.args.get('end_time', type=int),
+        }
         
-        orders = binance_client.get_order_history(symbol=symbol, limit=limit)
+        orders = load_orders(symbol, limit, offset, **filters)
         return jsonify(orders)
     
+    except RateLimitExceeded as e:
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
         logger.error(f"Error getting orders: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -145,9 +802,11 @@ def get_open_orders():
         
         symbol = request.args.get('symbol')
         
-        open_orders = binance_client.get_open_orders(symbol=symbol)
+        open_orders = load_open_orders(symbol)
         return jsonify(open_orders)
     
+    except RateLimitExceeded as e:
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
         logger.error(f"Error getting open orders: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -184,9 +843,14 @@ def place_order():
             stop_price=stop_price
         )
         
+        # Balances and order lists changed upstream
+        api_cache.invalidate('account', 'positions', 'orders', 'open-orders')
+        
         logger.info(f"Order placed successfully: {response}")
         return jsonify(response)
     
+    except RiskRejected as e:
+        return jsonify({'error': str(e), 'check': e.check}), 403
     except Exception as e:
         logger.error(f"Error placing order: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -215,6 +879,8 @@ def cancel_order():
             order_id=order_id
         )
         
+        api_cache.invalidate('account', 'positions', 'orders', 'open-orders')
+        
         logger.info(f"Order cancelled successfully: {response}")
         return jsonify(response)
     
@@ -223,6 +889,223 @@ def cancel_order():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/place-orders', methods=['POST'])
+def place_orders():
+    """API endpoint to place many orders at once"""
+    try:
+        if not binance_client:
+            return jsonify({'error': 'Binance client not initialized'}), 500
+        
+        orders = (request.json or {}).get('orders')
+        if not orders or not isinstance(orders, list):
+            return jsonify({'error': 'Missing required parameters'}), 400
+        
+        results = binance_client.place_batch_orders(orders)
+        api_cache.invalidate('account', 'positions', 'orders', 'open-orders')
+        
+        logger.info(f"Batch of {len(orders)} orders submitted")
+        return jsonify(results)
+    
+    except Exception as e:
+        logger.error(f"Error placing orders: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/modify-orders', methods=['POST'])
+def modify_orders():
+    """API endpoint to modify the price and quantity of many open orders"""
+    try:
+        if not binance_client:
+            return jsonify({'error': 'Binance client not initialized'}), 500
+        
+        orders = (request.json or {}).get('orders')
+        if not orders or not isinstance(orders, list):
+            return jsonify({'error': 'Missing required parameters'}), 400
+        
+        results = binance_client.modify_batch_orders(orders)
+        api_cache.invalidate('account', 'positions', 'orders', 'open-orders')
+        
+        return jsonify(results)
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error modifying orders: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/cancel-orders', methods=['POST'])
+def cancel_orders():
+    """API endpoint to cancel many orders of one symbol"""
+    try:
+        if not binance_client:
+            return jsonify({'error': 'Binance client not initialized'}), 500
+        
+        data = request.json or {}
+        symbol = data.get('symbol')
+        order_ids = data.get('order_ids')
+        
+        if not symbol or not order_ids:
+            return jsonify({'error': 'Missing required parameters'}), 400
+        
+        results = binance_client.cancel_batch_orders(symbol, order_ids)
+        api_cache.invalidate('account', 'positions', 'orders', 'open-orders')
+        
+        return jsonify(results)
+    
+    except Exception as e:
+        logger.error(f"Error cancelling orders: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/cancel-all-orders', methods=['POST'])
+def cancel_all_orders():
+    """API endpoint to cancel every open order of a symbol"""
+    try:
+        if not binance_client:
+            return jsonify({'error': 'Binance client not initialized'}), 500
+        
+        symbol = (request.json or {}).get('symbol')
+        if not symbol:
+            return jsonify({'error': 'Missing required parameters'}), 400
+        
+        response = binance_client.cancel_all_orders(symbol)
+        api_cache.invalidate('account', 'positions', 'orders', 'open-orders')
+        
+        logger.info(f"All open orders cancelled for {symbol}")
+        return jsonify(response)
+    
+    except Exception as e:
+        logger.error(f"Error cancelling all orders: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/place-twap-order', methods=['POST'])
+def place_twap_order():
+    """API endpoint to start a TWAP order in the background"""
+    try:
+        if not execution_engine:
+            return jsonify({'error': 'Binance client not initialized'}), 500
+        
+        data = request.json
+        
+        # Extract order parameters
+        symbol = data.get('symbol')
+        side = data.get('side')
+        quantity = float(data.get('quantity', 0))
+        num_orders = int(data.get('num_orders', 0))
+        duration_mins = float(data.get('duration_mins', 0))
+        
+        # Validate required parameters
+        if not all([symbol, side, quantity, num_orders]):
+            return jsonify({'error': 'Missing required parameters'}), 400
+        
+        job = execution_engine.submit_twap(
+            symbol=symbol,
+            side=side,
+            total_quantity=quantity,
+            num_orders=num_orders,
+            duration_mins=duration_mins
+        )
+        
+        api_cache.invalidate('account', 'positions', 'orders', 'open-orders')
+        return jsonify(job), 202
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error starting TWAP order: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/algo-jobs', methods=['GET'])
+def get_algo_jobs():
+    """API endpoint to list algorithmic order jobs"""
+    if not execution_engine:
+        return jsonify({'error': 'Binance client not initialized'}), 500
+    
+    return jsonify(execution_engine.list_jobs())
+
+
+@app.route('/api/algo-jobs/<job_id>', methods=['GET'])
+def get_algo_job(job_id):
+    """API endpoint to get the progress of an algorithmic order job"""
+    if not execution_engine:
+        return jsonify({'error': 'Binance client not initialized'}), 500
+    
+    try:
+        return jsonify(execution_engine.get_job(job_id))
+    except KeyError:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+
+
+@app.route('/api/algo-jobs/<job_id>/analytics', methods=['GET'])
+def get_algo_job_analytics(job_id):
+    """API endpoint to get execution quality metrics of an algorithmic order job"""
+    if not execution_analytics:
+        return jsonify({'error': 'Execution analytics not running'}), 503
+    
+    try:
+        return jsonify(execution_analytics.get_run(job_id)['metrics'])
+    except KeyError:
+        pass
+    
+    # Not recorded yet: compute from the live job
+    try:
+        job = execution_engine.get_job(job_id)
+    except KeyError:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    try:
+        return jsonify(execution_analytics.analyze(job))
+    except Exception as e:
+        logger.error(f"Error analyzing job {job_id}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/execution-analytics')
+def get_execution_analytics():
+    """API endpoint to get aggregate execution quality and recent runs of algorithmic orders"""
+    if not execution_analytics:
+        return jsonify({'error': 'Execution analytics not running'}), 503
+    
+    try:
+        filters = {
+            'symbol': request.args.get('symbol'),
+            'algo': request.args.get('algo'),
+            'since': request.args.get('since', type=float),
+        }
+        limit = min(request.args.get('limit', 50, type=int), 1000)
+        return jsonify({
+            'summary': execution_analytics.aggregate(**filters),
+            'runs': execution_analytics.query_runs(limit=limit, offset=request.args.get('offset', 0, type=int), **filters),
+        })
+    except Exception as e:
+        logger.error(f"Error getting execution analytics: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/algo-jobs/<job_id>/<action>', methods=['POST'])
+def control_algo_job(job_id, action):
+    """API endpoint to cancel, pause or resume an algorithmic order job"""
+    if not execution_engine:
+        return jsonify({'error': 'Binance client not initialized'}), 500
+    
+    actions = {
+        'cancel': execution_engine.cancel_job,
+        'pause': execution_engine.pause_job,
+        'resume': execution_engine.resume_job,
+    }
+    if action not in actions:
+        return jsonify({'error': f'Unknown action {action}'}), 404
+    
+    try:
+        return jsonify(actions[action](job_id))
+    except KeyError:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+
+
 @app.errorhandler(404)
 def page_not_found(e):
     """Handle 404 errors"""
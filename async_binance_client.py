@@ -0,0 +1,403 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+import aiohttp
+
+from binance_client import BinanceClient
+from config import Config
+from utils.logger import logger, request_log
+from utils.metrics import ORDER_ACK_LATENCY, UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from utils.rate_limit import RateLimiter, request_cost, HIGH, LOW
+from utils.signing import RequestSigner, ServerClock
+
+
+async def gather_limited(coros, limit=None, return_exceptions=False):
+    """
+    Await coroutines concurrently, at most `limit` at a time, and return
+    their results in order
+
+    If one fails (and return_exceptions is False) the ones still pending
+    are cancelled before the error propagates.
+    """
+    semaphore = asyncio.Semaphore(limit or Config.ASYNC_MAX_CONCURRENCY)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    tasks = [asyncio.ensure_future(run(coro)) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+class AsyncBinanceClient:
+    """
+    asyncio variant of BinanceClient on one pooled aiohttp session
+
+    Mirrors the market data, account and order methods of BinanceClient as
+    coroutines, so independent calls can overlap on a single thread. Signing,
+    clock offset, rate limiting, local order validation and, with
+    risk_engine set, pre-trade risk checks behave exactly as in the
+    synchronous client. Use `async with` or close() to release the session.
+    """
+
+    def __init__(self, api_key=None, api_secret=None, testnet=True):
+        """Initialize the async client with API credentials"""
+        self.api_key = api_key or Config.API_KEY
+        self.api_secret = api_secret or Config.API_SECRET
+        self.testnet = testnet
+        self.base_url = Config.BASE_URL if testnet else "https://fapi.binance.com"
+
+        if not self.api_key or not self.api_secret:
+            logger.error("API key and secret are required")
+            raise ValueError("API key and secret are required")
+
+        self._session = None
+
+        self.signer = RequestSigner(self.api_secret)
+        # Offsets are measured with sync_clock(); the clock never fetches on its own
+        self.server_clock = ServerClock(fetch_server_time=None)
+        self.rate_limiter = RateLimiter()
+
+        # Same optional local state as BinanceClient
+        self.ticker_store = None
+        self.order_books = None
+        self.exchange_info = None
+        self.risk_engine = None
+
+    # Signing and local order validation are shared with the synchronous client
+    _get_timestamp = BinanceClient._get_timestamp
+    _generate_signature = BinanceClient._generate_signature
+    _sign_params = BinanceClient._sign_params
+    _get_local_book = BinanceClient._get_local_book
+    get_fillable_quantity = BinanceClient.get_fillable_quantity
+    _check_book_liquidity = BinanceClient._check_book_liquidity
+    _round_order = BinanceClient._round_order
+    _build_order_params = BinanceClient._build_order_params
+    _check_risk = BinanceClient._check_risk
+    _settle_risk = BinanceClient._settle_risk
+    _track_risk = BinanceClient._track_risk
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_session(self):
+        """Create the pooled session on first use, inside the running event loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=Config.HTTP_POOL_SIZE),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=Config.HTTP_CONNECT_TIMEOUT,
+                    sock_read=Config.HTTP_READ_TIMEOUT,
+                ),
+                headers={'X-MBX-APIKEY': self.api_key},
+            )
+        return self._session
+
+    async def close(self):
+        """Close the pooled session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _make_request(self, method, endpoint, params=None, signed=True, priority=None):
+        """Make a request to the Binance API; see BinanceClient._make_request"""
+        url = f"{self.base_url}{endpoint}"
+
+        if params is None:
+            params = {}
+
+        if priority is None:
+            priority = LOW if method == 'GET' else HIGH
+        weight, order_count = request_cost(method, endpoint, params)
+
+        if method not in ('GET', 'DELETE', 'POST', 'PUT'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        logger.debug("Making async %s request to %s with params: %s", method, endpoint, params)
+        session = self._get_session()
+
+        try:
+            # A -1021 rejection was not processed; resync and send once more
+            for attempt in range(2):
+                await self.rate_limiter.acquire_async(weight, order_count, priority)
+                request_params = self._sign_params(params) if signed else params
+
+                start = time.perf_counter()
+                if method in ('GET', 'DELETE'):
+                    request = session.request(method, url, params=request_params)
+                else:
+                    # For POST and PUT requests, send data as form data
+                    request = session.request(method, url, data=request_params)
+                async with request as response:
+                    body = await response.text()
+                self.rate_limiter.update_from_response(response.status, response.headers)
+
+                if signed and attempt == 0 and self._is_timestamp_error(response.status, body):
+                    logger.warning("Request timestamp outside recvWindow, resyncing server clock")
+                    await self.sync_clock()
+                    continue
+                break
+
+            # Log the response (successes are sampled)
+            elapsed = time.perf_counter() - start
+            request_log.record(method, endpoint, response.status, elapsed * 1000, weight)
+            UPSTREAM_LATENCY.observe(elapsed, method, endpoint)
+            if response.status >= 400:
+                UPSTREAM_ERRORS.inc(method, endpoint, response.status)
+                logger.error("Response content: %s", body)
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response content: %s", body)
+            response.raise_for_status()
+
+            return json.loads(body)
+
+        except aiohttp.ClientError as e:
+            logger.error(f"Request error: {str(e)}")
+            if not isinstance(e, aiohttp.ClientResponseError):
+                UPSTREAM_ERRORS.inc(method, endpoint, 0)
+            raise
+
+    def _is_timestamp_error(self, status, body):
+        """Check if the exchange rejected a request for a timestamp outside recvWindow (-1021)"""
+        if status != 400:
+            return False
+        try:
+            return json.loads(body).get('code') == -1021
+        except ValueError:
+            return False
+
+    async def get_server_time(self):
+        """Get the exchange server time in milliseconds"""
+        try:
+            endpoint = '/fapi/v1/time'
+            return (await self._make_request('GET', endpoint, signed=False))['serverTime']
+        except Exception as e:
+            logger.error(f"Failed to get server time: {str(e)}")
+            raise
+
+    async def sync_clock(self):
+        """Re-estimate the server clock offset used for signed request timestamps"""
+        samples = []
+        for _ in range(self.server_clock.samples):
+            sent = time.time()
+            server_ms = await self.get_server_time()
+            samples.append((sent, server_ms, time.time()))
+        return self.server_clock.update(samples)
+
+    async def get_exchange_info(self, use_cache=True):
+        """Get exchange information, from the local cache when one is loaded"""
+        try:
+            if use_cache and self.exchange_info and self.exchange_info.is_loaded():
+                return self.exchange_info.get_payload()
+
+            endpoint = '/fapi/v1/exchangeInfo'
+            return await self._make_request('GET', endpoint, signed=False)
+        except Exception as e:
+            logger.error(f"Failed to get exchange info: {str(e)}")
+            raise
+
+    async def get_account_info(self):
+        """Get account information"""
+        try:
+            endpoint = '/fapi/v2/account'
+            return await self._make_request('GET', endpoint)
+        except Exception as e:
+            logger.error(f"Failed to get account info: {str(e)}")
+            raise
+
+    async def get_market_data(self, symbols=None):
+        """
+        Get 24hr market data for all supported symbols or specified ones
+
+        Same strategy as BinanceClient.get_market_data: one bulk request for
+        larger lists, per-symbol requests gathered concurrently otherwise.
+        """
+        try:
+            symbols_to_fetch = list(symbols or Config.SUPPORTED_SYMBOLS)
+            tickers_by_symbol = {}
+
+            if len(symbols_to_fetch) >= Config.MARKET_DATA_BULK_MIN_SYMBOLS:
+                try:
+                    tickers = await self._make_request('GET', '/fapi/v1/ticker/24hr', signed=False)
+                    tickers_by_symbol = {ticker['symbol']: ticker for ticker in tickers}
+                except Exception as e:
+                    logger.warning(f"Bulk ticker fetch failed, falling back to per-symbol requests: {str(e)}")
+
+            missing = [symbol for symbol in symbols_to_fetch if symbol not in tickers_by_symbol]
+            if missing:
+                results = await gather_limited(
+                    [self._make_request('GET', '/fapi/v1/ticker/24hr', {'symbol': symbol}, signed=False)
+                     for symbol in missing],
+                    limit=Config.MARKET_DATA_MAX_WORKERS,
+                    return_exceptions=True,
+                )
+                errors = []
+                for symbol, result in zip(missing, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Failed to get ticker for {symbol}: {str(result)}")
+                        errors.append(result)
+                    else:
+                        tickers_by_symbol[symbol] = result
+                # Only fail outright when nothing at all could be fetched
+                if errors and len(errors) == len(symbols_to_fetch):
+                    raise errors[0]
+
+            return [tickers_by_symbol[symbol] for symbol in symbols_to_fetch if symbol in tickers_by_symbol]
+        except Exception as e:
+            logger.error(f"Failed to get market data: {str(e)}")
+            raise
+
+    async def place_order(self, symbol, side, order_type, quantity, price=None, stop_price=None):
+        """Place an order on Binance Futures; see BinanceClient.place_order"""
+        try:
+            endpoint = '/fapi/v1/order'
+            with ORDER_ACK_LATENCY.time(order_type):
+                params = self._build_order_params(symbol, side, order_type, quantity, price, stop_price)
+                reservation = self._check_risk(params)
+
+                try:
+                    response = await self._make_request('POST', endpoint, params)
+                except Exception:
+                    self._settle_risk(reservation)
+                    raise
+                self._settle_risk(reservation, response)
+                return response
+        except Exception as e:
+            logger.error(f"Failed to place {order_type} {side} order for {symbol}: {str(e)}")
+            raise
+
+    async def cancel_order(self, symbol, order_id=None, orig_client_order_id=None):
+        """Cancel an open order"""
+        try:
+            endpoint = '/fapi/v1/order'
+            params = {'symbol': symbol}
+
+            if order_id:
+                params['orderId'] = order_id
+            elif orig_client_order_id:
+                params['origClientOrderId'] = orig_client_order_id
+            else:
+                raise ValueError("Either order_id or orig_client_order_id must be provided")
+
+            response = await self._make_request('DELETE', endpoint, params)
+            self._track_risk([response])
+            return response
+        except Exception as e:
+            logger.error(f"Failed to cancel order for {symbol}: {str(e)}")
+            raise
+
+    async def place_oco_order(self, symbol, side, quantity, price, stop_price, stop_limit_price):
+        """Place a One-Cancels-the-Other (OCO) order; see BinanceClient.place_oco_order"""
+        try:
+            endpoint = '/fapi/v1/order/oco'
+            params = {
+                'symbol': symbol,
+                'side': side,
+                'quantity': quantity,
+                'price': price,
+                'stopPrice': stop_price,
+                'stopLimitPrice': stop_limit_price,
+                'stopLimitTimeInForce': 'GTC'  # Good Till Cancelled
+            }
+
+            return await self._make_request('POST', endpoint, params)
+        except Exception as e:
+            logger.error(f"Failed to place OCO order for {symbol}: {str(e)}")
+            raise
+
+    async def place_twap_order(self, symbol, side, total_quantity, num_orders, duration_mins):
+        """
+        Time-Weighted Average Price (TWAP) order; see BinanceClient.place_twap_order
+
+        Waits between slices with asyncio.sleep, so other coroutines keep
+        running while the order is worked.
+        """
+        try:
+            order_size = float(total_quantity) / num_orders
+            interval_secs = (duration_mins * 60) / num_orders
+
+            logger.info(f"Starting async TWAP order: {side} {total_quantity} {symbol} "
+                        f"split into {num_orders} orders over {duration_mins} minutes")
+
+            responses = []
+            carry = 0.0
+
+            for i in range(num_orders):
+                target = order_size + carry
+                quantity = target
+
+                # Size all but the last slice to the liquidity currently in the book
+                available = self.get_fillable_quantity(symbol, side) if i < num_orders - 1 else None
+                if available is not None and available < target:
+                    quantity = available
+                    logger.info(f"TWAP slice {i+1}/{num_orders} reduced to {quantity} by book liquidity")
+                carry = target - quantity
+
+                if quantity > 0:
+                    responses.append(await self.place_order(
+                        symbol=symbol,
+                        side=side,
+                        order_type='MARKET',
+                        quantity=quantity
+                    ))
+                    logger.info(f"TWAP order {i+1}/{num_orders} placed successfully")
+
+                if i < num_orders - 1:
+                    await asyncio.sleep(interval_secs)
+
+            logger.info(f"TWAP order completed: {num_orders} orders executed")
+            return responses
+
+        except Exception as e:
+            logger.error(f"Failed to execute TWAP order for {symbol}: {str(e)}")
+            raise
+
+
+class SyncAsyncClient:
+    """
+    Blocking facade over an AsyncBinanceClient for synchronous callers
+
+    Runs the client on a private event loop in a daemon thread; every
+    coroutine method of the wrapped client is exposed as a plain method that
+    waits for its result, so code written against BinanceClient (e.g. the
+    Flask routes) can call it unchanged while calls from many threads share
+    one session and overlap on the loop.
+    """
+
+    def __init__(self, async_client=None, **client_kwargs):
+        self.async_client = async_client or AsyncBinanceClient(**client_kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='async-client-loop', daemon=True)
+        self._thread.start()
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the client's loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def __getattr__(self, name):
+        attr = getattr(self.async_client, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            return self.run(attr(*args, **kwargs))
+        call.__name__ = name
+        call.__doc__ = attr.__doc__
+        return call
+
+    def close(self):
+        """Close the session and stop the loop"""
+        self.run(self.async_client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,77 @@
+"""
+Sync BinanceClient vs AsyncBinanceClient on a mixed workload against the stub exchange
+
+Usage: python -m benchmarks.async_client [--orders 50] [--latency 0.05] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from async_binance_client import AsyncBinanceClient, SyncAsyncClient, gather_limited
+from benchmarks.stub_exchange import StubExchange
+from binance_client import BinanceClient
+from utils.logger import logger
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT']
+
+
+def run_sync(client, orders):
+    client.get_account_info()
+    client.get_market_data(SYMBOLS)
+    placed = [client.place_order(**order) for order in orders]
+    for order in placed:
+        client.cancel_order('BTCUSDT', order_id=order['orderId'])
+
+
+async def run_async(client, orders, concurrency):
+    await asyncio.gather(client.get_account_info(), client.get_market_data(SYMBOLS))
+    placed = await gather_limited([client.place_order(**order) for order in orders], limit=concurrency)
+    await gather_limited([client.cancel_order('BTCUSDT', order_id=order['orderId']) for order in placed],
+                         limit=concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.05, help='injected upstream latency in seconds')
+    parser.add_argument('--concurrency', type=int, default=8, help='gather_limited limit of the async run')
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    orders = [
+        {'symbol': 'BTCUSDT', 'side': 'BUY', 'order_type': 'LIMIT', 'quantity': 0.001, 'price': 50000 - i}
+        for i in range(args.orders)
+    ]
+
+    with StubExchange(latency=args.latency) as exchange:
+        client = BinanceClient(api_key='benchmark', api_secret='benchmark')
+        client.base_url = exchange.url
+        start = time.perf_counter()
+        run_sync(client, orders)
+        sync_secs = time.perf_counter() - start
+
+        async def async_run():
+            async with AsyncBinanceClient(api_key='benchmark', api_secret='benchmark') as async_client:
+                async_client.base_url = exchange.url
+                start = time.perf_counter()
+                await run_async(async_client, orders, args.concurrency)
+                return time.perf_counter() - start
+        async_secs = asyncio.run(async_run())
+
+        # The sync facade runs the same coroutines from ordinary blocking code
+        facade = SyncAsyncClient(api_key='benchmark', api_secret='benchmark')
+        facade.async_client.base_url = exchange.url
+        start = time.perf_counter()
+        facade.run(run_async(facade.async_client, orders, args.concurrency))
+        facade_secs = time.perf_counter() - start
+        facade.close()
+
+    print(f"account + 2 tickers + {args.orders} orders placed and cancelled, {args.latency * 1000:.0f} ms injected latency")
+    print(f"  BinanceClient (sequential):          {sync_secs:.2f}s")
+    print(f"  AsyncBinanceClient (limit {args.concurrency}):       {async_secs:.2f}s")
+    print(f"  SyncAsyncClient facade (limit {args.concurrency}):   {facade_secs:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
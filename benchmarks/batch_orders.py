@@ -0,0 +1,57 @@
+"""
+Wall-clock time to place and cancel 100 orders: one at a time vs batch endpoints
+
+Usage: python -m benchmarks.batch_orders [--orders 100] [--latency 0.05]
+"""
+import argparse
+import logging
+import time
+
+from benchmarks.stub_exchange import StubExchange
+from binance_client import BinanceClient
+from utils.logger import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.05, help='injected upstream latency in seconds')
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    orders = [
+        {'symbol': 'BTCUSDT', 'side': 'BUY', 'order_type': 'LIMIT', 'quantity': 0.001, 'price': 50000 - i}
+        for i in range(args.orders)
+    ]
+
+    with StubExchange(latency=args.latency) as exchange:
+        client = BinanceClient(api_key='benchmark', api_secret='benchmark')
+        client.base_url = exchange.url
+
+        start = time.perf_counter()
+        placed = [client.place_order(**order) for order in orders]
+        sequential_place = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for order in placed:
+            client.cancel_order(symbol='BTCUSDT', order_id=order['orderId'])
+        sequential_cancel = time.perf_counter() - start
+        sequential_calls = exchange.calls_total
+        exchange.reset_calls()
+
+        start = time.perf_counter()
+        placed = client.place_batch_orders(orders)
+        batch_place = time.perf_counter() - start
+
+        start = time.perf_counter()
+        client.cancel_batch_orders('BTCUSDT', [order['orderId'] for order in placed])
+        batch_cancel = time.perf_counter() - start
+        batch_calls = exchange.calls_total
+
+    print(f"{args.orders} orders, {args.latency * 1000:.0f} ms injected latency")
+    print(f"  sequential: place {sequential_place:.2f}s, cancel {sequential_cancel:.2f}s, {sequential_calls} upstream calls")
+    print(f"  batch:      place {batch_place:.2f}s, cancel {batch_cancel:.2f}s, {batch_calls} upstream calls")
+
+
+if __name__ == '__main__':
+    main()
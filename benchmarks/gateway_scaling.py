@@ -0,0 +1,100 @@
+"""
+Upstream calls as worker processes scale from 1 to 16: a client per worker vs one shared gateway
+
+Usage: python -m benchmarks.gateway_scaling [--workers 1,2,4,8,16] [--duration 5] [--latency 0.02] [--ttl 1]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks.stub_exchange import StubExchange
+from binance_client import BinanceClient
+from gateway import GatewayClient, GatewayServer
+from utils.cache import TTLCache
+from utils.logger import logger
+
+
+def build_services(url, ttl):
+    """The dashboard read path of app.py: cached market data and account calls on one client"""
+    client = BinanceClient(api_key='benchmark', api_secret='benchmark')
+    client.base_url = url
+    cache = TTLCache()
+    return {
+        'load_market_data': lambda: cache.get_or_load(('market-data',), client.get_market_data, ttl=ttl),
+        'load_account': lambda: cache.get_or_load(('account',), client.get_account_info, ttl=ttl),
+    }
+
+
+def worker(mode, url, socket_path, ttl, duration, results):
+    logger.setLevel(logging.WARNING)
+    if mode == 'gateway':
+        services = GatewayClient(socket_path).connect()
+    else:
+        services = build_services(url, ttl)
+
+    latencies = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        services['load_market_data']()
+        services['load_account']()
+        latencies.append(time.perf_counter() - start)
+    results.put(latencies)
+
+
+def run(mode, workers, exchange, socket_path, args):
+    exchange.reset_calls()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(mode, exchange.url, socket_path, args.ttl, args.duration, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    latencies = [latency for _ in processes for latency in results.get()]
+    for process in processes:
+        process.join()
+    latencies.sort()
+    return {
+        'upstream_calls': exchange.calls_total,
+        'requests': len(latencies),
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', default='1,2,4,8,16')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds each worker keeps polling')
+    parser.add_argument('--latency', type=float, default=0.02, help='injected upstream latency in seconds')
+    parser.add_argument('--ttl', type=float, default=1.0, help='response cache TTL in seconds')
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    socket_path = os.path.join(tempfile.mkdtemp(prefix='gateway-'), 'gateway.sock')
+    with StubExchange(latency=args.latency) as exchange:
+        server = GatewayServer(build_services(exchange.url, args.ttl), socket_path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        print(f"{args.duration:.0f}s of dashboard polling per worker, {args.latency * 1000:.0f} ms injected latency, "
+              f"{args.ttl:.0f}s cache TTL")
+        print(f"{'workers':>7} {'mode':>8} {'upstream calls':>15} {'requests':>9} {'p50 ms':>7} {'p99 ms':>7}")
+        try:
+            for workers in (int(n) for n in args.workers.split(',')):
+                for mode in ('direct', 'gateway'):
+                    result = run(mode, workers, exchange, socket_path, args)
+                    print(f"{workers:>7} {mode:>8} {result['upstream_calls']:>15} {result['requests']:>9} "
+                          f"{result['p50_ms']:>7.2f} {result['p99_ms']:>7.2f}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""
+End-to-end load test of the Flask API against the stub exchange, under the threaded dev server or gunicorn
+
+Each endpoint is driven on its own by --concurrency keep-alive clients for
+--duration seconds, so upstream calls can be attributed to it. Orders
+placed in the place-order run are cancelled in the cancel-order run.
+Results (throughput, p50/p95/p99 latency, errors, upstream calls per
+request and resident memory per server process) are printed and saved as
+JSON; --compare flags regressions against an earlier results file.
+
+The app runs with streams, local order books and the history sync
+switched off, so the numbers reflect the REST request path. Orders
+still go through the risk engine's checks, but its order rate, symbol
+exposure and margin limits are lifted since placed orders pile up until
+the cancel-order run.
+
+Usage: python -m benchmarks.load [--server gunicorn] [--duration 10] [--latency 0.02] [--compare previous.json]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+ENDPOINTS = ('index', 'market-data', 'account', 'orders', 'place-order', 'cancel-order')
+ORDER = {'symbol': 'BTCUSDT', 'side': 'BUY', 'order_type': 'LIMIT', 'quantity': 0.1, 'price': 99.5}
+
+_EXCHANGE_ENV = 'BENCHMARK_EXCHANGE_URL'
+_DATA_DIR_ENV = 'BENCHMARK_DATA_DIR'
+
+
+def create_app():
+    """Import app.py pointed at the stub exchange; the gunicorn entry point is benchmarks.load:create_app()"""
+    from config import Config
+    data_dir = os.environ[_DATA_DIR_ENV]
+    Config.BASE_URL = os.environ[_EXCHANGE_ENV]
+    Config.STREAM_ENABLED = Config.ORDER_BOOK_ENABLED = Config.USER_STREAM_ENABLED = Config.HISTORY_ENABLED = False
+    Config.LOG_CONSOLE = False
+    Config.LOG_FILE = os.path.join(data_dir, f'trading_bot-{os.getpid()}.log')
+    Config.EXCHANGE_INFO_CACHE_FILE = os.path.join(data_dir, 'exchange_info_cache.json')
+    Config.ANALYTICS_DB_FILE = os.path.join(data_dir, f'execution_analytics-{os.getpid()}.db')
+    Config.MARKET_HISTORY_DIR = os.path.join(data_dir, 'market_data')
+    Config.RISK_LIMITS = {
+        name: {**limits, 'max_orders': None, 'max_symbol_notional': None} for name, limits in Config.RISK_LIMITS.items()
+    }
+    Config.RISK_MAX_MARGIN_USAGE = None
+
+    from app import app
+    return app
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, exchange_url, data_dir):
+    port = _free_port()
+    env = dict(os.environ, **{_EXCHANGE_ENV: exchange_url, _DATA_DIR_ENV: data_dir})
+    if args.server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-w', str(args.workers), '--worker-class', 'gthread',
+                   '--threads', str(args.threads), '-b', f'127.0.0.1:{port}', '--log-level', 'warning',
+                   'benchmarks.load:create_app()']
+    else:
+        command = [sys.executable, '-m', 'benchmarks.load', '--serve', str(port)]
+    process = subprocess.Popen(command, env=env)
+    return process, port
+
+
+def wait_ready(port, process, workers, timeout=60):
+    """Wait until /readyz answers 200 often enough in a row that every worker is likely ready"""
+    deadline = time.monotonic() + timeout
+    in_a_row = 0
+    while in_a_row < workers * 3:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Server not ready after {timeout}s")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/readyz')
+            ok = connection.getresponse().status == 200
+            connection.close()
+        except OSError:
+            ok = False
+        in_a_row = in_a_row + 1 if ok else 0
+        if not ok:
+            time.sleep(0.1)
+
+
+def _rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _children(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def server_memory(process):
+    """Resident memory in MiB of the server process and each of its workers (Linux only)"""
+    return {str(pid): _rss_mb(pid) for pid in [process.pid] + _children(process.pid)}
+
+
+def _request_for(endpoint, placed):
+    if endpoint == 'index':
+        return 'GET', '/', None
+    if endpoint == 'market-data':
+        return 'GET', '/api/market-data', None
+    if endpoint == 'account':
+        return 'GET', '/api/account', None
+    if endpoint == 'orders':
+        return 'GET', '/api/orders?symbol=BTCUSDT', None
+    if endpoint == 'place-order':
+        return 'POST', '/api/place-order', ORDER
+    try:
+        order_id = placed.popleft()
+    except IndexError:
+        return None
+    return 'POST', '/api/cancel-order', {'symbol': ORDER['symbol'], 'order_id': order_id}
+
+
+def _client(port, endpoint, deadline, placed, latencies, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    while time.monotonic() < deadline:
+        request = _request_for(endpoint, placed)
+        if request is None:
+            return
+        method, path, body = request
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=json.dumps(body) if body else None, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            errors.append(0)
+            continue
+        latencies.append(time.perf_counter() - start)
+        if response.status >= 400:
+            errors.append(response.status)
+        elif endpoint == 'place-order':
+            placed.append(json.loads(payload)['orderId'])
+    connection.close()
+
+
+def _percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)] * 1000 if values else None
+
+
+def run_endpoint(port, exchange, endpoint, args, placed):
+    latencies, errors = [], []
+    exchange.reset_calls()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=_client, args=(port, endpoint, deadline, placed, latencies, errors), daemon=True)
+        for _ in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    requests_sent = len(latencies) + errors.count(0)
+    return {
+        'requests': requests_sent,
+        'errors': len(errors),
+        'throughput_rps': requests_sent / elapsed,
+        'p50_ms': _percentile(latencies, 0.50),
+        'p95_ms': _percentile(latencies, 0.95),
+        'p99_ms': _percentile(latencies, 0.99),
+        'mean_ms': statistics.mean(latencies) * 1000 if latencies else None,
+        'upstream_calls_per_request': exchange.calls_total / requests_sent if requests_sent else None,
+    }
+
+
+def compare(results, previous, tolerance):
+    """Print changes against a previous run; returns the regressions beyond tolerance"""
+    regressions = []
+    print(f"\nvs {previous['started_at']} ({previous['config']['server']}, {previous['config']['latency'] * 1000:.0f} ms)")
+    for endpoint, result in results['endpoints'].items():
+        before = previous['endpoints'].get(endpoint)
+        if not before:
+            continue
+        changes = []
+        for metric, higher_is_better in (('throughput_rps', True), ('p50_ms', False), ('p99_ms', False),
+                                         ('upstream_calls_per_request', False)):
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            changes.append(f"{metric} {change:+.1%}")
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(f"{endpoint} {metric}: {old:.2f} -> {new:.2f}")
+        print(f"  {endpoint:>13}: {', '.join(changes)}")
+    for regression in regressions:
+        print(f"  REGRESSION {regression}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--server', choices=('werkzeug', 'gunicorn'), default='werkzeug')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=16, help='gunicorn threads per worker')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent keep-alive clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of load per endpoint')
+    parser.add_argument('--latency', type=float, default=0.02, help='injected upstream latency in seconds')
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument('--output', default='load-results.json', help='where to save the results as JSON')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='relative change counted as a regression')
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)  # no access log line per request
+        return create_app().run(host='127.0.0.1', port=args.serve, threaded=True)
+    # Imported here so the server process starts with nothing of the app loaded
+    from benchmarks.stub_exchange import StubExchange
+
+    data_dir = tempfile.mkdtemp(prefix='load-')
+    workers = args.workers if args.server == 'gunicorn' else 1
+    results = {
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {
+            'server': args.server, 'workers': workers, 'threads': args.threads if args.server == 'gunicorn' else None,
+            'concurrency': args.concurrency, 'duration': args.duration, 'latency': args.latency,
+            'python': platform.python_version(), 'cpus': os.cpu_count(),
+        },
+        'endpoints': {},
+    }
+    try:
+        with StubExchange(latency=args.latency) as exchange:
+            process, port = start_server(args, exchange.url, data_dir)
+            try:
+                wait_ready(port, process, workers)
+                print(f"{args.server} ({workers} worker{'s' if workers > 1 else ''}), {args.concurrency} clients, "
+                      f"{args.duration:.0f}s per endpoint, {args.latency * 1000:.0f} ms injected latency")
+                print(f"{'endpoint':>13} {'req/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'errors':>7} "
+                      f"{'upstream/req':>12}")
+                placed = deque()
+                for endpoint in args.endpoints:
+                    result = run_endpoint(port, exchange, endpoint, args, placed)
+                    results['endpoints'][endpoint] = result
+                    print(f"{endpoint:>13} {result['throughput_rps']:>8.1f} {result['p50_ms'] or 0:>7.1f} "
+                          f"{result['p95_ms'] or 0:>7.1f} {result['p99_ms'] or 0:>7.1f} {result['errors']:>7} "
+                          f"{result['upstream_calls_per_request'] or 0:>12.2f}")
+                results['memory_mb'] = server_memory(process)
+                print("RSS MiB per process: " + ', '.join(
+                    f"{pid} {rss:.0f}" for pid, rss in results['memory_mb'].items() if rss is not None
+                ))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        if compare(results, previous, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Per-request logging overhead: synchronous f-string logging vs the queued, sampled, lazy pipeline
+
+Usage: python -m benchmarks.logging_overhead [--requests 100000]
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+from utils.logger import RequestLog, setup_logger
+
+PARAMS = {'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT', 'quantity': '0.001', 'price': '50000'}
+BODY = '{"orderId": 123456789, "symbol": "BTCUSDT", "status": "NEW", "price": "50000", "origQty": "0.001"}'
+
+
+def legacy_logger(path):
+    """The previous setup: formatting and file writes on the calling thread"""
+    logger = logging.getLogger('benchmark.before')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = RotatingFileHandler(path, maxBytes=10485760, backupCount=5)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    return logger
+
+
+def run_before(logger, n):
+    start = time.perf_counter()
+    for i in range(n):
+        logger.info(f"Making POST request to /fapi/v1/order with params: {PARAMS}")
+        logger.info(f"Received response: 200 in {12.345:.1f} ms")
+        logger.debug(f"Response content: {BODY}")
+    return time.perf_counter() - start
+
+
+def run_after(logger, request_log, n):
+    start = time.perf_counter()
+    for i in range(n):
+        logger.debug("Making %s request to %s with params: %s", 'POST', '/fapi/v1/order', PARAMS)
+        request_log.record('POST', '/fapi/v1/order', 200, 12.345, 1)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Response content: %s", BODY)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=100000)
+    args = parser.parse_args()
+
+    log_dir = tempfile.mkdtemp(prefix='logging-overhead-')
+    try:
+        before_path = os.path.join(log_dir, 'before.log')
+        before = run_before(legacy_logger(before_path), args.requests)
+
+        after_path = os.path.join(log_dir, 'after.log')
+        after_logger = setup_logger('benchmark.after', after_path, console=False)
+        after_logger.propagate = False
+        queue_handler = after_logger.handlers[0]
+        after = run_after(after_logger, RequestLog(after_logger), args.requests)
+        start = time.perf_counter()
+        queue_handler.queue.join()  # wait for the writer thread to drain
+        drain = time.perf_counter() - start
+
+        print(f"{args.requests} requests, file handler only")
+        print(f"  before: {before / args.requests * 1e6:.2f} us/request on the calling thread, "
+              f"{os.path.getsize(before_path) / 1024:.0f} KB written")
+        print(f"  after:  {after / args.requests * 1e6:.2f} us/request on the calling thread "
+              f"(+{drain * 1000:.0f} ms writer drain), {os.path.getsize(after_path) / 1024:.0f} KB written, "
+              f"{queue_handler.dropped} records dropped")
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
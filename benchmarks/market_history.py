@@ -0,0 +1,71 @@
+"""
+Historical klines: cold concurrent download vs memory-mapped range queries from the on-disk cache
+
+Usage: python -m benchmarks.market_history [--days 7] [--latency 0.05] [--queries 1000]
+"""
+import argparse
+import logging
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.stub_exchange import StubExchange
+from binance_client import BinanceClient
+from market_history import DAY_MS, MarketHistory, rolling_volatility, rolling_vwap
+from utils.logger import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--latency', type=float, default=0.05, help='injected upstream latency in seconds')
+    parser.add_argument('--queries', type=int, default=1000, help='random one-hour range queries on the warm cache')
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    today = int(time.time() * 1000) // DAY_MS * DAY_MS
+    start, end = today - args.days * DAY_MS, today
+    data_dir = tempfile.mkdtemp(prefix='market-history-')
+
+    try:
+        with StubExchange(latency=args.latency) as exchange:
+            client = BinanceClient(api_key='benchmark', api_secret='benchmark')
+            client.base_url = exchange.url
+
+            sequential = MarketHistory(client, data_dir=tempfile.mkdtemp(dir=data_dir), max_workers=1)
+            t0 = time.perf_counter()
+            sequential.get_klines('BTCUSDT', '1m', start, end)
+            sequential_download = time.perf_counter() - t0
+
+            history = MarketHistory(client, data_dir=data_dir)
+            exchange.reset_calls()
+            t0 = time.perf_counter()
+            klines = history.get_klines('BTCUSDT', '1m', start, end)
+            concurrent_download = time.perf_counter() - t0
+            download_calls = exchange.calls_total
+
+            exchange.reset_calls()
+            t0 = time.perf_counter()
+            for _ in range(args.queries):
+                query_start = random.randrange(start, end - 3600000)
+                history.get_klines('BTCUSDT', '1m', query_start, query_start + 3600000)
+            warm_query = (time.perf_counter() - t0) / args.queries
+            warm_calls = exchange.calls_total
+
+        t0 = time.perf_counter()
+        rolling_vwap(klines, window=60)
+        rolling_volatility(klines['close'], window=60)
+        indicators = time.perf_counter() - t0
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"{args.days} days of 1m klines ({len(klines)} rows), {args.latency * 1000:.0f} ms injected latency")
+    print(f"  download, 1 worker:    {sequential_download:.2f}s")
+    print(f"  download, concurrent:  {concurrent_download:.2f}s, {download_calls} upstream calls")
+    print(f"  cached 1h range query: {warm_query * 1e6:.0f} us, {warm_calls} upstream calls")
+    print(f"  rolling VWAP + volatility over all rows: {indicators * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+PriceLevels update cost against book depth
+
+Each round inserts a new level and deletes it again, at the best price
+(the worst case for the ask side, whose whole array shifts) and at a
+random depth, plus a quantity change of an existing level. Inserts and
+deletes grow with depth from the O(n) shift of the sorted arrays; the
+depths past ORDER_BOOK_SNAPSHOT_LIMIT show where a structure with
+O(log n) updates would start to pay off.
+
+Usage: python -m benchmarks.order_book [--iterations 200000]
+"""
+import argparse
+import random
+import time
+
+from config import Config
+from order_book import PriceLevels
+
+DEPTHS = (10, 100, Config.ORDER_BOOK_SNAPSHOT_LIMIT, 10000, 100000)
+
+
+def _side(depth):
+    levels = PriceLevels(descending=False)
+    for i in range(depth):
+        levels.update(100.0 + i * 0.1, 1.0)
+    return levels
+
+
+def measure(levels, prices, quantity_changes):
+    """Mean microseconds per update() call: insert and delete each price, then change existing levels"""
+    start = time.perf_counter()
+    for price in prices:
+        levels.update(price, 1.0)
+        levels.update(price, 0)
+    for price in quantity_changes:
+        levels.update(price, 2.0)
+    calls = 2 * len(prices) + len(quantity_changes)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+    rng = random.Random(1)
+
+    print(f"{'levels':>8} {'at best (us)':>13} {'random (us)':>12} {'qty change (us)':>16}")
+    for depth in DEPTHS:
+        levels = _side(depth)
+        existing = list(levels.prices)
+        at_best = [99.95] * args.iterations
+        anywhere = [rng.choice(existing) + 0.05 for _ in range(args.iterations)]
+        changes = [rng.choice(existing) for _ in range(args.iterations)]
+        best_us = measure(levels, at_best, [])
+        random_us = measure(levels, anywhere, [])
+        change_us = measure(levels, [], changes)
+        assert len(levels) == depth
+        print(f"{depth:>8} {best_us:>13.3f} {random_us:>12.3f} {change_us:>16.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Server CPU and upstream calls of the push channel as connected clients grow
+
+Usage: python -m benchmarks.push_fanout [--clients 1 10 100 500] [--seconds 5]
+"""
+import argparse
+import itertools
+import logging
+import threading
+import time
+
+from benchmarks.stub_exchange import StubExchange
+from binance_client import BinanceClient
+from push_feed import PushHub
+from utils.cache import TTLCache
+from utils.logger import logger
+
+
+def make_loader(client, cache):
+    """Build a push feed loader like app.load_push_state, with a simulated price tick per poll"""
+    ticks = itertools.count()
+
+    def loader():
+        tick = next(ticks)
+        tickers = cache.get_or_load(('market-data', None), client.get_market_data, ttl=2)
+        account = cache.get_or_load(('account',), client.get_account_info, ttl=5)
+        open_orders = cache.get_or_load(('open-orders', None), client.get_open_orders, ttl=2)
+        return {
+            'tickers': {
+                ticker['symbol']: {'lastPrice': str(float(ticker['lastPrice']) + tick * 0.1),
+                                   'priceChangePercent': ticker['priceChangePercent'], 'volume': ticker['volume']}
+                for ticker in tickers
+            },
+            'balances': {asset['asset']: asset for asset in account['assets']},
+            'orders': {str(order['orderId']): order for order in open_orders},
+        }
+
+    return loader
+
+
+def run(exchange, client, clients, seconds, interval):
+    hub = PushHub(make_loader(client, TTLCache()), interval=interval)
+    hub.start()
+    received = [0] * clients
+
+    def consume(i):
+        for event in hub.stream(hub.subscribe(), heartbeat=1):
+            received[i] += len(event)
+
+    threads = [threading.Thread(target=consume, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+
+    exchange.reset_calls()
+    cpu_start = time.process_time()
+    time.sleep(seconds)
+    cpu = time.process_time() - cpu_start
+    upstream = exchange.calls_total
+    stats = hub.get_stats()
+    hub.stop()
+    return cpu, upstream, stats, sum(received)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 10, 100, 500])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--interval', type=float, default=0.5, help='push feed poll interval in seconds')
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    with StubExchange(latency=0.01) as exchange:
+        client = BinanceClient(api_key='benchmark', api_secret='benchmark')
+        client.base_url = exchange.url
+
+        print(f"{args.seconds:.0f}s per run, feed polled every {args.interval * 1000:.0f} ms")
+        for clients in args.clients:
+            cpu, upstream, stats, received = run(exchange, client, clients, args.seconds, args.interval)
+            print(f"  {clients:>4} clients: cpu {cpu / args.seconds * 100:5.1f}%, {upstream} upstream calls, "
+                  f"{stats['deltas']} deltas, {received / 1024:,.0f} KiB pushed, {stats['dropped_events']} dropped")
+
+
+if __name__ == '__main__':
+    main()
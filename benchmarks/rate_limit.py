@@ -0,0 +1,76 @@
+"""
+Dashboard read bursts mixed with order traffic under a tight request weight limit
+
+Usage: python -m benchmarks.rate_limit [--weight-limit 200] [--readers 8] [--seconds 5]
+"""
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_exchange import StubExchange
+from binance_client import BinanceClient
+from utils.logger import logger
+from utils.rate_limit import RateLimiter, RateLimitExceeded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--weight-limit', type=int, default=200, help='stub weight limit per window')
+    parser.add_argument('--window', type=float, default=5.0, help='stub weight window in seconds')
+    parser.add_argument('--readers', type=int, default=8, help='threads refreshing the dashboard')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--latency', type=float, default=0.01, help='injected upstream latency in seconds')
+    args = parser.parse_args()
+    logger.setLevel(logging.CRITICAL)
+
+    with StubExchange(latency=args.latency, weight_limit=args.weight_limit, weight_window=args.window) as exchange:
+        client = BinanceClient(api_key='benchmark', api_secret='benchmark')
+        client.base_url = exchange.url
+        client.rate_limiter = RateLimiter(weight_limits={'1m': (args.weight_limit, args.window)})
+
+        stop_at = time.monotonic() + args.seconds
+        reads = {'ok': 0, 'shed': 0, 'failed': 0}
+        order_latencies = []
+        lock = threading.Lock()
+
+        def refresh_dashboard():
+            while time.monotonic() < stop_at:
+                for call in (client.get_account_info, client.get_open_orders, client.get_order_history):
+                    try:
+                        call()
+                        outcome = 'ok'
+                    except RateLimitExceeded:
+                        outcome = 'shed'
+                    except Exception:
+                        outcome = 'failed'
+                    with lock:
+                        reads[outcome] += 1
+
+        def trade():
+            while time.monotonic() < stop_at:
+                start = time.perf_counter()
+                order = client.place_order('BTCUSDT', 'BUY', 'LIMIT', 0.001, price=50000)
+                client.cancel_order('BTCUSDT', order_id=order['orderId'])
+                order_latencies.append(time.perf_counter() - start)
+                time.sleep(0.1)
+
+        with ThreadPoolExecutor(max_workers=args.readers + 1) as executor:
+            futures = [executor.submit(refresh_dashboard) for _ in range(args.readers)]
+            futures.append(executor.submit(trade))
+            for future in futures:
+                future.result()
+
+    order_latencies.sort()
+    print(f"weight limit {args.weight_limit} per {args.window:.0f}s, {args.readers} dashboard readers, {args.seconds:.0f}s")
+    print(f"  reads:  {reads['ok']} ok, {reads['shed']} shed by the governor, {reads['failed']} failed")
+    if order_latencies:
+        p50 = order_latencies[len(order_latencies) // 2]
+        print(f"  orders: {len(order_latencies)} place+cancel round trips, p50 {p50 * 1000:.1f} ms, "
+              f"max {order_latencies[-1] * 1000:.1f} ms")
+    print(f"  exchange 429s: {exchange.rejected}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Pre-trade risk check cost: account and open-order REST calls before each order vs the in-memory risk engine
+
+Usage: python -m benchmarks.risk_checks [--orders 100] [--checks 100000] [--latency 0.05]
+"""
+import argparse
+import logging
+import time
+
+from benchmarks.stub_exchange import StubExchange
+from binance_client import BinanceClient
+from risk_engine import RiskEngine
+from utils.logger import logger
+
+# No order rate limit, so the tight check loop measures the checks themselves
+LIMITS = {
+    'default': {
+        'max_position': 100, 'max_order_notional': 50000, 'max_symbol_notional': 10000000,
+        'price_band_bps': 500, 'max_orders': None,
+    },
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=100)
+    parser.add_argument('--checks', type=int, default=100000, help='in-memory checks timed without sending orders')
+    parser.add_argument('--latency', type=float, default=0.05, help='injected upstream latency in seconds')
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    orders = [
+        {'symbol': 'BTCUSDT', 'side': 'BUY', 'order_type': 'LIMIT', 'quantity': 0.001, 'price': 50000 - i}
+        for i in range(args.orders)
+    ]
+
+    with StubExchange(latency=args.latency) as exchange:
+        client = BinanceClient(api_key='benchmark', api_secret='benchmark')
+        client.base_url = exchange.url
+
+        # Before: fetch the account and open orders, then place
+        start = time.perf_counter()
+        for order in orders:
+            client.get_account_info()
+            client.get_open_orders(order['symbol'])
+            client.place_order(**order)
+        rest_total = time.perf_counter() - start
+        rest_calls = exchange.calls_total
+        exchange.reset_calls()
+
+        # After: place_order runs the risk engine's checks in memory
+        client.risk_engine = RiskEngine(client, limits=LIMITS)
+        client.risk_engine.sync()
+        exchange.reset_calls()
+        start = time.perf_counter()
+        for order in orders:
+            client.place_order(**order)
+        engine_total = time.perf_counter() - start
+        engine_calls = exchange.calls_total
+
+        risk_engine = client.risk_engine
+        start = time.perf_counter()
+        for i in range(args.checks):
+            risk_engine.release(risk_engine.check_order('BTCUSDT', 'BUY', 0.001, 50000 - i % 100))
+        check_time = time.perf_counter() - start
+
+    print(f"{args.orders} LIMIT orders, {args.latency * 1000:.0f} ms injected latency")
+    print(f"  REST pre-check: {rest_total:.2f}s, {rest_calls} upstream calls")
+    print(f"  risk engine:    {engine_total:.2f}s, {engine_calls} upstream calls")
+    print(f"  in-memory check and release: {check_time / args.checks * 1e6:.2f} us each ({args.checks} checks)")
+
+
+if __name__ == '__main__':
+    main()
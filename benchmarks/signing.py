@@ -0,0 +1,47 @@
+"""
+Signing throughput: hmac.new per request vs the pre-keyed RequestSigner
+
+Usage: python -m benchmarks.signing [--iterations 200000]
+"""
+import argparse
+import hashlib
+import hmac
+import time
+from urllib.parse import urlencode
+
+from utils.signing import RequestSigner
+
+SECRET = 'e32ee9380b82c4fc6dfeac86591f0508e46d32d3c8eddafb0e394328fa1ff7d1'
+
+
+def naive_sign(query_string):
+    return hmac.new(SECRET.encode('utf-8'), query_string.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def measure(sign, query_string, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        sign(query_string)
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+
+    query_string = urlencode({
+        'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT', 'quantity': '0.001',
+        'price': '50000', 'timeInForce': 'GTC', 'timestamp': int(time.time() * 1000), 'recvWindow': 5000,
+    })
+    signer = RequestSigner(SECRET)
+    assert signer.sign(query_string) == naive_sign(query_string)
+
+    naive = measure(naive_sign, query_string, args.iterations)
+    prekeyed = measure(signer.sign, query_string, args.iterations)
+    print(f"hmac.new per request: {naive:,.0f} signatures/s ({1e6 / naive:.2f} us each)")
+    print(f"pre-keyed copy:       {prekeyed:,.0f} signatures/s ({1e6 / prekeyed:.2f} us each)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Startup time of the app: import, first served request and readiness, with a cold and a warm exchangeInfo cache
+
+Each run imports app.py in a fresh interpreter pointed at the stub exchange
+(streams and the history sync switched off) and times, from the first
+import, when app.py is imported, when /healthz first answers and when
+/readyz first answers 200.
+
+Usage: python -m benchmarks.startup [--runs 5] [--latency 0.05]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def child(url, data_dir):
+    """Runs in the fresh interpreter; prints the timings as JSON"""
+    start = time.perf_counter()
+    from config import Config
+    Config.BASE_URL = url
+    Config.STREAM_ENABLED = Config.ORDER_BOOK_ENABLED = Config.USER_STREAM_ENABLED = Config.HISTORY_ENABLED = False
+    Config.LOG_CONSOLE = False
+    Config.LOG_FILE = os.path.join(data_dir, 'trading_bot.log')
+    Config.EXCHANGE_INFO_CACHE_FILE = os.path.join(data_dir, 'exchange_info_cache.json')
+    Config.ANALYTICS_DB_FILE = os.path.join(data_dir, 'execution_analytics.db')
+    Config.MARKET_HISTORY_DIR = os.path.join(data_dir, 'market_data')
+
+    import app
+    imported = time.perf_counter()
+    client = app.app.test_client()
+    client.get('/healthz')
+    first_response = time.perf_counter()
+    while client.get('/readyz').status_code != 200:
+        time.sleep(0.005)
+    ready = time.perf_counter()
+    print(json.dumps({
+        'import_ms': (imported - start) * 1000,
+        'first_response_ms': (first_response - start) * 1000,
+        'ready_ms': (ready - start) * 1000,
+        'steps': {name: step['duration_ms'] for name, step in app.warmup.get_status()['steps'].items()},
+    }))
+
+
+def run(url, data_dir):
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--child', url, '--data-dir', data_dir],
+        capture_output=True, text=True, check=True, timeout=120,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.05, help='injected upstream latency in seconds')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.data_dir)
+    # Imported here so the child interpreter starts with nothing of the app loaded
+    from benchmarks.stub_exchange import StubExchange
+
+    data_dir = tempfile.mkdtemp(prefix='startup-')
+    cache_file = os.path.join(data_dir, 'exchange_info_cache.json')
+    try:
+        with StubExchange(latency=args.latency) as exchange:
+            print(f"{args.runs} runs per scenario, {args.latency * 1000:.0f} ms injected latency (medians)")
+            print(f"{'exchangeInfo cache':>18} {'import ms':>10} {'first response ms':>18} {'ready ms':>9}  warm-up steps ms")
+            for scenario in ('cold', 'warm'):
+                results = []
+                for _ in range(args.runs):
+                    if scenario == 'cold' and os.path.exists(cache_file):
+                        os.remove(cache_file)
+                    results.append(run(exchange.url, data_dir))
+                median = {key: statistics.median(r[key] for r in results)
+                          for key in ('import_ms', 'first_response_ms', 'ready_ms')}
+                steps = ', '.join(f"{name} {statistics.median(r['steps'][name] or 0 for r in results):.0f}"
+                                  for name in results[0]['steps'])
+                print(f"{scenario:>18} {median['import_ms']:>10.0f} {median['first_response_ms']:>18.0f} "
+                      f"{median['ready_ms']:>9.0f}  {steps}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+Minimal local stand-in for the Binance Futures REST API used by the benchmarks and tests
+
+Answers the endpoints BinanceClient calls with plausible payloads after an
+injected latency, and counts requests per endpoint so benchmarks can report
+upstream calls. Request weight and order counts are tracked in fixed windows
+like the real exchange, reported in the X-MBX-* headers and, past an
+optional weight limit, answered with 429. Given the API secret, signed
+requests are verified like the exchange does (-1022 for a bad signature,
+-1021 for a timestamp outside recvWindow); `failures` answers the next
+requests with 503.
+"""
+import hashlib
+import hmac
+import itertools
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+from utils.rate_limit import request_cost
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'DOGEUSDT',
+           'XRPUSDT', 'DOTUSDT', 'LINKUSDT', 'LTCUSDT', 'BCHUSDT']
+
+_order_ids = itertools.count(1)
+
+
+def _ticker(symbol):
+    return {
+        'symbol': symbol, 'lastPrice': '100.0', 'priceChange': '1.0', 'priceChangePercent': '1.0',
+        'openPrice': '99.0', 'highPrice': '101.0', 'lowPrice': '98.0', 'volume': '1000',
+        'quoteVolume': '100000', 'closeTime': int(time.time() * 1000),
+    }
+
+
+def _klines(params):
+    """Synthetic 1-minute-or-longer klines from startTime, capped at now"""
+    step = int(params['interval'][:-1]) * {'m': 60000, 'h': 3600000, 'd': 86400000}[params['interval'][-1]]
+    now = int(time.time() * 1000)
+    end = min(int(params.get('endTime', now)), now)
+    open_time = int(params.get('startTime', end - step * 500))
+    open_time -= open_time % step
+    rows = []
+    while open_time <= end and len(rows) < int(params.get('limit', 500)):
+        price = 100.0 + (open_time // step) % 50 / 10
+        rows.append([open_time, str(price), str(price + 0.5), str(price - 0.5), str(price + 0.1), '10',
+                     open_time + step - 1, str(price * 10), 25, '5', str(price * 5)])
+        open_time += step
+    return rows
+
+
+def _exchange_info():
+    filters = [
+        {'filterType': 'PRICE_FILTER', 'tickSize': '0.10', 'minPrice': '0.10', 'maxPrice': '1000000'},
+        {'filterType': 'LOT_SIZE', 'stepSize': '0.001', 'minQty': '0.001', 'maxQty': '1000'},
+        {'filterType': 'MARKET_LOT_SIZE', 'stepSize': '0.001', 'minQty': '0.001', 'maxQty': '120'},
+        {'filterType': 'MIN_NOTIONAL', 'notional': '5'},
+    ]
+    return {
+        'serverTime': int(time.time() * 1000),
+        'symbols': [{'symbol': symbol, 'status': 'TRADING', 'filters': filters} for symbol in SYMBOLS],
+    }
+
+
+def _order(params, status='NEW'):
+    return {
+        'orderId': int(params.get('orderId') or next(_order_ids)),
+        'symbol': params.get('symbol'), 'side': params.get('side', 'BUY'),
+        'type': params.get('type', 'LIMIT'), 'status': status,
+        'price': params.get('price', '0'), 'stopPrice': params.get('stopPrice', '0'),
+        'origQty': params.get('quantity', '0'), 'executedQty': '0', 'avgPrice': '0',
+        'time': int(time.time() * 1000), 'updateTime': int(time.time() * 1000),
+    }
+
+
+class StubExchangeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _params(self):
+        """Return the path, the query and form parameters, and the raw string they were sent as"""
+        parsed = urlparse(self.path)
+        raw = parsed.query
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            body = self.rfile.read(length).decode()
+            raw = f"{raw}&{body}" if raw else body
+        return parsed.path, dict(parse_qsl(raw)), raw
+
+    def _signature_error(self, params, raw):
+        """Return the exchange's error for a badly signed or stale request, None if it is valid or unsigned"""
+        if self.server.api_secret is None or 'timestamp' not in params:
+            return None
+        payload, _, signature = raw.rpartition('&signature=')
+        expected = hmac.new(self.server.api_secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(signature, expected):
+            return {'code': -1022, 'msg': 'Signature for this request is not valid.'}
+        if abs(time.time() * 1000 - int(params['timestamp'])) > int(params.get('recvWindow', 5000)):
+            return {'code': -1021, 'msg': 'Timestamp for this request is outside of the recvWindow.'}
+        return None
+
+    def _send(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or self.usage_headers).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        path, params, raw = self._params()
+        self.server.record(self.command, path)
+        self.usage_headers = self.server.charge(*request_cost(self.command, path, params))
+        if self.usage_headers is None:
+            return self._send({'code': -1003, 'msg': 'Too many requests'}, status=429, headers={'Retry-After': '1'})
+        if self.server.take_failure():
+            return self._send({'code': -1001, 'msg': 'Internal error; unable to process your request.'}, status=503)
+        error = self._signature_error(params, raw)
+        if error:
+            return self._send(error, status=400)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        key = (self.command, path)
+        if key == ('GET', '/fapi/v1/ticker/24hr'):
+            if 'symbol' in params:
+                return self._send(_ticker(params['symbol']))
+            return self._send([_ticker(symbol) for symbol in SYMBOLS])
+        if key == ('GET', '/fapi/v2/account'):
+            return self._send({
+                'totalWalletBalance': '10000', 'totalMarginBalance': '10000', 'availableBalance': '10000',
+                'assets': [{'asset': 'USDT', 'walletBalance': '10000', 'unrealizedProfit': '0',
+                            'availableBalance': '10000'}],
+                'positions': [],
+            })
+        if key == ('GET', '/fapi/v1/allOrders') and 'symbol' not in params:
+            return self._send({'code': -1102, 'msg': "Mandatory parameter 'symbol' was not sent."}, status=400)
+        if key in (('GET', '/fapi/v1/openOrders'), ('GET', '/fapi/v1/allOrders'), ('GET', '/fapi/v2/positionRisk')):
+            return self._send([])
+        if key == ('POST', '/fapi/v1/order'):
+            return self._send(_order(params))
+        if key == ('DELETE', '/fapi/v1/order'):
+            return self._send(_order(params, status='CANCELED'))
+        if key == ('POST', '/fapi/v1/batchOrders'):
+            return self._send([_order(order) for order in json.loads(params['batchOrders'])])
+        if key == ('PUT', '/fapi/v1/batchOrders'):
+            return self._send([_order(order) for order in json.loads(params['batchOrders'])])
+        if key == ('DELETE', '/fapi/v1/batchOrders'):
+            return self._send([_order({'orderId': order_id, 'symbol': params['symbol']}, status='CANCELED')
+                               for order_id in json.loads(params['orderIdList'])])
+        if key == ('DELETE', '/fapi/v1/allOpenOrders'):
+            return self._send({'code': 200, 'msg': 'The operation of cancel all open order is done.'})
+        if key == ('POST', '/fapi/v1/listenKey'):
+            return self._send({'listenKey': 'stub-listen-key'})
+        if key in (('PUT', '/fapi/v1/listenKey'), ('DELETE', '/fapi/v1/listenKey')):
+            return self._send({})
+        if key == ('GET', '/fapi/v1/time'):
+            return self._send({'serverTime': int(time.time() * 1000)})
+        if key == ('GET', '/fapi/v1/ping'):
+            return self._send({})
+        if key == ('GET', '/fapi/v1/exchangeInfo'):
+            return self._send(_exchange_info())
+        if key == ('GET', '/fapi/v1/klines'):
+            return self._send(_klines(params))
+        if key == ('GET', '/fapi/v1/depth'):
+            return self._send({'lastUpdateId': 1, 'bids': [['99.9', '10']], 'asks': [['100.1', '10']]})
+        return self._send({'code': -1, 'msg': f'Unknown endpoint {self.command} {path}'}, status=404)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+
+class StubExchange(ThreadingHTTPServer):
+    """Threaded stub server; use as a context manager to run it in the background"""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, port=0, weight_limit=None, weight_window=60, api_secret=None):
+        super().__init__(('127.0.0.1', port), StubExchangeHandler)
+        self.latency = latency
+        self.weight_limit = weight_limit
+        self.weight_window = weight_window
+        self.api_secret = api_secret
+        self.failures = 0  # the next this many requests are answered with 503
+        self.calls = Counter()
+        self.calls_total = 0
+        self.rejected = 0
+        self._window_start = time.monotonic()
+        self._used_weight = 0
+        self._order_windows = {'10S': [time.monotonic(), 0], '1M': [time.monotonic(), 0]}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def record(self, method, path):
+        with self._lock:
+            self.calls[f"{method} {path}"] += 1
+            self.calls_total += 1
+
+    def take_failure(self):
+        """True if this request should fail with 503 (counts down `failures`)"""
+        with self._lock:
+            if self.failures <= 0:
+                return False
+            self.failures -= 1
+            return True
+
+    def charge(self, weight, orders):
+        """Count a request against the current windows; returns its usage headers, or None if over the limit"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_start >= self.weight_window:
+                self._window_start = now
+                self._used_weight = 0
+            if self.weight_limit is not None and self._used_weight + weight > self.weight_limit:
+                self.rejected += 1
+                return None
+            self._used_weight += weight
+            headers = {'X-MBX-USED-WEIGHT-1M': str(self._used_weight)}
+
+            if orders:
+                for label, interval in (('10S', 10), ('1M', 60)):
+                    window = self._order_windows[label]
+                    if now - window[0] >= interval:
+                        window[0], window[1] = now, 0
+                    window[1] += orders
+                    headers[f'X-MBX-ORDER-COUNT-{label}'] = str(window[1])
+            return headers
+
+    def reset_calls(self):
+        with self._lock:
+            self.calls.clear()
+            self.calls_total = 0
+            self.rejected = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
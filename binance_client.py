@@ -1,13 +1,15 @@
-from binance.client import Client
-from binance.exceptions import BinanceAPIException, BinanceRequestException
+import logging
 import time
-import hmac
-import hashlib
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlencode
 from config import Config
-from utils.logger import logger
+from utils.logger import logger, request_log
+from utils.metrics import ORDER_ACK_LATENCY, UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from utils.transport import HttpTransport
+from utils.signing import RequestSigner, ServerClock
+from utils.rate_limit import RateLimiter, request_cost, HIGH, LOW
 
 class BinanceClient:
     def __init__(self, api_key=None, api_secret=None, testnet=True):
@@ -15,48 +17,78 @@ class BinanceClient:
         self.api_key = api_key or Config.API_KEY
         self.api_secret = api_secret or Config.API_SECRET
         self.testnet = testnet
-        self.base_url = "https://testnet.binancefuture.com" if testnet else "https://fapi.binance.com"
+        self.base_url = Config.BASE_URL if testnet else "https://fapi.binance.com"
         
         if not self.api_key or not self.api_secret:
             logger.error("API key and secret are required")
             raise ValueError("API key and secret are required")
         
-        # Initialize the Binance python client
-        try:
-            self.client = Client(self.api_key, self.api_secret, testnet=self.testnet)
-            logger.info("Binance client initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize Binance client: {str(e)}")
-            raise
+        # Persistent pooled session shared by every REST call
+        self.transport = HttpTransport()
+        
+        # Pre-keyed signer and drift-corrected timestamps for signed requests
+        self.signer = RequestSigner(self.api_secret)
+        self.server_clock = ServerClock(self.get_server_time)
+        
+        # Request weight / order count budget shared by every REST call
+        self.rate_limiter = RateLimiter()
+        
+        # Optional live ticker store (see market_stream.py) used to answer price lookups locally
+        self.ticker_store = None
+        
+        # Optional local order books (see order_book.py) used for pre-trade liquidity checks
+        self.order_books = None
+        
+        # Optional exchangeInfo cache (see exchange_info.py) used to round and validate orders locally
+        self.exchange_info = None
+        
+        # Optional pre-trade risk engine (see risk_engine.py) checking orders against exposure limits
+        self.risk_engine = None
     
     def _get_timestamp(self):
-        """Get current timestamp in milliseconds"""
-        return int(time.time() * 1000)
+        """Get current exchange timestamp in milliseconds, corrected for local clock drift"""
+        return self.server_clock.timestamp()
     
     def _generate_signature(self, query_string):
         """Generate HMAC-SHA256 signature for API request"""
-        return hmac.new(
-            self.api_secret.encode('utf-8'),
-            query_string.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-    
-    def _make_request(self, method, endpoint, params=None):
-        """Make a request to the Binance API"""
+        return self.signer.sign(query_string)
+    
+    def _sign_params(self, params):
+        """Return a copy of params with timestamp, recvWindow and signature added"""
+        signed_params = dict(params)
+        signed_params['timestamp'] = self._get_timestamp()
+        signed_params['recvWindow'] = Config.RECV_WINDOW
+        
+        # Generate query string and signature
+        query_string = urlencode(signed_params)
+        signed_params['signature'] = self._generate_signature(query_string)
+        return signed_params
+    
+    def _is_timestamp_error(self, response):
+        """Check if the exchange rejected a request for a timestamp outside recvWindow (-1021)"""
+        if response.status_code != 400:
+            return False
+        try:
+            return response.json().get('code') == -1021
+        except ValueError:
+            return False
+    
+    def _make_request(self, method, endpoint, params=None, signed=True, priority=None):
+        """
+        Make a request to the Binance API (public market data endpoints pass signed=False)
+        
+        Requests wait for rate limit budget first; order traffic (anything but
+        GET) defaults to high priority, reads to low priority and may be shed
+        with RateLimitExceeded when the budget is exhausted.
+        """
         url = f"{self.base_url}{endpoint}"
-        timestamp = self._get_timestamp()
         
-        # Add timestamp to params
         if params is None:
             params = {}
-        params['timestamp'] = timestamp
         
-        # Generate query string and signature
-        query_string = urlencode(params)
-        signature = self._generate_signature(query_string)
-        
-        # Add signature to params
-        params['signature'] = signature
+        if priority is None:
+            priority = LOW if method == 'GET' else HIGH
+        weight, order_count = request_cost(method, endpoint, params)
         
         # Set up headers
         headers = {
@@ -65,41 +97,118 @@ class BinanceClient:
         }
         
         # Log the request details (excluding API credentials)
-        safe_params = {k: v for k, v in params.items() if k not in ['signature']}
-        logger.info(f"Making {method} request to {endpoint} with params: {safe_params}")
+        logger.debug("Making %s request to %s with params: %s", method, endpoint, params)
         
         try:
-            # Make the request
-            if method == 'GET':
-                response = requests.get(url, params=params, headers=headers)
-            elif method == 'POST':
-                # For POST requests, send data as form data
-                response = requests.post(url, data=params, headers=headers)
-            elif method == 'DELETE':
-                response = requests.delete(url, params=params, headers=headers)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+            # A -1021 rejection means the request was not processed, so it is
+            # safe to resync the clock and send it once more with a fresh timestamp
+            for attempt in range(2):
+                self.rate_limiter.acquire(weight, order_count, priority)
+                request_params = self._sign_params(params) if signed else params
+                
+                # Make the request over the pooled session
+                if method in ('GET', 'DELETE'):
+                    response = self.transport.request(method, url, params=request_params, headers=headers)
+                elif method in ('POST', 'PUT'):
+                    # For POST and PUT requests, send data as form data
+                    response = self.transport.request(method, url, data=request_params, headers=headers)
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
+                
+                self.rate_limiter.update_from_response(response.status_code, response.headers)
+                
+                if signed and attempt == 0 and self._is_timestamp_error(response):
+                    logger.warning("Request timestamp outside recvWindow, resyncing server clock")
+                    self.server_clock.sync()
+                    continue
+                break
+            
+            # Log the response (successes are sampled)
+            request_log.record(method, endpoint, response.status_code, response.timing['total_ms'], weight)
+            UPSTREAM_LATENCY.observe(response.timing['total_ms'] / 1000, method, endpoint)
+            if response.status_code >= 400:
+                UPSTREAM_ERRORS.inc(method, endpoint, response.status_code)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response content: %s", response.text)
             
             # Check if request was successful
             response.raise_for_status()
             
-            # Log the response
-            logger.info(f"Received response: {response.status_code}")
-            logger.debug(f"Response content: {response.text}")
-            
             return response.json()
         
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error: {str(e)}")
             if hasattr(e, 'response') and e.response is not None:
                 logger.error(f"Response content: {e.response.text}")
+            else:
+                UPSTREAM_ERRORS.inc(method, endpoint, 0)
+            raise
+    
+    def get_server_time(self):
+        """Get the exchange server time in milliseconds"""
+        try:
+            endpoint = '/fapi/v1/time'
+            return self._make_request('GET', endpoint, signed=False)['serverTime']
+        except Exception as e:
+            logger.error(f"Failed to get server time: {str(e)}")
+            raise
+    
+    def ping(self):
+        """Test connectivity to the REST API; also opens a pooled connection"""
+        try:
+            endpoint = '/fapi/v1/ping'
+            return self._make_request('GET', endpoint, signed=False)
+        except Exception as e:
+            logger.error(f"Failed to ping exchange: {str(e)}")
+            raise
+    
+    def create_listen_key(self):
+        """Create (or return the active) user data stream listen key"""
+        try:
+            endpoint = '/fapi/v1/listenKey'
+            return self._make_request('POST', endpoint, signed=False)['listenKey']
+        except Exception as e:
+            logger.error(f"Failed to create listen key: {str(e)}")
+            raise
+    
+    def keepalive_listen_key(self):
+        """Extend the validity of the listen key by 60 minutes"""
+        try:
+            endpoint = '/fapi/v1/listenKey'
+            return self._make_request('PUT', endpoint, signed=False)
+        except Exception as e:
+            logger.error(f"Failed to keep listen key alive: {str(e)}")
+            raise
+    
+    def close_listen_key(self):
+        """Close the user data stream"""
+        try:
+            endpoint = '/fapi/v1/listenKey'
+            return self._make_request('DELETE', endpoint, signed=False)
+        except Exception as e:
+            logger.error(f"Failed to close listen key: {str(e)}")
             raise
     
-    def get_exchange_info(self):
-        """Get exchange information"""
+    def get_transport_stats(self):
+        """Get connection reuse and per-phase timing statistics of the HTTP transport"""
+        return {
+            'summary': self.transport.get_timing_summary(),
+            'recent': self.transport.get_timings()[-20:],
+            'server_clock': self.server_clock.get_stats(),
+        }
+    
+    def get_rate_limit_stats(self):
+        """Get the remaining request weight / order budget and queued or shed request counts"""
+        return self.rate_limiter.get_stats()
+    
+    def get_exchange_info(self, use_cache=True):
+        """Get exchange information, from the local cache when one is loaded"""
         try:
+            if use_cache and self.exchange_info and self.exchange_info.is_loaded():
+                return self.exchange_info.get_payload()
+            
             endpoint = '/fapi/v1/exchangeInfo'
-            return self._make_request('GET', endpoint)
+            return self._make_request('GET', endpoint, signed=False)
         except Exception as e:
             logger.error(f"Failed to get exchange info: {str(e)}")
             raise
@@ -113,9 +222,27 @@ class BinanceClient:
             logger.error(f"Failed to get account info: {str(e)}")
             raise
     
+    def get_positions(self, symbol=None):
+        """Get position information for a symbol or all symbols"""
+        try:
+            endpoint = '/fapi/v2/positionRisk'
+            params = {}
+            if symbol:
+                params['symbol'] = symbol
+            
+            return self._make_request('GET', endpoint, params)
+        except Exception as e:
+            logger.error(f"Failed to get positions: {str(e)}")
+            raise
+    
     def get_market_price(self, symbol):
         """Get current market price for a symbol"""
         try:
+            if self.ticker_store:
+                price = self.ticker_store.get_price(symbol, max_age=Config.STREAM_MAX_AGE)
+                if price is not None:
+                    return {'symbol': symbol, 'price': price}
+            
             endpoint = '/fapi/v1/ticker/price'
             params = {'symbol': symbol}
             return self._make_request('GET', endpoint, params)
@@ -124,22 +251,228 @@ class BinanceClient:
             raise
     
     def get_market_data(self, symbols=None):
-        """Get market data for all supported symbols or specified ones"""
+        """
+        Get 24hr market data for all supported symbols or specified ones
+        
+        Larger symbol lists are served from a single unsigned bulk ticker request
+        indexed by symbol; small lists and symbols missing from the bulk payload
+        are fetched per symbol concurrently.
+        
+        Args:
+            symbols (list, optional): Symbols to fetch, defaults to Config.SUPPORTED_SYMBOLS
+        
+        Returns:
+            list: 24hr ticker dicts in the order of the requested symbols
+        """
         try:
-            endpoint = '/fapi/v1/ticker/24hr'
-            symbols_to_fetch = symbols or Config.SUPPORTED_SYMBOLS
-            result = []
+            symbols_to_fetch = list(symbols or Config.SUPPORTED_SYMBOLS)
+            tickers_by_symbol = {}
             
-            for symbol in symbols_to_fetch:
-                params = {'symbol': symbol}
-                data = self._make_request('GET', endpoint, params)
-                result.append(data)
+            if len(symbols_to_fetch) >= Config.MARKET_DATA_BULK_MIN_SYMBOLS:
+                try:
+                    tickers_by_symbol = self._get_all_tickers()
+                except Exception as e:
+                    logger.warning(f"Bulk ticker fetch failed, falling back to per-symbol requests: {str(e)}")
             
-            return result
+            missing = [symbol for symbol in symbols_to_fetch if symbol not in tickers_by_symbol]
+            if missing:
+                tickers_by_symbol.update(self._get_tickers_concurrently(missing))
+            
+            return [tickers_by_symbol[symbol] for symbol in symbols_to_fetch if symbol in tickers_by_symbol]
         except Exception as e:
             logger.error(f"Failed to get market data: {str(e)}")
             raise
     
+    def _get_all_tickers(self):
+        """Fetch 24hr tickers for every symbol in one request, indexed by symbol"""
+        tickers = self._make_request('GET', '/fapi/v1/ticker/24hr', signed=False)
+        return {ticker['symbol']: ticker for ticker in tickers}
+    
+    def _get_ticker(self, symbol):
+        """Fetch the 24hr ticker for a single symbol"""
+        return self._make_request('GET', '/fapi/v1/ticker/24hr', {'symbol': symbol}, signed=False)
+    
+    def _get_tickers_concurrently(self, symbols):
+        """Fetch 24hr tickers for several symbols in parallel, indexed by symbol"""
+        result = {}
+        errors = []
+        workers = max(1, min(Config.MARKET_DATA_MAX_WORKERS, len(symbols)))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {symbol: executor.submit(self._get_ticker, symbol) for symbol in symbols}
+            for symbol, future in futures.items():
+                try:
+                    result[symbol] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to get ticker for {symbol}: {str(e)}")
+                    errors.append(e)
+        
+        # Only fail outright when nothing at all could be fetched
+        if errors and not result:
+            raise errors[0]
+        return result
+    
+    def get_order_book(self, symbol, limit=100):
+        """Get an order book depth snapshot for a symbol"""
+        try:
+            endpoint = '/fapi/v1/depth'
+            params = {'symbol': symbol, 'limit': limit}
+            return self._make_request('GET', endpoint, params, signed=False)
+        except Exception as e:
+            logger.error(f"Failed to get order book for {symbol}: {str(e)}")
+            raise
+    
+    def get_klines(self, symbol, interval, start_time=None, end_time=None, limit=500):
+        """
+        Get candlesticks of a symbol, oldest first
+        
+        Args:
+            symbol (str): Trading pair symbol e.g. 'BTCUSDT'
+            interval (str): Kline interval e.g. '1m', '1h'
+            start_time (int, optional): Earliest open time in milliseconds
+            end_time (int, optional): Latest open time in milliseconds
+            limit (int): Number of klines, at most 1500
+            
+        Returns:
+            list: Klines as [open time, open, high, low, close, volume, close time, ...] rows
+        """
+        try:
+            endpoint = '/fapi/v1/klines'
+            params = {'symbol': symbol, 'interval': interval, 'limit': limit}
+            if start_time is not None:
+                params['startTime'] = start_time
+            if end_time is not None:
+                params['endTime'] = end_time
+            return self._make_request('GET', endpoint, params, signed=False)
+        except Exception as e:
+            logger.error(f"Failed to get klines for {symbol}: {str(e)}")
+            raise
+    
+    def get_agg_trades(self, symbol, start_time=None, end_time=None, from_id=None, limit=500):
+        """
+        Get aggregate trades of a symbol, oldest first
+        
+        start_time and end_time may be at most one hour apart; from_id pages
+        by aggregate trade id instead.
+        """
+        try:
+            endpoint = '/fapi/v1/aggTrades'
+            params = {'symbol': symbol, 'limit': limit}
+            if from_id is not None:
+                params['fromId'] = from_id
+            if start_time is not None:
+                params['startTime'] = start_time
+            if end_time is not None:
+                params['endTime'] = end_time
+            return self._make_request('GET', endpoint, params, signed=False)
+        except Exception as e:
+            logger.error(f"Failed to get aggregate trades for {symbol}: {str(e)}")
+            raise
+    
+    def _get_local_book(self, symbol):
+        """Return the synced local order book of a symbol, or None if there isn't one"""
+        if not self.order_books:
+            return None
+        return self.order_books.get_book(symbol)
+    
+    def get_fillable_quantity(self, symbol, side):
+        """Return the quantity a market order can take within Config.MAX_SLIPPAGE_BPS, or None without a local book"""
+        book = self._get_local_book(symbol)
+        if book is None:
+            return None
+        return book.quantity_within(side, Config.MAX_SLIPPAGE_BPS)
+    
+    def _check_book_liquidity(self, symbol, side, quantity):
+        """Reject a market order the local book cannot fill within Config.MAX_SLIPPAGE_BPS"""
+        book = self._get_local_book(symbol)
+        if book is None:
+            return
+        
+        estimate = book.vwap_to_fill(side, float(quantity))
+        if estimate['filled'] < float(quantity):
+            raise ValueError(f"Insufficient liquidity in {symbol} book: only {estimate['filled']} of {quantity} fillable")
+        
+        best = book.best_bid_ask()['ask' if side == 'BUY' else 'bid']
+        slippage_bps = abs(estimate['worst_price'] - best[0]) / best[0] * 10000
+        if slippage_bps > Config.MAX_SLIPPAGE_BPS:
+            raise ValueError(f"Order would move {symbol} {slippage_bps:.1f} bps, above the {Config.MAX_SLIPPAGE_BPS} bps limit")
+        
+        logger.debug(f"Expected {side} fill for {quantity} {symbol}: vwap {estimate['vwap']}")
+    
+    def _round_order(self, symbol, side, order_type, quantity, price=None, stop_price=None):
+        """Round quantity and prices to tick/step sizes and check exchange filters, once exchangeInfo is loaded"""
+        if not (self.exchange_info and self.exchange_info.is_loaded()):
+            return quantity, price, stop_price
+        reference_price = self.ticker_store.get_price(symbol) if self.ticker_store else None
+        prepared = self.exchange_info.prepare_order(
+            symbol, side, order_type, quantity, price, stop_price, reference_price
+        )
+        return prepared['quantity'], prepared['price'], prepared['stop_price']
+    
+    def _build_order_params(self, symbol, side, order_type, quantity, price=None, stop_price=None):
+        """Validate an order and build its request parameters"""
+        # Pre-trade check against live liquidity when a local book is available
+        if order_type == 'MARKET':
+            self._check_book_liquidity(symbol, side, quantity)
+        
+        quantity, price, stop_price = self._round_order(symbol, side, order_type, quantity, price, stop_price)
+        
+        params = {
+            'symbol': symbol,
+            'side': side,
+            'type': order_type,
+            'quantity': str(quantity),  # Convert to string as required by API
+        }
+        
+        # Add price for LIMIT orders
+        if order_type == 'LIMIT':
+            if price is None:
+                raise ValueError("Price is required for LIMIT orders")
+            params['price'] = str(price)  # Convert to string
+            params['timeInForce'] = 'GTC'  # Good Till Cancelled
+        
+        # Add price and stop price for STOP (Stop-Limit) orders
+        if order_type == 'STOP':
+            if stop_price is None or price is None:
+                raise ValueError("Both stop price and limit price are required for STOP orders")
+            params['stopPrice'] = str(stop_price)
+            params['price'] = str(price)
+            params['timeInForce'] = 'GTC'
+        
+        # Add stop price for STOP_MARKET and similar orders
+        if order_type in ['STOP_MARKET', 'TAKE_PROFIT', 'TAKE_PROFIT_MARKET']:
+            if stop_price is None:
+                raise ValueError("Stop price is required for this order type")
+            params['stopPrice'] = str(stop_price)
+        
+        return params
+    
+    def _check_risk(self, params, replaces=None, count_rate=True):
+        """Run the pre-trade risk checks on built order params; returns the reservation to settle, or None"""
+        if not self.risk_engine:
+            return None
+        return self.risk_engine.check_order(
+            params['symbol'], params['side'], params['quantity'], params.get('price'), params.get('stopPrice'), replaces,
+            count_rate,
+        )
+    
+    def _check_batch_risk(self, params, rated, replaces=None):
+        """_check_risk for one order of a batch; a batch takes one order rate token per symbol"""
+        reservation = self._check_risk(params, replaces, count_rate=params['symbol'] not in rated)
+        rated.add(params['symbol'])
+        return reservation
+    
+    def _settle_risk(self, reservation, response=None):
+        """Replace a risk reservation with the exchange's answer; None or an error result releases it"""
+        if reservation is not None:
+            self.risk_engine.on_order_ack(reservation, response)
+    
+    def _track_risk(self, orders):
+        """Feed cancel results to the risk engine"""
+        if self.risk_engine:
+            for order in orders:
+                self.risk_engine.on_order_update(order)
+    
     def place_order(self, symbol, side, order_type, quantity, price=None, stop_price=None):
         """
         Place an order on Binance Futures
@@ -157,39 +490,184 @@ class BinanceClient:
         """
         try:
             endpoint = '/fapi/v1/order'
-            params = {
-                'symbol': symbol,
-                'side': side,
-                'type': order_type,
-                'quantity': str(quantity),  # Convert to string as required by API
-            }
+            with ORDER_ACK_LATENCY.time(order_type):
+                params = self._build_order_params(symbol, side, order_type, quantity, price, stop_price)
+                reservation = self._check_risk(params)
+                
+                # Make the API request
+                try:
+                    response = self._make_request('POST', endpoint, params)
+                except Exception:
+                    self._settle_risk(reservation)
+                    raise
+                self._settle_risk(reservation, response)
+                return response
+        
+        except Exception as e:
+            logger.error(f"Failed to place {order_type} {side} order for {symbol}: {str(e)}")
+            raise
+    
+    def _run_batches(self, items, batch_size, send_batch):
+        """
+        Split items into exchange-sized batches, send them concurrently and
+        return one result per item in the original order
+        
+        send_batch(batch) must return one result per item of the batch. A batch
+        that fails as a whole yields an {'error': ...} result for each of its items.
+        """
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        if not batches:
+            return []
+        
+        results = []
+        workers = max(1, min(Config.BATCH_MAX_WORKERS, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(send_batch, batch) for batch in batches]
+            for batch, future in zip(batches, futures):
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    results.extend({'error': str(e)} for _ in batch)
+        return results
+    
+    def place_batch_orders(self, orders):
+        """
+        Place many orders using the batchOrders endpoint
+        
+        Orders are validated locally first; invalid ones get an error result
+        without being sent. Valid orders are sent in batches of
+        Config.BATCH_ORDER_LIMIT, several batches at a time.
+        
+        Args:
+            orders (list): Dicts with symbol, side, order_type, quantity and
+                optionally price and stop_price, as accepted by place_order
+        
+        Returns:
+            list: One result per order, in order; either the order response
+                or a dict with 'error' (local failure) or 'code'/'msg' (exchange rejection)
+        """
+        try:
+            endpoint = '/fapi/v1/batchOrders'
+            results = [None] * len(orders)
+            to_send = []
+            rated = set()
             
-            # Add price for LIMIT orders
-            if order_type == 'LIMIT':
-                if price is None:
-                    raise ValueError("Price is required for LIMIT orders")
-                params['price'] = str(price)  # Convert to string
-                params['timeInForce'] = 'GTC'  # Good Till Cancelled
+            for i, order in enumerate(orders):
+                try:
+                    params = self._build_order_params(
+                        symbol=order.get('symbol'),
+                        side=order.get('side'),
+                        order_type=order.get('order_type'),
+                        quantity=order.get('quantity'),
+                        price=order.get('price'),
+                        stop_price=order.get('stop_price')
+                    )
+                    to_send.append((i, params, self._check_batch_risk(params, rated)))
+                except Exception as e:
+                    results[i] = {'error': str(e)}
             
-            # Add price and stop price for STOP (Stop-Limit) orders
-            if order_type == 'STOP':
-                if stop_price is None or price is None:
-                    raise ValueError("Both stop price and limit price are required for STOP orders")
-                params['stopPrice'] = str(stop_price)
-                params['price'] = str(price)
-                params['timeInForce'] = 'GTC'
+            def send_batch(batch):
+                params = {'batchOrders': json.dumps([order_params for _, order_params, _ in batch])}
+                return self._make_request('POST', endpoint, params)
             
-            # Add stop price for STOP_MARKET and similar orders
-            if order_type in ['STOP_MARKET', 'TAKE_PROFIT', 'TAKE_PROFIT_MARKET']:
-                if stop_price is None:
-                    raise ValueError("Stop price is required for this order type")
-                params['stopPrice'] = str(stop_price)
+            sent_results = self._run_batches(to_send, Config.BATCH_ORDER_LIMIT, send_batch)
+            for (i, _, reservation), result in zip(to_send, sent_results):
+                self._settle_risk(reservation, result)
+                results[i] = result
             
-            # Make the API request
-            return self._make_request('POST', endpoint, params)
+            logger.info(f"Batch placed {len(to_send)} of {len(orders)} orders")
+            return results
+        except Exception as e:
+            logger.error(f"Failed to place batch orders: {str(e)}")
+            raise
+    
+    def modify_batch_orders(self, orders):
+        """
+        Modify the price and quantity of many open LIMIT orders
         
+        Prices and quantities are rounded and validated like new orders;
+        modifications that fail that or a pre-trade risk check get an error
+        result without being sent.
+        
+        Args:
+            orders (list): Dicts with symbol, order_id, side, quantity and price
+        
+        Returns:
+            list: One result per order, in order
+        """
+        try:
+            endpoint = '/fapi/v1/batchOrders'
+            for order in orders:
+                if not all([order.get('symbol'), order.get('order_id'), order.get('side'),
+                            order.get('quantity'), order.get('price')]):
+                    raise ValueError("symbol, order_id, side, quantity and price are required to modify an order")
+            
+            results = [None] * len(orders)
+            to_send = []
+            rated = set()
+            for i, order in enumerate(orders):
+                try:
+                    quantity, price, _ = self._round_order(
+                        order['symbol'], order['side'], 'LIMIT', order['quantity'], order['price']
+                    )
+                    params = {
+                        'symbol': order['symbol'],
+                        'orderId': order['order_id'],
+                        'side': order['side'],
+                        'quantity': str(quantity),
+                        'price': str(price),
+                    }
+                    to_send.append((i, params, self._check_batch_risk(params, rated, replaces=int(params['orderId']))))
+                except Exception as e:
+                    results[i] = {'error': str(e)}
+            
+            def send_batch(batch):
+                return self._make_request('PUT', endpoint, {'batchOrders': json.dumps([params for _, params, _ in batch])})
+            
+            sent_results = self._run_batches(to_send, Config.BATCH_ORDER_LIMIT, send_batch)
+            for (i, _, reservation), result in zip(to_send, sent_results):
+                self._settle_risk(reservation, result)
+                results[i] = result
+            return results
         except Exception as e:
-            logger.error(f"Failed to place {order_type} {side} order for {symbol}: {str(e)}")
+            logger.error(f"Failed to modify batch orders: {str(e)}")
+            raise
+    
+    def cancel_batch_orders(self, symbol, order_ids):
+        """
+        Cancel many orders of one symbol using the batchOrders endpoint
+        
+        Args:
+            symbol (str): Trading pair symbol e.g. 'BTCUSDT'
+            order_ids (list): Order IDs to cancel
+        
+        Returns:
+            list: One result per order ID, in order
+        """
+        try:
+            endpoint = '/fapi/v1/batchOrders'
+            
+            def send_batch(batch):
+                params = {'symbol': symbol, 'orderIdList': json.dumps([int(order_id) for order_id in batch])}
+                return self._make_request('DELETE', endpoint, params)
+            
+            results = self._run_batches(list(order_ids), Config.BATCH_CANCEL_LIMIT, send_batch)
+            self._track_risk(results)
+            return results
+        except Exception as e:
+            logger.error(f"Failed to cancel batch orders for {symbol}: {str(e)}")
+            raise
+    
+    def cancel_all_orders(self, symbol):
+        """Cancel every open order of a symbol in one request"""
+        try:
+            endpoint = '/fapi/v1/allOpenOrders'
+            response = self._make_request('DELETE', endpoint, {'symbol': symbol})
+            if self.risk_engine:
+                self.risk_engine.on_all_cancelled(symbol)
+            return response
+        except Exception as e:
+            logger.error(f"Failed to cancel all orders for {symbol}: {str(e)}")
             raise
     
     def get_open_orders(self, symbol=None):
@@ -205,13 +683,35 @@ class BinanceClient:
             logger.error(f"Failed to get open orders: {str(e)}")
             raise
     
-    def get_order_history(self, symbol=None, limit=50):
-        """Get order history for a symbol or all symbols"""
+    def get_order(self, symbol, order_id):
+        """Get the current state of one order"""
+        try:
+            endpoint = '/fapi/v1/order'
+            params = {'symbol': symbol, 'orderId': order_id}
+            
+            return self._make_request('GET', endpoint, params)
+        except Exception as e:
+            logger.error(f"Failed to get order {order_id}: {str(e)}")
+            raise
+    
+    def get_order_history(self, symbol=None, limit=50, order_id=None, start_time=None, end_time=None):
+        """
+        Get order history for a symbol or all symbols
+        
+        With order_id, returns orders with an ID >= order_id (oldest first),
+        which allows paging through the full history.
+        """
         try:
             endpoint = '/fapi/v1/allOrders'
             params = {'limit': limit}
             if symbol:
                 params['symbol'] = symbol
+            if order_id is not None:
+                params['orderId'] = order_id
+            if start_time is not None:
+                params['startTime'] = start_time
+            if end_time is not None:
+                params['endTime'] = end_time
             
             return self._make_request('GET', endpoint, params)
         except Exception as e:
@@ -231,7 +731,9 @@ class BinanceClient:
             else:
                 raise ValueError("Either order_id or orig_client_order_id must be provided")
             
-            return self._make_request('DELETE', endpoint, params)
+            response = self._make_request('DELETE', endpoint, params)
+            self._track_risk([response])
+            return response
         except Exception as e:
             logger.error(f"Failed to cancel order for {symbol}: {str(e)}")
             raise
@@ -277,6 +779,9 @@ class BinanceClient:
         
         This executes multiple smaller orders over a specified time period
         to minimize market impact and achieve an average execution price.
+        When a local order book is available, a slice larger than the liquidity
+        within Config.MAX_SLIPPAGE_BPS is cut down and the rest is carried over
+        to the following slices.
         
         Args:
             symbol (str): Trading pair symbol e.g. 'BTCUSDT'
@@ -298,18 +803,30 @@ class BinanceClient:
             
             # Initialize response list
             responses = []
+            carry = 0.0
             
             # Execute orders at calculated intervals
             for i in range(num_orders):
-                response = self.place_order(
-                    symbol=symbol,
-                    side=side,
-                    order_type='MARKET',
-                    quantity=order_size
-                )
-                responses.append(response)
+                target = order_size + carry
+                quantity = target
+                
+                # Size all but the last slice to the liquidity currently in the book
+                available = self.get_fillable_quantity(symbol, side) if i < num_orders - 1 else None
+                if available is not None and available < target:
+                    quantity = available
+                    logger.info(f"TWAP slice {i+1}/{num_orders} reduced to {quantity} by book liquidity")
+                carry = target - quantity
                 
-                logger.info(f"TWAP order {i+1}/{num_orders} placed successfully")
+                if quantity > 0:
+                    response = self.place_order(
+                        symbol=symbol,
+                        side=side,
+                        order_type='MARKET',
+                        quantity=quantity
+                    )
+                    responses.append(response)
+                    
+                    logger.info(f"TWAP order {i+1}/{num_orders} placed successfully")
                 
                 # Sleep between orders (except the last one)
                 if i < num_orders - 1:
@@ -17,6 +17,113 @@ class Config:
     ]
     # Order types
     ORDER_TYPES = ['MARKET', 'LIMIT', 'STOP', 'STOP_MARKET', 'TAKE_PROFIT', 'TAKE_PROFIT_MARKET']
+    # HTTP transport (pooled keep-alive session used for all REST calls)
+    HTTP_POOL_SIZE = 10
+    HTTP_MAX_RETRIES = 3
+    HTTP_BACKOFF_FACTOR = 0.3  # seconds; doubles on every retry
+    HTTP_CONNECT_TIMEOUT = 3.05
+    HTTP_READ_TIMEOUT = 10
+    HTTP_TIMING_HISTORY = 500  # number of recent request timings kept in memory
+    # Request signing
+    RECV_WINDOW = 5000  # ms a signed request stays valid on the exchange
+    CLOCK_SYNC_SAMPLES = 5  # server time samples per offset estimate
+    CLOCK_SYNC_INTERVAL = 300  # seconds between offset estimates
+    # Client-side rate limit governor; keys match the X-MBX-* response header suffixes
+    RATE_LIMIT_WEIGHT = {'1m': (2400, 60)}  # label: (limit, interval seconds)
+    RATE_LIMIT_ORDERS = {'10s': (300, 10), '1m': (1200, 60)}
+    RATE_LIMIT_LOW_PRIORITY_RESERVE = 0.2  # share of the weight budget reads may not use
+    RATE_LIMIT_MAX_WAIT = {'high': 10, 'low': 1}  # seconds queued before a request is shed
+    # asyncio client (async_binance_client.py)
+    ASYNC_MAX_CONCURRENCY = 8  # default limit of gather_limited
+    # Market data
+    MARKET_DATA_BULK_MIN_SYMBOLS = 3  # use the all-symbols ticker for lists at least this long
+    MARKET_DATA_MAX_WORKERS = 8  # concurrency of the per-symbol fallback
+    # WebSocket market data stream
+    STREAM_ENABLED = True
+    STREAM_URL = 'wss://stream.binancefuture.com'
+    STREAM_MAX_AGE = 10  # seconds before a streamed ticker is considered stale
+    STREAM_PING_INTERVAL = 60
+    STREAM_PING_TIMEOUT = 10
+    STREAM_RECONNECT_MAX_DELAY = 60
+    # Local order books maintained from depth diff streams
+    ORDER_BOOK_ENABLED = True
+    ORDER_BOOK_UPDATE_SPEED = '100ms'
+    ORDER_BOOK_SNAPSHOT_LIMIT = 1000
+    MAX_SLIPPAGE_BPS = 50  # market orders that would move the price further are rejected
+    # User data stream (orders, fills, balances, positions)
+    USER_STREAM_ENABLED = True
+    USER_STREAM_KEEPALIVE_INTERVAL = 1800  # seconds; listen keys expire after 60 minutes
+    USER_STREAM_RECONCILE_INTERVAL = 60  # seconds between REST reconciliations
+    USER_STREAM_MAX_ORDERS = 200  # recent orders kept per symbol
+    USER_STREAM_MAX_FILLS = 200  # recent fills kept per symbol
+    # Persistent order history (SQLite)
+    HISTORY_ENABLED = True
+    HISTORY_DB_FILE = 'order_history.db'
+    HISTORY_SYNC_INTERVAL = 60  # seconds between incremental syncs
+    HISTORY_PAGE_SIZE = 1000  # orders per /fapi/v1/allOrders page (exchange maximum)
+    # Historical klines / aggregate trades cached on disk as NumPy arrays
+    MARKET_HISTORY_DIR = 'market_data'
+    MARKET_HISTORY_MAX_WORKERS = 4  # days downloaded concurrently
+    MARKET_HISTORY_KLINE_LIMIT = 1500  # klines per /fapi/v1/klines page (exchange maximum)
+    MARKET_HISTORY_AGG_TRADE_LIMIT = 1000  # trades per /fapi/v1/aggTrades page (exchange maximum)
+    MARKET_HISTORY_MAX_RANGE = 31  # days a single /api/klines request may span
+    # Exchange metadata (exchangeInfo) cache
+    EXCHANGE_INFO_CACHE_FILE = 'exchange_info_cache.json'
+    EXCHANGE_INFO_REFRESH_INTERVAL = 3600  # seconds
+    # Batch order endpoints
+    BATCH_ORDER_LIMIT = 5  # orders per /fapi/v1/batchOrders place/modify request
+    BATCH_CANCEL_LIMIT = 10  # order IDs per batch cancel request
+    BATCH_MAX_WORKERS = 4  # batches sent concurrently
+    # Algorithmic order execution engine
+    EXECUTION_MAX_WORKERS = 4  # threads sending slices of all running jobs
+    EXECUTION_MAX_FINISHED_JOBS = 200  # finished jobs kept for inspection
+    # Execution quality analytics of finished algorithmic orders
+    ANALYTICS_ENABLED = True
+    ANALYTICS_DB_FILE = 'execution_analytics.db'
+    ANALYTICS_KLINE_INTERVAL = '1m'  # market klines used for the TWAP/VWAP benchmarks and participation
+    # Pre-trade risk engine; 'default' limits apply to every symbol unless overridden, None disables a check
+    RISK_ENABLED = True
+    RISK_LIMITS = {
+        'default': {
+            'max_position': None,  # base asset quantity, long or short, counting open orders on the same side
+            'max_order_notional': 50000,  # quote asset
+            'max_symbol_notional': 200000,  # position plus open orders, quote asset
+            'price_band_bps': 500,  # limit/stop prices further than this from the last price are rejected
+            'max_orders': (10, 1),  # (orders, seconds) per symbol; a batch request counts once
+        },
+    }
+    RISK_MAX_MARGIN_USAGE = 0.8  # share of the margin balance positions and open orders may use
+    RISK_SYNC_INTERVAL = 60  # seconds between full resyncs of positions and open orders
+    RISK_FINISHED_ORDERS = 1000  # finished order IDs remembered to ignore late updates
+    # Dashboard snapshot endpoint
+    DASHBOARD_MAX_WORKERS = 8  # threads fetching dashboard sections concurrently
+    DASHBOARD_ORDER_LIMIT = 50  # recent orders included in the snapshot
+    # Server-Sent Events push channel to browsers
+    PUSH_INTERVAL = 1  # seconds between polls of the shared feed
+    PUSH_CLIENT_QUEUE_SIZE = 20  # pending deltas per client before it is resynced with a snapshot
+    PUSH_HEARTBEAT_INTERVAL = 15  # seconds between keep-alive comments
+    # Server-side response cache (seconds per endpoint)
+    CACHE_TTLS = {
+        'market-data': 2,
+        'account': 5,
+        'orders': 5,
+        'open-orders': 2,
+        'positions': 5,
+    }
+    CACHE_MAX_ENTRIES = 1000
+    # Shared exchange gateway process for all gunicorn workers (python -m gateway)
+    GATEWAY_ENABLED = os.environ.get('GATEWAY_ENABLED', 'false').lower() == 'true'
+    GATEWAY_SOCKET = os.environ.get('GATEWAY_SOCKET') or '/tmp/trading_bot_gateway.sock'
+    GATEWAY_TIMEOUT = 30  # seconds a worker waits for a gateway reply
+    # Metrics
+    PROFILING_SAMPLE_EVERY = 10  # when profiling is switched on, profile one request in N
+    # Background warm-up after startup; /readyz answers 503 until its required steps succeed
+    WARMUP_RETRY_INTERVAL = 5  # seconds between attempts of a failed required step
+    WARMUP_CONNECTIONS = 4  # keep-alive REST connections opened before the first request
     # Logging
     LOG_LEVEL = 'INFO'
-    LOG_FILE = 'trading_bot.log'
\ No newline at end of file
+    LOG_FILE = 'trading_bot.log'
+    LOG_FORMAT = 'json'  # 'json' (one object per line) or 'text'
+    LOG_CONSOLE = True
+    LOG_QUEUE_SIZE = 10000  # records waiting for the writer thread before new ones are dropped
+    LOG_REQUEST_SAMPLE_EVERY = 100  # successful REST calls are logged at INFO once every N calls
\ No newline at end of file
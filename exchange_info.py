@@ -0,0 +1,241 @@
+import json
+import os
+import threading
+import time
+from decimal import Decimal, InvalidOperation, ROUND_DOWN, ROUND_UP
+
+from config import Config
+from utils.logger import logger
+
+
+def _round_to_step(value, step, rounding):
+    """Round a Decimal to a multiple of step"""
+    if not step:
+        return value
+    return (value / step).to_integral_value(rounding=rounding) * step
+
+
+def _to_decimal(value, label):
+    """Convert a float, int or numeric string to a Decimal; raise ValueError for anything else"""
+    try:
+        value = Decimal(str(value))
+    except InvalidOperation:
+        value = None
+    if value is None or not value.is_finite():
+        raise ValueError(f"{label} must be a number")
+    return value
+
+
+def _to_str(value):
+    """Format a Decimal as plain notation without trailing zeros"""
+    return format(value.normalize(), 'f')
+
+
+class SymbolRules:
+    """Trading rules of one symbol taken from its exchangeInfo filters"""
+
+    __slots__ = (
+        'symbol', 'status', 'tick_size', 'min_price', 'max_price', 'step_size', 'min_qty',
+        'max_qty', 'market_step_size', 'market_min_qty', 'market_max_qty', 'min_notional',
+    )
+
+    def __init__(self, symbol_info):
+        self.symbol = symbol_info['symbol']
+        self.status = symbol_info.get('status')
+        self.tick_size = self.min_price = self.max_price = None
+        self.step_size = self.min_qty = self.max_qty = None
+        self.market_step_size = self.market_min_qty = self.market_max_qty = None
+        self.min_notional = None
+
+        for f in symbol_info.get('filters', []):
+            filter_type = f.get('filterType')
+            if filter_type == 'PRICE_FILTER':
+                self.tick_size = Decimal(f['tickSize'])
+                self.min_price = Decimal(f['minPrice'])
+                self.max_price = Decimal(f['maxPrice'])
+            elif filter_type == 'LOT_SIZE':
+                self.step_size = Decimal(f['stepSize'])
+                self.min_qty = Decimal(f['minQty'])
+                self.max_qty = Decimal(f['maxQty'])
+            elif filter_type == 'MARKET_LOT_SIZE':
+                self.market_step_size = Decimal(f['stepSize'])
+                self.market_min_qty = Decimal(f['minQty'])
+                self.market_max_qty = Decimal(f['maxQty'])
+            elif filter_type == 'MIN_NOTIONAL':
+                self.min_notional = Decimal(f.get('notional') or f.get('minNotional'))
+
+    def round_price(self, price, side, label='Price'):
+        """Round a price to the tick size, never in the trader's disfavour (BUY down, SELL up)"""
+        rounding = ROUND_DOWN if side == 'BUY' else ROUND_UP
+        return _round_to_step(_to_decimal(price, label), self.tick_size, rounding)
+
+    def round_quantity(self, quantity, market=False):
+        """Round a quantity down to the (market) lot step size"""
+        step = self.market_step_size if market and self.market_step_size else self.step_size
+        return _round_to_step(_to_decimal(quantity, 'Quantity'), step, ROUND_DOWN)
+
+    def check_price(self, price, label='Price'):
+        """Raise ValueError if a rounded price is outside the price filter"""
+        if price <= 0:
+            raise ValueError(f"{label} for {self.symbol} rounds to {_to_str(price)} with tick size {_to_str(self.tick_size)}")
+        if self.min_price and price < self.min_price:
+            raise ValueError(f"{label} {_to_str(price)} is below the {self.symbol} minimum of {_to_str(self.min_price)}")
+        if self.max_price and price > self.max_price:
+            raise ValueError(f"{label} {_to_str(price)} is above the {self.symbol} maximum of {_to_str(self.max_price)}")
+
+    def check_quantity(self, quantity, market=False):
+        """Raise ValueError if a rounded quantity is outside the lot size filter"""
+        min_qty = self.market_min_qty if market and self.market_min_qty is not None else self.min_qty
+        max_qty = self.market_max_qty if market and self.market_max_qty is not None else self.max_qty
+        if min_qty is not None and quantity < min_qty:
+            raise ValueError(f"Quantity {_to_str(quantity)} is below the {self.symbol} minimum of {_to_str(min_qty)}")
+        if max_qty is not None and quantity > max_qty:
+            raise ValueError(f"Quantity {_to_str(quantity)} is above the {self.symbol} maximum of {_to_str(max_qty)}")
+
+
+class ExchangeInfoCache:
+    """
+    exchangeInfo loaded once, indexed by symbol and refreshed in the background
+
+    The last payload is persisted to Config.EXCHANGE_INFO_CACHE_FILE so a
+    restart can validate orders before the first refresh completes.
+    """
+
+    def __init__(self, binance_client, cache_file=None, refresh_interval=None):
+        self.binance_client = binance_client
+        self.cache_file = cache_file or Config.EXCHANGE_INFO_CACHE_FILE
+        self.refresh_interval = refresh_interval or Config.EXCHANGE_INFO_REFRESH_INTERVAL
+        self._payload = None
+        self._rules = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _index(self, payload, loaded_at):
+        """Swap in a new payload and its per-symbol rules"""
+        rules = {info['symbol']: SymbolRules(info) for info in payload.get('symbols', [])}
+        with self._lock:
+            self._payload = payload
+            self._rules = rules
+            self._loaded_at = loaded_at
+
+    def load(self):
+        """Load from the disk cache if present, otherwise fetch from the exchange"""
+        try:
+            with open(self.cache_file) as f:
+                cached = json.load(f)
+            self._index(cached['payload'], cached['fetched_at'])
+            logger.info(f"Loaded exchange info for {len(self._rules)} symbols from {self.cache_file}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable exchange info cache {self.cache_file}: {str(e)}")
+
+        if not self._payload:
+            self.refresh()
+
+    def refresh(self):
+        """Fetch exchangeInfo, re-index it and persist it to disk"""
+        payload = self.binance_client.get_exchange_info(use_cache=False)
+        fetched_at = time.time()
+        self._index(payload, fetched_at)
+        logger.info(f"Refreshed exchange info for {len(self._rules)} symbols")
+
+        try:
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump({'fetched_at': fetched_at, 'payload': payload}, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Failed to persist exchange info cache: {str(e)}")
+
+    def start(self):
+        """Refresh in a daemon thread every refresh_interval seconds"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='exchange-info', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            # A payload loaded from disk may already be due for a refresh
+            wait = max(self._loaded_at + self.refresh_interval - time.time(), 0)
+            if self._stop.wait(wait):
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Failed to refresh exchange info: {str(e)}")
+                self._stop.wait(60)
+
+    def is_loaded(self):
+        return self._payload is not None
+
+    def get_payload(self):
+        """Return the full exchangeInfo payload, or None before the first load"""
+        with self._lock:
+            return self._payload
+
+    def get_rules(self, symbol):
+        """Return the SymbolRules of a symbol, or None if unknown"""
+        with self._lock:
+            return self._rules.get(symbol)
+
+    def prepare_order(self, symbol, side, order_type, quantity, price=None, stop_price=None, reference_price=None):
+        """
+        Round an order to the symbol's tick and step sizes and validate it locally
+
+        Args:
+            symbol (str): Trading pair symbol e.g. 'BTCUSDT'
+            side (str): 'BUY' or 'SELL'
+            order_type (str): Order type, MARKET orders use the market lot size
+            quantity (float): Order quantity
+            price (float, optional): Limit price
+            stop_price (float, optional): Stop price
+            reference_price (float, optional): Current price used for the
+                min-notional check of orders without a limit price
+
+        Returns:
+            dict: 'quantity', 'price' and 'stop_price' as exchange-ready strings (None when not given)
+
+        Raises:
+            ValueError: If the symbol is unknown or not trading, or a filter is violated
+        """
+        rules = self.get_rules(symbol)
+        if rules is None:
+            raise ValueError(f"Unknown symbol {symbol}")
+        if rules.status and rules.status != 'TRADING':
+            raise ValueError(f"{symbol} is not trading (status {rules.status})")
+
+        market = order_type in ('MARKET', 'STOP_MARKET', 'TAKE_PROFIT_MARKET')
+        rounded_quantity = rules.round_quantity(quantity, market=market)
+        rules.check_quantity(rounded_quantity, market=market)
+
+        rounded_price = None
+        if price is not None:
+            rounded_price = rules.round_price(price, side)
+            rules.check_price(rounded_price)
+
+        rounded_stop = None
+        if stop_price is not None:
+            rounded_stop = rules.round_price(stop_price, side, label='Stop price')
+            rules.check_price(rounded_stop, label='Stop price')
+
+        notional_price = rounded_price or rounded_stop
+        if notional_price is None and reference_price is not None:
+            notional_price = Decimal(str(reference_price))
+        if rules.min_notional and notional_price is not None:
+            notional = notional_price * rounded_quantity
+            if notional < rules.min_notional:
+                raise ValueError(f"Order notional {_to_str(notional)} is below the {symbol} minimum of {_to_str(rules.min_notional)}")
+
+        return {
+            'quantity': _to_str(rounded_quantity),
+            'price': _to_str(rounded_price) if rounded_price is not None else None,
+            'stop_price': _to_str(rounded_stop) if rounded_stop is not None else None,
+        }
@@ -0,0 +1,274 @@
+import json
+import math
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from utils.logger import logger
+
+# numpy (and market_history, which needs it) is imported where it is used,
+# so importing the app does not pay for it before the first analyzed job
+
+_METRICS = (
+    'shortfall_bps', 'slice_slippage_bps', 'twap_slippage_bps', 'vwap_slippage_bps',
+    'participation_rate', 'fill_ratio', 'mean_drift_secs', 'max_drift_secs',
+)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS algo_runs (
+    job_id TEXT PRIMARY KEY,
+    algo TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    total_quantity REAL NOT NULL,
+    filled_quantity REAL NOT NULL,
+    arrival_price REAL,
+    avg_fill_price REAL,
+    {', '.join(f'{name} REAL' for name in _METRICS)},
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_algo_runs_symbol_created ON algo_runs (symbol, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_algo_runs_created ON algo_runs (created_at DESC);
+"""
+
+
+def _column(slices, key):
+    """One slice field as a float array, NaN where it is missing"""
+    import numpy as np
+    return np.array([s.get(key) if s.get(key) is not None else np.nan for s in slices], dtype='f8')
+
+
+def _bps(sign, price, benchmark):
+    if price is None or not benchmark or math.isnan(benchmark):
+        return None
+    return float(sign * (price - benchmark) / benchmark * 10000)
+
+
+def compute_metrics(job, klines=None):
+    """
+    Execution quality of an algorithmic order
+
+    Costs are signed so that positive always means worse than the benchmark
+    (paid more on a buy, received less on a sell), in basis points:
+      - shortfall_bps: implementation shortfall against the arrival price,
+        including the opportunity cost of the unfilled quantity marked at
+        the last observed price
+      - slice_slippage_bps: quantity-weighted fill price vs the reference
+        price seen just before each slice was sent
+      - twap_slippage_bps / vwap_slippage_bps: average fill price vs the
+        market TWAP / VWAP over the job's lifetime, from klines when given
+        (TWAP falls back to the slice reference prices)
+      - participation_rate: filled quantity over the market volume in the klines
+      - mean_drift_secs / max_drift_secs: slice send time vs schedule
+
+    Args:
+        job (dict): A job as returned by ExecutionEngine.get_job
+        klines (numpy.ndarray, optional): KLINE_DTYPE klines covering the job
+
+    Returns:
+        dict: Benchmarks and metrics; values that cannot be computed are None
+    """
+    import numpy as np
+    from market_history import rolling_vwap
+
+    slices = job['slices']
+    sign = 1 if job['side'] == 'BUY' else -1
+    arrival = job.get('arrival_price')
+
+    qty = np.nan_to_num(_column(slices, 'executed_qty'))
+    fill = _column(slices, 'fill_price')
+    market = _column(slices, 'market_price')
+    drift = _column(slices, 'drift_secs')
+
+    filled = qty > 0
+    filled &= ~np.isnan(fill)
+    filled_qty = float(qty[filled].sum())
+    notional = float(np.dot(qty[filled], fill[filled]))
+    avg_fill = notional / filled_qty if filled_qty else None
+
+    # Implementation shortfall: paid vs arrival on the filled part, plus the
+    # move from arrival to the last seen price on what never filled
+    shortfall = None
+    if arrival:
+        seen = market[~np.isnan(market)]
+        last_price = seen[-1] if len(seen) else (avg_fill or arrival)
+        unfilled = max(job['total_quantity'] - filled_qty, 0.0)
+        cost = sign * (notional - arrival * filled_qty) + sign * (last_price - arrival) * unfilled
+        shortfall = float(cost / (arrival * job['total_quantity']) * 10000)
+
+    priced = filled & ~np.isnan(market)
+    slice_slippage = None
+    if priced.any():
+        per_slice = sign * (fill[priced] - market[priced]) / market[priced] * 10000
+        slice_slippage = float(np.average(per_slice, weights=qty[priced]))
+
+    twap = vwap = market_volume = None
+    if klines is not None and len(klines):
+        twap = float(klines['close'].mean())
+        market_volume = float(klines['volume'].sum())
+        vwap = float(rolling_vwap(klines)[-1]) if market_volume else None
+    elif not np.isnan(market).all():
+        twap = float(np.nanmean(market))
+
+    abs_drift = np.abs(drift[~np.isnan(drift)])
+    return {
+        'arrival_price': arrival,
+        'avg_fill_price': avg_fill,
+        'filled_quantity': filled_qty,
+        'fill_ratio': filled_qty / job['total_quantity'] if job['total_quantity'] else None,
+        'twap_benchmark': twap,
+        'vwap_benchmark': vwap,
+        'shortfall_bps': shortfall,
+        'slice_slippage_bps': slice_slippage,
+        'twap_slippage_bps': _bps(sign, avg_fill, twap),
+        'vwap_slippage_bps': _bps(sign, avg_fill, vwap),
+        'participation_rate': filled_qty / market_volume if market_volume else None,
+        'mean_drift_secs': float(abs_drift.mean()) if len(abs_drift) else None,
+        'max_drift_secs': float(abs_drift.max()) if len(abs_drift) else None,
+    }
+
+
+class ExecutionAnalyticsStore:
+    """
+    Execution quality of finished algorithmic orders, kept in SQLite
+
+    on_job_finished is an ExecutionEngine listener. It runs on the slice
+    or request thread that finished the job, so the metrics (which may
+    fetch klines) are computed on a worker thread and each run is stored
+    with its metrics as columns and the full job as JSON.
+    """
+
+    def __init__(self, market_history=None, path=None):
+        self.market_history = market_history
+        self.path = path or Config.ANALYTICS_DB_FILE
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='execution-analytics')
+
+    def _klines_for(self, job):
+        """Market klines covering the job's lifetime, or None"""
+        if not self.market_history or not job.get('finished_at'):
+            return None
+        from market_history import interval_ms
+        interval = Config.ANALYTICS_KLINE_INTERVAL
+        start = int(job['created_at'] * 1000)
+        try:
+            return self.market_history.get_klines(
+                job['symbol'], interval, start - start % interval_ms(interval), int(job['finished_at'] * 1000) + 1
+            )
+        except Exception as e:
+            logger.warning(f"No market klines for job {job['job_id']}: {str(e)}")
+            return None
+
+    def analyze(self, job):
+        """Return the metrics of a job (running or finished)"""
+        return compute_metrics(job, self._klines_for(job))
+
+    def on_job_finished(self, job):
+        """ExecutionEngine listener; records the job in the background"""
+        self._executor.submit(self._record_safely, job.to_dict())
+
+    def _record_safely(self, job):
+        try:
+            self.record(job)
+        except Exception as e:
+            logger.error(f"Failed to record analytics for job {job['job_id']}: {str(e)}")
+
+    def record(self, job):
+        """Compute and store the metrics of a finished job; returns them"""
+        metrics = self.analyze(job)
+        with self._lock:
+            self._conn.execute(
+                f"""
+                INSERT OR REPLACE INTO algo_runs (
+                    job_id, algo, symbol, side, status, created_at, finished_at, total_quantity,
+                    filled_quantity, arrival_price, avg_fill_price, {', '.join(_METRICS)}, payload
+                ) VALUES ({', '.join('?' for _ in range(12 + len(_METRICS)))})
+                """,
+                (
+                    job['job_id'], job['algo'], job['symbol'], job['side'], job['status'],
+                    job['created_at'], job['finished_at'], job['total_quantity'],
+                    metrics['filled_quantity'], metrics['arrival_price'], metrics['avg_fill_price'],
+                    *(metrics[name] for name in _METRICS),
+                    json.dumps({'job': job, 'metrics': metrics}),
+                ),
+            )
+            self._conn.commit()
+        logger.info(f"Job {job['job_id']} shortfall: {metrics['shortfall_bps']} bps")
+        return metrics
+
+    def get_run(self, job_id):
+        """Return a stored run as {'job': ..., 'metrics': ...}; raises KeyError if unknown"""
+        with self._lock:
+            row = self._conn.execute('SELECT payload FROM algo_runs WHERE job_id = ?', (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(job_id)
+        return json.loads(row[0])
+
+    def _where(self, symbol, algo, since):
+        clauses = []
+        params = []
+        if symbol:
+            clauses.append('symbol = ?')
+            params.append(symbol)
+        if algo:
+            clauses.append('algo = ?')
+            params.append(algo)
+        if since is not None:
+            clauses.append('created_at >= ?')
+            params.append(since)
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+    def query_runs(self, symbol=None, algo=None, since=None, limit=50, offset=0):
+        """Return stored runs with their metrics (without slices), newest first"""
+        where, params = self._where(symbol, algo, since)
+        columns = ('job_id', 'algo', 'symbol', 'side', 'status', 'created_at', 'finished_at',
+                   'total_quantity', 'filled_quantity', 'arrival_price', 'avg_fill_price') + _METRICS
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(columns)} FROM algo_runs {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def aggregate(self, symbol=None, algo=None, since=None):
+        """
+        Summarize every matching run
+
+        Returns the run count and, per metric, the mean, median, 95th
+        percentile and quantity-weighted mean over the runs that have it.
+        """
+        import numpy as np
+
+        where, params = self._where(symbol, algo, since)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT filled_quantity, {', '.join(_METRICS)} FROM algo_runs {where}", params
+            ).fetchall()
+
+        summary = {'runs': len(rows), 'metrics': {}}
+        if not rows:
+            return summary
+        # None becomes NaN, so every statistic is one vectorized call per metric
+        values = np.array(rows, dtype='f8')
+        weights = values[:, 0]
+        for i, name in enumerate(_METRICS, start=1):
+            column = values[:, i]
+            present = ~np.isnan(column)
+            if not present.any():
+                continue
+            weight = weights[present]
+            summary['metrics'][name] = {
+                'count': int(present.sum()),
+                'mean': float(column[present].mean()),
+                'median': float(np.median(column[present])),
+                'p95': float(np.percentile(column[present], 95)),
+                'weighted_mean': float(np.average(column[present], weights=weight)) if weight.sum() else None,
+            }
+        return summary
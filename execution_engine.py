@@ -0,0 +1,373 @@
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from utils.logger import logger
+
+# Job states
+PENDING = 'PENDING'
+RUNNING = 'RUNNING'
+PAUSED = 'PAUSED'
+CANCELLED = 'CANCELLED'
+COMPLETED = 'COMPLETED'
+FAILED = 'FAILED'
+
+FINISHED_STATES = (CANCELLED, COMPLETED, FAILED)
+
+
+class AlgoJob:
+    """State and progress of one algorithmic order"""
+
+    def __init__(self, algo, symbol, side, total_quantity, num_slices, interval_secs, start_at):
+        self.id = uuid.uuid4().hex[:12]
+        self.algo = algo
+        self.symbol = symbol
+        self.side = side
+        self.total_quantity = float(total_quantity)
+        self.num_slices = num_slices
+        self.interval_secs = interval_secs
+        self.start_at = start_at
+        self.status = PENDING
+        self.created_at = time.time()
+        self.finished_at = None
+        self.error = None
+        self.arrival_price = None  # reference price when the job was submitted
+        self.paused_at = None
+        self.epoch = 0  # bumped on resume, invalidates slices scheduled before
+        self.next_slice = 0
+        self.in_flight = False
+        self.carry = 0.0
+        self.slices = []
+        self.filled_quantity = 0.0
+        self.filled_notional = 0.0
+
+    @property
+    def slice_quantity(self):
+        return self.total_quantity / self.num_slices
+
+    @property
+    def avg_fill_price(self):
+        return self.filled_notional / self.filled_quantity if self.filled_quantity else None
+
+    def to_dict(self):
+        """Return a JSON-serializable view of the job"""
+        sent = sum(s['quantity'] for s in self.slices)
+        return {
+            'job_id': self.id,
+            'algo': self.algo,
+            'symbol': self.symbol,
+            'side': self.side,
+            'status': self.status,
+            'total_quantity': self.total_quantity,
+            'num_slices': self.num_slices,
+            'interval_secs': self.interval_secs,
+            'slices_done': len(self.slices),
+            'sent_quantity': sent,
+            'filled_quantity': self.filled_quantity,
+            'avg_fill_price': self.avg_fill_price,
+            'arrival_price': self.arrival_price,
+            'progress': sent / self.total_quantity if self.total_quantity else 0.0,
+            'max_drift_secs': max((s['drift_secs'] for s in self.slices), default=0.0),
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+            'slices': list(self.slices),
+        }
+
+
+class ExecutionEngine:
+    """
+    Runs many algorithmic orders concurrently off the request thread
+
+    One scheduler thread keeps a heap of due slices and hands them to a
+    small worker pool, so no Flask worker ever sleeps between slices. Slice
+    i of a job is due at start + i * interval, so a late slice never pushes
+    back the ones after it. The clock is injectable: with clock set to a
+    simulated time source, call run_pending() instead of start().
+    """
+
+    def __init__(self, binance_client, clock=time.monotonic, max_workers=None):
+        self.binance_client = binance_client
+        self.clock = clock
+        self.jobs = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.EXECUTION_MAX_WORKERS,
+            thread_name_prefix='algo-slice',
+        )
+        self._thread = None
+        self._stopped = False
+        self.listeners = []  # callables notified with the job when it finishes
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='execution-engine', daemon=True)
+        self._thread.start()
+        logger.info("Execution engine started")
+
+    def stop(self):
+        """Stop scheduling new slices; slices already sent complete normally"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+
+    def submit_twap(self, symbol, side, total_quantity, num_orders, duration_mins):
+        """
+        Schedule a TWAP order and return immediately
+
+        Args:
+            symbol (str): Trading pair symbol e.g. 'BTCUSDT'
+            side (str): 'BUY' or 'SELL'
+            total_quantity (float): Total order quantity
+            num_orders (int): Number of slices
+            duration_mins (float): Duration in minutes over which to execute
+
+        Returns:
+            dict: The new job
+        """
+        if num_orders < 1:
+            raise ValueError("num_orders must be at least 1")
+        if float(total_quantity) <= 0:
+            raise ValueError("total_quantity must be positive")
+
+        interval_secs = (float(duration_mins) * 60) / num_orders
+        job = AlgoJob('TWAP', symbol, side, total_quantity, num_orders, interval_secs, self.clock())
+        job.arrival_price = self._reference_price(symbol)
+
+        with self._condition:
+            self._prune_finished()
+            self.jobs[job.id] = job
+            job.status = RUNNING
+            self._schedule(job, 0, job.start_at)
+            self._condition.notify()
+
+        logger.info(f"TWAP job {job.id} scheduled: {side} {total_quantity} {symbol} "
+                    f"in {num_orders} slices every {interval_secs:.1f}s")
+        return job.to_dict()
+
+    def get_job(self, job_id):
+        """Return a job by ID; raises KeyError if unknown"""
+        with self._condition:
+            return self.jobs[job_id].to_dict()
+
+    def list_jobs(self):
+        """Return all known jobs, newest first"""
+        with self._condition:
+            jobs = sorted(self.jobs.values(), key=lambda job: job.created_at, reverse=True)
+            return [job.to_dict() for job in jobs]
+
+    def cancel_job(self, job_id):
+        """Cancel a running or paused job; slices already sent are not reverted"""
+        with self._condition:
+            job = self.jobs[job_id]
+            if job.status in FINISHED_STATES:
+                raise ValueError(f"Job {job_id} is already {job.status}")
+            if job.in_flight:
+                # The slice being sent finishes the job once its fill is recorded
+                job.status = CANCELLED
+                return job.to_dict()
+            self._finish(job, CANCELLED)
+            result = job.to_dict()
+        self._notify_finished(job)
+        return result
+
+    def pause_job(self, job_id):
+        """Pause a running job"""
+        with self._condition:
+            job = self.jobs[job_id]
+            if job.status != RUNNING:
+                raise ValueError(f"Job {job_id} is {job.status}, not RUNNING")
+            job.status = PAUSED
+            job.paused_at = self.clock()
+            return job.to_dict()
+
+    def resume_job(self, job_id):
+        """Resume a paused job; the remaining slices keep their spacing from now on"""
+        with self._condition:
+            job = self.jobs[job_id]
+            if job.status != PAUSED:
+                raise ValueError(f"Job {job_id} is {job.status}, not PAUSED")
+            now = self.clock()
+            job.status = RUNNING
+            job.epoch += 1
+            # Shift the schedule by the time spent paused, and further if slices
+            # were already overdue when it was paused, so they are not sent in a burst
+            job.start_at += now - job.paused_at
+            job.paused_at = None
+            upcoming = job.next_slice + 1 if job.in_flight else job.next_slice
+            job.start_at += max(now - self._due_at(job, upcoming), 0.0)
+            if not job.in_flight:
+                self._schedule(job, job.next_slice, self._due_at(job, job.next_slice))
+            self._condition.notify()
+            return job.to_dict()
+
+    def run_pending(self):
+        """Dispatch every slice due at the current clock time; returns how many were dispatched"""
+        dispatched = 0
+        while True:
+            with self._condition:
+                entry = self._pop_due(self.clock())
+            if entry is None:
+                return dispatched
+            self._execute_slice(*entry)
+            dispatched += 1
+
+    def _reference_price(self, symbol):
+        """Local book mid price, else the last price; None if neither is available"""
+        try:
+            book = self.binance_client._get_local_book(symbol)
+            if book is not None:
+                mid = book.mid_price()
+                if mid:
+                    return mid
+            return float(self.binance_client.get_market_price(symbol)['price'])
+        except Exception as e:
+            logger.warning(f"No reference price for {symbol}: {str(e)}")
+            return None
+
+    def _due_at(self, job, index):
+        return job.start_at + index * job.interval_secs
+
+    def _schedule(self, job, index, due):
+        heapq.heappush(self._heap, (due, next(self._sequence), job.id, index, job.epoch))
+
+    def _pop_due(self, now):
+        """Pop the next due, still valid slice; caller holds the condition"""
+        while self._heap and self._heap[0][0] <= now:
+            due, _, job_id, index, epoch = heapq.heappop(self._heap)
+            job = self.jobs.get(job_id)
+            if job is None or job.status != RUNNING or epoch != job.epoch or index != job.next_slice:
+                continue
+            job.in_flight = True
+            return job, index, due
+        return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    now = self.clock()
+                    entry = self._pop_due(now)
+                    if entry is not None:
+                        break
+                    timeout = self._heap[0][0] - now if self._heap else None
+                    self._condition.wait(timeout)
+                if self._stopped:
+                    return
+                # Submitted under the condition: stop() cannot shut the executor down in between
+                self._executor.submit(self._execute_slice, *entry)
+
+    def _execute_slice(self, job, index, due):
+        """Send one slice and schedule the next"""
+        sent_at = self.clock()
+        drift = sent_at - due
+        if drift > job.interval_secs / 2:
+            logger.warning(f"Job {job.id} slice {index + 1} is {drift:.2f}s late")
+
+        target = job.slice_quantity + job.carry
+        quantity = target
+        if index < job.num_slices - 1:
+            available = self.binance_client.get_fillable_quantity(job.symbol, job.side)
+            if available is not None and available < target:
+                quantity = available
+
+        record = {
+            'index': index,
+            'scheduled_at': due,
+            'sent_at': sent_at,
+            'sent_time': time.time(),
+            'drift_secs': drift,
+            'market_price': self._reference_price(job.symbol) if quantity > 0 else None,
+            'quantity': quantity,
+            'order_id': None,
+            'executed_qty': 0.0,
+            'fill_price': None,
+            'status': 'SKIPPED' if quantity <= 0 else None,
+        }
+
+        error = None
+        if quantity > 0:
+            try:
+                response = self.binance_client.place_order(
+                    symbol=job.symbol,
+                    side=job.side,
+                    order_type='MARKET',
+                    quantity=quantity
+                )
+                # The client rounds to the step size, carry what it did not send
+                record['quantity'] = float(response.get('origQty') or quantity)
+                record['order_id'] = response.get('orderId')
+                record['status'] = response.get('status')
+                record['executed_qty'] = float(response.get('executedQty') or 0)
+                avg_price = float(response.get('avgPrice') or 0)
+                record['fill_price'] = avg_price or None
+            except Exception as e:
+                logger.error(f"Job {job.id} slice {index + 1} failed: {str(e)}")
+                record['status'] = 'ERROR'
+                error = str(e)
+
+        finished = False
+        with self._condition:
+            job.in_flight = False
+            job.slices.append(record)
+            if record['fill_price']:
+                job.filled_quantity += record['executed_qty']
+                job.filled_notional += record['executed_qty'] * record['fill_price']
+            if error is None:
+                job.carry = target - record['quantity']
+                job.next_slice = index + 1
+            else:
+                job.error = error
+
+            if job.status == CANCELLED:
+                # Cancelled while this slice was in flight
+                self._finish(job, CANCELLED)
+                finished = True
+            elif error is not None:
+                self._finish(job, FAILED)
+                finished = True
+            elif job.next_slice >= job.num_slices:
+                self._finish(job, COMPLETED)
+                finished = True
+            elif job.status == RUNNING:
+                self._schedule(job, job.next_slice, self._due_at(job, job.next_slice))
+                self._condition.notify()
+
+        if finished:
+            self._notify_finished(job)
+            return
+        logger.info(f"Job {job.id} slice {index + 1}/{job.num_slices} sent: {record['quantity']} {job.symbol}")
+
+    def _finish(self, job, status):
+        """Mark a job finished; caller holds the condition and calls _notify_finished() after releasing it"""
+        job.status = status
+        job.finished_at = time.time()
+        logger.info(f"Job {job.id} {status}: {job.filled_quantity} filled at {job.avg_fill_price}")
+
+    def _notify_finished(self, job):
+        """Call the listeners of a finished job outside the condition, so slow ones never stall scheduling"""
+        for listener in self.listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                logger.error(f"Job listener failed for {job.id}: {str(e)}")
+
+    def _prune_finished(self):
+        """Forget the oldest finished jobs beyond Config.EXECUTION_MAX_FINISHED_JOBS"""
+        finished = [job for job in self.jobs.values() if job.finished_at is not None]
+        excess = len(finished) - Config.EXECUTION_MAX_FINISHED_JOBS
+        if excess > 0:
+            for job in sorted(finished, key=lambda job: job.finished_at)[:excess]:
+                del self.jobs[job.id]
@@ -0,0 +1,266 @@
+"""
+Shared exchange gateway
+
+With GATEWAY_ENABLED, one gateway process (python -m gateway) owns the
+Binance client, its streams, the response cache and the rate limit budget,
+and every gunicorn worker forwards service calls to it over a Unix socket.
+Adding workers then adds no upstream traffic and no second view of the
+API weight.
+
+Wire format: each message is a 4-byte big-endian length followed by a
+msgpack body (JSON when msgpack is not installed). A request is
+[path, args, kwargs] where path is one of CALLS: a service method
+('binance_client.place_order', 'user_stream.store.get_fills') or a loader
+served by name ('load_account'); the reply is [True, result] or
+[False, exception type, message, attributes], where attributes carries
+the instance attributes of the exceptions in _REMOTE_ERRORS (such as
+RiskRejected.check).
+"""
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+
+from config import Config
+from utils.logger import logger
+from risk_engine import RiskRejected
+from utils.rate_limit import RateLimitExceeded
+
+try:
+    import msgpack
+except ImportError:  # JSON is the fallback wire format
+    msgpack = None
+
+# Names in app.py the gateway serves to workers
+SERVICES = (
+    'binance_client', 'api_cache', 'user_stream', 'history_store', 'execution_engine', 'execution_analytics',
+    'warmup', 'risk_engine',
+    'load_market_data', 'load_account', 'load_positions', 'load_open_orders', 'load_orders',
+    'load_dashboard', 'load_push_state', 'load_order_book', 'load_klines',
+)
+
+# The only paths workers may call: what the routes use, never startup or internals
+CALLS = frozenset((
+    'binance_client.place_order', 'binance_client.cancel_order', 'binance_client.place_batch_orders',
+    'binance_client.modify_batch_orders', 'binance_client.cancel_batch_orders', 'binance_client.cancel_all_orders',
+    'binance_client.get_account_info', 'binance_client.get_positions', 'binance_client.get_market_data',
+    'binance_client.get_open_orders', 'binance_client.get_order_history',
+    'binance_client.get_transport_stats', 'binance_client.get_rate_limit_stats',
+    'api_cache.invalidate', 'api_cache.get_stats',
+    'user_stream.is_ready', 'user_stream.get_stats', 'user_stream.store.get_fills',
+    'history_store.is_ready', 'history_store.query_orders', 'history_store.get_stats',
+    'execution_engine.submit_twap', 'execution_engine.list_jobs', 'execution_engine.get_job',
+    'execution_engine.cancel_job', 'execution_engine.pause_job', 'execution_engine.resume_job',
+    'execution_analytics.get_run', 'execution_analytics.analyze', 'execution_analytics.aggregate',
+    'execution_analytics.query_runs',
+    'warmup.get_status',
+    'risk_engine.get_stats', 'risk_engine.get_exposure',
+    'load_market_data', 'load_account', 'load_positions', 'load_open_orders', 'load_orders',
+    'load_dashboard', 'load_push_state', 'load_order_book', 'load_klines',
+))
+
+# Exceptions re-raised as themselves in the worker; anything else becomes GatewayError
+_REMOTE_ERRORS = {
+    'ValueError': ValueError,
+    'KeyError': KeyError,
+    'TypeError': TypeError,
+    'RateLimitExceeded': RateLimitExceeded,
+    'RiskRejected': RiskRejected,
+}
+
+_PROCESS_ENV = 'TRADING_GATEWAY_PROCESS'
+_HEADER = struct.Struct('!I')
+
+
+class GatewayError(Exception):
+    """The gateway could not be reached or a call failed in it"""
+
+
+def is_gateway_process():
+    """True inside the gateway process itself, which must build the real services"""
+    return os.environ.get(_PROCESS_ENV) == '1'
+
+
+def _encode(obj):
+    if msgpack:
+        return msgpack.packb(obj, use_bin_type=True, default=str)
+    return json.dumps(obj, separators=(',', ':'), default=str).encode()
+
+
+def _decode(data):
+    if msgpack:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    return json.loads(data)
+
+
+def _send(sock, obj):
+    body = _encode(obj)
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def _recv_exact(sock, size):
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Gateway connection closed")
+        buffer += chunk
+    return bytes(buffer)
+
+
+def _recv(sock):
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return _decode(_recv_exact(sock, size))
+
+
+class _GatewayHandler(socketserver.BaseRequestHandler):
+    """Serve requests from one worker connection until it closes"""
+
+    def handle(self):
+        while True:
+            try:
+                path, args, kwargs = _recv(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                reply = [True, self.server.dispatch(path, args, kwargs)]
+            except Exception as e:
+                message = str(e.args[0]) if len(e.args) == 1 else str(e)
+                attributes = vars(e) if type(e).__name__ in _REMOTE_ERRORS else {}
+                reply = [False, type(e).__name__, message, attributes]
+            try:
+                _send(self.request, reply)
+            except OSError:
+                return
+
+
+class GatewayServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server exposing a fixed set of named services
+
+    Only the paths in `calls` (CALLS by default) can be called; anything
+    else is rejected before an attribute of a service is looked up.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, services, path=None, calls=CALLS):
+        self.services = dict(services)
+        self.allowed_calls = frozenset(calls)
+        self.path = path or Config.GATEWAY_SOCKET
+        self.calls = 0
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        super().__init__(self.path, _GatewayHandler)
+        os.chmod(self.path, 0o600)
+
+    def dispatch(self, path, args, kwargs):
+        self.calls += 1
+        if path == '':
+            return sorted(self.services)
+        name, *attributes = path.split('.')
+        if path not in self.allowed_calls or name not in self.services:
+            raise AttributeError(f"Unknown gateway service {path}")
+        target = self.services[name]
+        for attribute in attributes:
+            target = getattr(target, attribute)
+        if not callable(target):
+            raise TypeError(f"{path} is not callable")
+        return target(*args, **kwargs)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class RemoteProxy:
+    """Stand-in for a gateway service: attribute access extends the path, calling it sends the request"""
+
+    def __init__(self, client, path):
+        self._client = client
+        self._path = path
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return RemoteProxy(self._client, f"{self._path}.{name}")
+
+    def __call__(self, *args, **kwargs):
+        return self._client.call(self._path, args, kwargs)
+
+    def __repr__(self):
+        return f"<RemoteProxy {self._path}>"
+
+
+class GatewayClient:
+    """Worker side of the gateway: one persistent socket per thread"""
+
+    def __init__(self, path=None, timeout=None):
+        self.path = path or Config.GATEWAY_SOCKET
+        self.timeout = timeout or Config.GATEWAY_TIMEOUT
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def call(self, path, args=(), kwargs=None):
+        """Call a service method in the gateway and return its result"""
+        request = [path, list(args), kwargs or {}]
+        try:
+            sock = getattr(self._local, 'sock', None)
+            try:
+                if sock is None:
+                    sock = self._connect()
+                _send(sock, request)
+            except OSError:
+                # The request never reached the gateway (e.g. it restarted), so it is safe to resend
+                self._close()
+                _send(self._connect(), request)
+            reply = _recv(self._local.sock)
+        except (OSError, ConnectionError) as e:
+            self._close()
+            raise GatewayError(f"Gateway call {path} failed: {str(e)}") from e
+
+        if reply[0]:
+            return reply[1]
+        _, error_type, message, attributes = reply
+        if error_type not in _REMOTE_ERRORS:
+            raise GatewayError(f"{error_type}: {message}")
+        error = _REMOTE_ERRORS[error_type](message)
+        error.__dict__.update(attributes)
+        raise error
+
+    def connect(self):
+        """Return {name: RemoteProxy} for the services the gateway runs"""
+        return {name: RemoteProxy(self, name) for name in self.call('')}
+
+
+def main():
+    """Build the app's services in this process and serve them to the workers"""
+    os.environ[_PROCESS_ENV] = '1'
+    import app as service
+
+    services = {name: getattr(service, name) for name in SERVICES if getattr(service, name, None) is not None}
+    server = GatewayServer(services)
+    logger.info(f"Gateway serving {len(services)} services on {server.path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+import json
+import sqlite3
+import threading
+import time
+
+from config import Config
+from utils.logger import logger
+
+FINAL_STATUSES = ('FILLED', 'CANCELED', 'EXPIRED', 'REJECTED', 'EXPIRED_IN_MATCH')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    symbol TEXT NOT NULL,
+    order_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    side TEXT,
+    type TEXT,
+    time INTEGER,
+    update_time INTEGER,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (symbol, order_id)
+);
+CREATE INDEX IF NOT EXISTS idx_orders_symbol_time ON orders (symbol, time DESC);
+CREATE INDEX IF NOT EXISTS idx_orders_status_time ON orders (status, time DESC);
+CREATE INDEX IF NOT EXISTS idx_orders_time ON orders (time DESC);
+CREATE TABLE IF NOT EXISTS sync_state (
+    symbol TEXT PRIMARY KEY,
+    cursor INTEGER NOT NULL,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+class OrderHistoryStore:
+    """
+    Persistent order history in SQLite, indexed by symbol, time and status
+
+    Each symbol keeps an orderId cursor. A sync pages through
+    /fapi/v1/allOrders from that cursor (from the first order on the very
+    first sync, which backfills the full history), upserts every page and
+    moves the cursor past the newest order. Orders stored before the cursor
+    that can still change (not final yet) are tracked one by one instead:
+    they are refreshed from the symbol's open orders, and any that are no
+    longer open are fetched individually for their final state, so a
+    long-lived open order does not make every sync re-page the orders after it.
+    """
+
+    def __init__(self, binance_client, path=None, symbols=None, sync_interval=None, page_size=None):
+        self.binance_client = binance_client
+        self.path = path or Config.HISTORY_DB_FILE
+        self.symbols = list(symbols or Config.SUPPORTED_SYMBOLS)
+        self.sync_interval = sync_interval or Config.HISTORY_SYNC_INTERVAL
+        self.page_size = page_size or Config.HISTORY_PAGE_SIZE
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._migrate()
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.synced_at = None
+
+    def _migrate(self):
+        """
+        Drop an orders table keyed on order_id alone, as order IDs are only
+        unique per symbol; the sync cursors are reset so the next sync backfills
+        """
+        columns = self._conn.execute('PRAGMA table_info(orders)').fetchall()
+        primary_key = [column[1] for column in columns if column[5]]
+        if primary_key == ['order_id']:
+            logger.info("Rebuilding the order history store keyed by symbol and order ID")
+            self._conn.executescript('DROP TABLE orders; DROP TABLE IF EXISTS sync_state;')
+
+    def upsert_orders(self, orders):
+        """Insert or update orders given in the REST /fapi/v1/allOrders shape"""
+        rows = [
+            (
+                order['symbol'], order['orderId'], order['status'], order.get('side'), order.get('type'),
+                order.get('time') or order.get('updateTime'), order.get('updateTime'), json.dumps(order),
+            )
+            for order in orders
+        ]
+        with self._lock:
+            # An older snapshot of an order must never replace a newer one
+            self._conn.executemany(
+                """
+                INSERT INTO orders (symbol, order_id, status, side, type, time, update_time, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (symbol, order_id) DO UPDATE SET
+                    status = excluded.status,
+                    update_time = excluded.update_time,
+                    payload = excluded.payload,
+                    time = COALESCE(orders.time, excluded.time)
+                WHERE excluded.update_time IS NULL OR orders.update_time IS NULL
+                    OR excluded.update_time >= orders.update_time
+                """,
+                rows,
+            )
+            self._conn.commit()
+
+    def _get_cursor(self, symbol):
+        with self._lock:
+            row = self._conn.execute('SELECT cursor FROM sync_state WHERE symbol = ?', (symbol,)).fetchone()
+        return row[0] if row else 1
+
+    def _unfinished_order_ids(self, symbol, before):
+        """IDs of the symbol's stored orders below `before` that are not final yet"""
+        placeholders = ', '.join('?' for _ in FINAL_STATUSES)
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT order_id FROM orders WHERE symbol = ? AND order_id < ? AND status NOT IN ({placeholders})',
+                (symbol, before) + FINAL_STATUSES,
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _refresh_unfinished(self, symbol, order_ids):
+        """Bring orders stored as open up to date; returns the number of orders fetched"""
+        open_orders = self.binance_client.get_open_orders(symbol=symbol)
+        still_open = {order['orderId'] for order in open_orders}
+        updated = [order for order in open_orders if order['orderId'] in order_ids]
+        for order_id in order_ids:
+            if order_id not in still_open:
+                updated.append(self.binance_client.get_order(symbol, order_id))
+        self.upsert_orders(updated)
+        return len(updated)
+
+    def sync_symbol(self, symbol):
+        """Page through the symbol's orders from its cursor; returns the number of orders fetched"""
+        cursor = self._get_cursor(symbol)
+        fetched = 0
+        unfinished = self._unfinished_order_ids(symbol, cursor)
+        if unfinished:
+            fetched += self._refresh_unfinished(symbol, set(unfinished))
+
+        newest = cursor - 1
+        while True:
+            page = self.binance_client.get_order_history(symbol=symbol, limit=self.page_size, order_id=cursor)
+            if page:
+                self.upsert_orders(page)
+                fetched += len(page)
+                newest = max(newest, max(order['orderId'] for order in page))
+            if len(page) < self.page_size:
+                break
+            cursor = newest + 1
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sync_state (symbol, cursor, synced_at) VALUES (?, ?, ?)',
+                (symbol, newest + 1, time.time()),
+            )
+            self._conn.commit()
+        return fetched
+
+    def sync(self):
+        """
+        Sync every symbol; a failing symbol is logged and retried on the next sync
+
+        The store only counts as synced once at least one symbol succeeded.
+        """
+        total = 0
+        synced = 0
+        for symbol in self.symbols:
+            try:
+                total += self.sync_symbol(symbol)
+                synced += 1
+            except Exception as e:
+                logger.error(f"Failed to sync order history for {symbol}: {str(e)}")
+        if not synced:
+            logger.error("Order history sync failed for every symbol")
+            return total
+        self.synced_at = time.time()
+        logger.info(f"Order history synced: {total} orders fetched")
+        return total
+
+    def start(self):
+        """Sync now and then every sync_interval seconds in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='order-history-sync', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sync thread"""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sync()
+            self._stop.wait(self.sync_interval)
+
+    def is_ready(self):
+        """True once the history has been synced at least once"""
+        return self.synced_at is not None
+
+    def query_orders(self, symbol=None, status=None, side=None, start_time=None, end_time=None,
+                     limit=50, offset=0):
+        """
+        Return orders matching the filters, newest first
+
+        Args:
+            symbol (str, optional): Trading pair symbol e.g. 'BTCUSDT'
+            status (str, optional): Order status, or several separated by commas
+            side (str, optional): 'BUY' or 'SELL'
+            start_time (int, optional): Earliest order time in milliseconds
+            end_time (int, optional): Latest order time in milliseconds
+            limit (int): Page size
+            offset (int): Orders to skip, for pagination
+
+        Returns:
+            list: Orders in the REST /fapi/v1/allOrders shape
+        """
+        clauses = []
+        params = []
+        if symbol:
+            clauses.append('symbol = ?')
+            params.append(symbol)
+        if status:
+            statuses = [s.strip() for s in status.split(',') if s.strip()]
+            clauses.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if side:
+            clauses.append('side = ?')
+            params.append(side)
+        if start_time is not None:
+            clauses.append('time >= ?')
+            params.append(start_time)
+        if end_time is not None:
+            clauses.append('time <= ?')
+            params.append(end_time)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT payload FROM orders {where} ORDER BY time DESC, order_id DESC LIMIT ? OFFSET ?',
+                params + [limit, offset],
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_stats(self):
+        """Return stored order counts and sync cursors per symbol"""
+        with self._lock:
+            counts = dict(self._conn.execute('SELECT symbol, COUNT(*) FROM orders GROUP BY symbol').fetchall())
+            cursors = self._conn.execute('SELECT symbol, cursor, synced_at FROM sync_state').fetchall()
+        return {
+            'orders': sum(counts.values()),
+            'synced_at': self.synced_at,
+            'symbols': {
+                symbol: {'orders': counts.get(symbol, 0), 'cursor': cursor, 'synced_at': synced_at}
+                for symbol, cursor, synced_at in cursors
+            },
+        }
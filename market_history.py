@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from config import Config
+from utils.logger import logger
+
+DAY_MS = 86400000
+
+KLINE_DTYPE = np.dtype([
+    ('open_time', 'i8'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8'),
+    ('volume', 'f8'), ('close_time', 'i8'), ('quote_volume', 'f8'), ('trades', 'i8'),
+    ('taker_buy_volume', 'f8'), ('taker_buy_quote_volume', 'f8'),
+])
+
+AGG_TRADE_DTYPE = np.dtype([
+    ('agg_id', 'i8'), ('price', 'f8'), ('qty', 'f8'), ('first_id', 'i8'), ('last_id', 'i8'),
+    ('time', 'i8'), ('buyer_maker', '?'),
+])
+
+_INTERVAL_UNITS = {'m': 60000, 'h': 3600000, 'd': DAY_MS, 'w': 7 * DAY_MS}
+
+
+def interval_ms(interval):
+    """Length of a kline interval such as '1m' or '4h' in milliseconds"""
+    return int(interval[:-1]) * _INTERVAL_UNITS[interval[-1]]
+
+
+def _klines_to_array(rows):
+    """Convert /fapi/v1/klines rows to a KLINE_DTYPE array"""
+    array = np.empty(len(rows), dtype=KLINE_DTYPE)
+    for i, field in enumerate(KLINE_DTYPE.names):
+        array[field] = [row[i] for row in rows]
+    return array
+
+
+def _agg_trades_to_array(rows):
+    """Convert /fapi/v1/aggTrades rows to an AGG_TRADE_DTYPE array"""
+    array = np.empty(len(rows), dtype=AGG_TRADE_DTYPE)
+    for field, key in zip(AGG_TRADE_DTYPE.names, ('a', 'p', 'q', 'f', 'l', 'T', 'm')):
+        array[field] = [row[key] for row in rows]
+    return array
+
+
+class MarketHistory:
+    """
+    Historical klines and aggregate trades cached on disk as NumPy arrays
+
+    Data is partitioned by kind, symbol and UTC day into .npy files of
+    structured arrays. A range query downloads missing days concurrently
+    (paginating each day), then memory-maps the day files it needs and
+    slices them by time, so reading a cached range makes no request and a
+    range inside one day is returned as a zero-copy view. Only completed
+    days are written to disk; the current day is always fetched fresh.
+    """
+
+    def __init__(self, binance_client, data_dir=None, max_workers=None):
+        self.binance_client = binance_client
+        self.data_dir = data_dir or Config.MARKET_HISTORY_DIR
+        self.max_workers = max_workers or Config.MARKET_HISTORY_MAX_WORKERS
+        self._day_locks = {}
+        self._lock = threading.Lock()
+
+    def _path(self, kind, symbol, day_start):
+        day = time.strftime('%Y-%m-%d', time.gmtime(day_start / 1000))
+        return os.path.join(self.data_dir, kind, symbol, f"{day}.npy")
+
+    def _day_lock(self, path):
+        with self._lock:
+            return self._day_locks.setdefault(path, threading.Lock())
+
+    def _download_klines(self, symbol, interval, start, end):
+        """Page through /fapi/v1/klines for [start, end)"""
+        step = interval_ms(interval)
+        limit = Config.MARKET_HISTORY_KLINE_LIMIT
+        rows = []
+        cursor = start
+        while cursor < end:
+            page = self.binance_client.get_klines(symbol, interval, start_time=cursor, end_time=end - 1, limit=limit)
+            if not page:
+                break
+            rows.extend(page)
+            cursor = page[-1][0] + step
+            if len(page) < limit:
+                break
+        return _klines_to_array(rows)
+
+    def _download_agg_trades(self, symbol, start, end):
+        """Page through /fapi/v1/aggTrades for [start, end); the exchange allows at most one hour per query"""
+        limit = Config.MARKET_HISTORY_AGG_TRADE_LIMIT
+        rows = []
+        window_start = start
+        while window_start < end:
+            window_end = min(window_start + 3600000, end)
+            page = self.binance_client.get_agg_trades(symbol, start_time=window_start, end_time=window_end - 1, limit=limit)
+            rows.extend(page)
+            # A full page may be truncated; continue by trade id until the window ends
+            while len(page) == limit:
+                page = self.binance_client.get_agg_trades(symbol, from_id=page[-1]['a'] + 1, limit=limit)
+                page = [row for row in page if row['T'] < window_end]
+                rows.extend(page)
+            window_start = window_end
+        return _agg_trades_to_array(rows)
+
+    def _load_day(self, kind, symbol, day_start, download):
+        """Return one day's array, from disk when cached, downloading (and caching completed days) otherwise"""
+        path = self._path(kind, symbol, day_start)
+        day_end = day_start + DAY_MS
+        complete = day_end <= time.time() * 1000
+
+        with self._day_lock(path):
+            if complete and os.path.exists(path):
+                return np.load(path, mmap_mode='r')
+
+            array = download(day_start, day_end)
+            if complete:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, array)
+                os.replace(tmp_path, path)
+                logger.info(f"Cached {len(array)} {kind} rows for {symbol} at {path}")
+                return np.load(path, mmap_mode='r')
+            return array
+
+    def _load_range(self, kind, symbol, start, end, dtype, time_field, download):
+        first_day = start - start % DAY_MS
+        days = range(first_day, end, DAY_MS)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(days)))) as executor:
+            arrays = list(executor.map(lambda day: self._load_day(kind, symbol, day, download), days))
+
+        # Slice each day by time; a single day stays a view of the memory map
+        slices = []
+        for array in arrays:
+            times = array[time_field]
+            lo = np.searchsorted(times, start, side='left')
+            hi = np.searchsorted(times, end, side='left')
+            if hi > lo:
+                slices.append(array[lo:hi])
+        if len(slices) == 1:
+            return slices[0]
+        if not slices:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate(slices)
+
+    def get_klines(self, symbol, interval, start, end):
+        """
+        Return klines of symbol whose open time is in [start, end) as a KLINE_DTYPE array
+
+        Args:
+            symbol (str): Trading pair symbol e.g. 'BTCUSDT'
+            interval (str): Kline interval e.g. '1m', '1h'
+            start (int): Range start in milliseconds
+            end (int): Range end in milliseconds (exclusive)
+        """
+        return self._load_range(
+            f"klines-{interval}", symbol, start, end, KLINE_DTYPE, 'open_time',
+            lambda day_start, day_end: self._download_klines(symbol, interval, day_start, day_end),
+        )
+
+    def get_agg_trades(self, symbol, start, end):
+        """Return aggregate trades of symbol in [start, end) as an AGG_TRADE_DTYPE array"""
+        return self._load_range(
+            'aggTrades', symbol, start, end, AGG_TRADE_DTYPE, 'time',
+            lambda day_start, day_end: self._download_agg_trades(symbol, day_start, day_end),
+        )
+
+
+def returns(close, log=True):
+    """Per-period (log) returns of a price series; one element shorter than the input"""
+    close = np.asarray(close, dtype='f8')
+    if log:
+        return np.diff(np.log(close))
+    return close[1:] / close[:-1] - 1
+
+
+def rolling_volatility(close, window, periods_per_year=None):
+    """
+    Rolling standard deviation of log returns over `window` periods
+
+    Element i covers the returns ending at close[i + window]; multiply by
+    sqrt(periods_per_year) when given to annualize.
+    """
+    r = returns(close)
+    if len(r) < window:
+        return np.empty(0)
+    csum = np.concatenate(([0.0], np.cumsum(r)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(r * r)))
+    total = csum[window:] - csum[:-window]
+    total_sq = csum_sq[window:] - csum_sq[:-window]
+    variance = np.maximum(total_sq / window - (total / window) ** 2, 0.0) * window / max(window - 1, 1)
+    volatility = np.sqrt(variance)
+    if periods_per_year:
+        volatility *= np.sqrt(periods_per_year)
+    return volatility
+
+
+def vwap(prices, volumes):
+    """Volume-weighted average price of a whole series"""
+    volumes = np.asarray(volumes, dtype='f8')
+    total = volumes.sum()
+    return float(np.dot(prices, volumes) / total) if total else float('nan')
+
+
+def rolling_vwap(klines, window=None):
+    """
+    VWAP per kline from typical price (high + low + close) / 3
+
+    Cumulative from the first kline, or over the last `window` klines when given.
+    """
+    typical = (klines['high'] + klines['low'] + klines['close']) / 3
+    pv = np.cumsum(typical * klines['volume'])
+    v = np.cumsum(klines['volume'])
+    if window:
+        pv[window:] = pv[window:] - pv[:-window]
+        v[window:] = v[window:] - v[:-window]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(v > 0, pv / v, np.nan)
+
+
+def volume_profile(klines, buckets):
+    """Share of traded volume in each of `buckets` equal slices of the klines (e.g. to weight TWAP slices)"""
+    volume = np.asarray(klines['volume'], dtype='f8')
+    if not len(volume):
+        return np.full(buckets, 1.0 / buckets)
+    totals = np.array([part.sum() for part in np.array_split(volume, buckets)])
+    total = totals.sum()
+    return totals / total if total else np.full(buckets, 1.0 / buckets)
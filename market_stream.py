@@ -0,0 +1,283 @@
+import json
+import threading
+import time
+
+import websocket
+
+from config import Config
+from utils.logger import logger
+
+
+class Ticker:
+    """Latest 24hr ticker and mark price of one symbol"""
+
+    __slots__ = (
+        'symbol', 'last_price', 'price_change', 'price_change_percent', 'open_price',
+        'high_price', 'low_price', 'volume', 'quote_volume', 'mark_price', 'index_price',
+        'funding_rate', 'event_time', 'updated_at',
+    )
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.last_price = None
+        self.price_change = None
+        self.price_change_percent = None
+        self.open_price = None
+        self.high_price = None
+        self.low_price = None
+        self.volume = None
+        self.quote_volume = None
+        self.mark_price = None
+        self.index_price = None
+        self.funding_rate = None
+        self.event_time = 0
+        self.updated_at = 0.0
+
+    def to_dict(self):
+        """Return the ticker in the shape of the REST /fapi/v1/ticker/24hr response"""
+        return {
+            'symbol': self.symbol,
+            'lastPrice': self.last_price,
+            'priceChange': self.price_change,
+            'priceChangePercent': self.price_change_percent,
+            'openPrice': self.open_price,
+            'highPrice': self.high_price,
+            'lowPrice': self.low_price,
+            'volume': self.volume,
+            'quoteVolume': self.quote_volume,
+            'markPrice': self.mark_price,
+            'indexPrice': self.index_price,
+            'fundingRate': self.funding_rate,
+            'closeTime': self.event_time,
+        }
+
+
+class TickerStore:
+    """Thread-safe in-memory store of the latest ticker per symbol"""
+
+    def __init__(self):
+        self._tickers = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, symbol):
+        ticker = self._tickers.get(symbol)
+        if ticker is None:
+            ticker = Ticker(symbol)
+            self._tickers[symbol] = ticker
+        return ticker
+
+    def update_ticker(self, event):
+        """Apply a 24hrTicker stream event"""
+        with self._lock:
+            ticker = self._get_or_create(event['s'])
+            ticker.last_price = event['c']
+            ticker.price_change = event['p']
+            ticker.price_change_percent = event['P']
+            ticker.open_price = event['o']
+            ticker.high_price = event['h']
+            ticker.low_price = event['l']
+            ticker.volume = event['v']
+            ticker.quote_volume = event['q']
+            ticker.event_time = event['E']
+            ticker.updated_at = time.monotonic()
+
+    def update_mark_price(self, event):
+        """Apply a markPriceUpdate stream event"""
+        with self._lock:
+            ticker = self._get_or_create(event['s'])
+            ticker.mark_price = event['p']
+            ticker.index_price = event.get('i')
+            ticker.funding_rate = event.get('r')
+            ticker.event_time = max(ticker.event_time, event['E'])
+            ticker.updated_at = time.monotonic()
+
+    def get(self, symbol, max_age=None):
+        """Return the ticker dict for symbol, or None if unknown or older than max_age seconds"""
+        with self._lock:
+            ticker = self._tickers.get(symbol)
+            if ticker is None or ticker.last_price is None:
+                return None
+            if max_age is not None and time.monotonic() - ticker.updated_at > max_age:
+                return None
+            return ticker.to_dict()
+
+    def get_many(self, symbols, max_age=None):
+        """Return ticker dicts for all symbols, or None if any of them is missing or stale"""
+        now = time.monotonic()
+        result = []
+        with self._lock:
+            for symbol in symbols:
+                ticker = self._tickers.get(symbol)
+                if ticker is None or ticker.last_price is None:
+                    return None
+                if max_age is not None and now - ticker.updated_at > max_age:
+                    return None
+                result.append(ticker.to_dict())
+        return result
+
+    def get_price(self, symbol, max_age=None):
+        """Return the last traded price of symbol as a string, or None if unknown or stale"""
+        ticker = self.get(symbol, max_age)
+        return ticker['lastPrice'] if ticker else None
+
+
+class CombinedStream:
+    """
+    Background combined-stream WebSocket connection
+
+    Subscribes to the streams of every symbol, reconnects with exponential
+    backoff and resubscribes after each reconnect. Subclasses define which
+    streams a symbol needs and how events are handled.
+    """
+
+    name = 'stream'
+
+    def __init__(self, symbols=None, url=None):
+        self.symbols = set(symbols or Config.SUPPORTED_SYMBOLS)
+        self.url = f"{url or Config.STREAM_URL}/stream"
+        self._ws = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        self._lock = threading.Lock()
+        self._request_id = 0
+        self.reconnects = 0
+
+    def _streams_for(self, symbols):
+        """Return stream names for the given symbols"""
+        raise NotImplementedError
+
+    def _handle_event(self, stream, event):
+        """Process one event received on the named stream"""
+        raise NotImplementedError
+
+    def _on_connected(self):
+        """Hook called after every (re)connect, once subscriptions are sent"""
+
+    def start(self):
+        """Start the stream in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info(f"{self.name} started for {len(self.symbols)} symbols")
+
+    def stop(self):
+        """Close the connection and stop reconnecting"""
+        self._stop.set()
+        if self._ws:
+            self._ws.close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def is_connected(self):
+        """Return True while the WebSocket connection is open"""
+        return self._connected.is_set()
+
+    def wait_until_connected(self, timeout=None):
+        """Block until the stream is connected or timeout seconds passed"""
+        return self._connected.wait(timeout)
+
+    def add_symbols(self, symbols):
+        """Subscribe to additional symbols, on the live connection if there is one"""
+        with self._lock:
+            new_symbols = set(symbols) - self.symbols
+            self.symbols.update(new_symbols)
+        if new_symbols and self.is_connected():
+            self._subscribe(self._streams_for(new_symbols))
+
+    def _subscribe(self, streams):
+        """Send a SUBSCRIBE request for the given stream names"""
+        with self._lock:
+            self._request_id += 1
+            request_id = self._request_id
+        self._ws.send(json.dumps({'method': 'SUBSCRIBE', 'params': streams, 'id': request_id}))
+        logger.info(f"{self.name} subscribed to {len(streams)} streams")
+
+    def _run(self):
+        """Connect, and reconnect with exponential backoff until stopped"""
+        delay = 1
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            self._ws.run_forever(ping_interval=Config.STREAM_PING_INTERVAL, ping_timeout=Config.STREAM_PING_TIMEOUT)
+            self._connected.clear()
+
+            if self._stop.is_set():
+                break
+
+            # A connection that stayed up for a while resets the backoff
+            if time.monotonic() - started > Config.STREAM_RECONNECT_MAX_DELAY:
+                delay = 1
+            self.reconnects += 1
+            logger.warning(f"{self.name} disconnected, reconnecting in {delay}s")
+            self._stop.wait(delay)
+            delay = min(delay * 2, Config.STREAM_RECONNECT_MAX_DELAY)
+
+    def _on_open(self, ws):
+        if self._stop.is_set():
+            # stop() ran while this connection was being opened
+            ws.close()
+            return
+        with self._lock:
+            symbols = set(self.symbols)
+        try:
+            streams = self._streams_for(symbols)
+        except Exception as e:
+            # e.g. no listen key; drop the connection and retry with the reconnect backoff
+            logger.error(f"{self.name} could not resolve its streams, reconnecting: {str(e)}")
+            ws.close()
+            return
+        self._connected.set()
+        self._subscribe(streams)
+        self._on_connected()
+
+    def _on_message(self, ws, message):
+        try:
+            payload = json.loads(message)
+            event = payload.get('data')
+            if not event:
+                # Subscription acknowledgements carry no data
+                return
+            self._handle_event(payload.get('stream'), event)
+        except Exception as e:
+            logger.error(f"Failed to process {self.name} message: {str(e)}")
+
+    def _on_error(self, ws, error):
+        logger.error(f"{self.name} error: {str(error)}")
+
+    def _on_close(self, ws, status_code, message):
+        self._connected.clear()
+        logger.info(f"{self.name} closed: {status_code} {message}")
+
+
+class MarketStream(CombinedStream):
+    """Ticker and mark price streams of all symbols feeding a TickerStore"""
+
+    name = 'market-stream'
+
+    def __init__(self, symbols=None, store=None, url=None):
+        super().__init__(symbols, url)
+        self.store = store or TickerStore()
+
+    def _streams_for(self, symbols):
+        streams = []
+        for symbol in sorted(symbols):
+            name = symbol.lower()
+            streams.append(f"{name}@ticker")
+            streams.append(f"{name}@markPrice@1s")
+        return streams
+
+    def _handle_event(self, stream, event):
+        event_type = event.get('e')
+        if event_type == '24hrTicker':
+            self.store.update_ticker(event)
+        elif event_type == 'markPriceUpdate':
+            self.store.update_mark_price(event)
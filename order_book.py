@@ -0,0 +1,308 @@
+import queue
+import threading
+from bisect import bisect_left
+
+from config import Config
+from market_stream import CombinedStream
+from utils.logger import logger
+
+
+class OrderBookGapError(Exception):
+    """Raised when a depth diff does not follow the previous one"""
+
+
+class PriceLevels:
+    """
+    One side of an L2 book kept in parallel arrays sorted by ascending price
+
+    Levels are located by binary search in O(log n), but inserting or
+    deleting a level shifts the tail of both arrays, which is O(n). That
+    shift is a single memmove, cheaper than a tree's pointer chasing at the
+    ORDER_BOOK_SNAPSHOT_LIMIT levels a book holds, and the arrays keep the
+    best-first walks of levels() a plain index loop.
+    """
+
+    def __init__(self, descending):
+        self.descending = descending
+        self.prices = []
+        self.quantities = []
+
+    def __len__(self):
+        return len(self.prices)
+
+    def clear(self):
+        self.prices.clear()
+        self.quantities.clear()
+
+    def update(self, price, quantity):
+        """Set the quantity at price; a zero quantity removes the level"""
+        i = bisect_left(self.prices, price)
+        exists = i < len(self.prices) and self.prices[i] == price
+        if quantity == 0:
+            if exists:
+                del self.prices[i]
+                del self.quantities[i]
+        elif exists:
+            self.quantities[i] = quantity
+        else:
+            self.prices.insert(i, price)
+            self.quantities.insert(i, quantity)
+
+    def best(self):
+        """Return (price, quantity) of the best level or None if the side is empty"""
+        if not self.prices:
+            return None
+        i = -1 if self.descending else 0
+        return self.prices[i], self.quantities[i]
+
+    def levels(self, n=None):
+        """Yield (price, quantity) from the best level outwards"""
+        count = len(self.prices) if n is None else min(n, len(self.prices))
+        if self.descending:
+            for i in range(len(self.prices) - 1, len(self.prices) - 1 - count, -1):
+                yield self.prices[i], self.quantities[i]
+        else:
+            for i in range(count):
+                yield self.prices[i], self.quantities[i]
+
+
+class OrderBook:
+    """Snapshot-plus-diff synchronized L2 order book of one symbol"""
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.bids = PriceLevels(descending=True)
+        self.asks = PriceLevels(descending=False)
+        self.last_update_id = 0
+        self.synced = False
+        self._first_diff = True
+        self._lock = threading.Lock()
+
+    def apply_snapshot(self, snapshot, diffs=()):
+        """
+        Replace the book with a REST /fapi/v1/depth snapshot
+
+        Diffs buffered while the snapshot was fetched are replayed before the
+        book is marked synced, so readers never see the bare snapshot. Raises
+        OrderBookGapError, leaving the book unsynced, if they do not continue it.
+        """
+        with self._lock:
+            self.synced = False
+            self.bids.clear()
+            self.asks.clear()
+            for price, quantity in snapshot['bids']:
+                self.bids.update(float(price), float(quantity))
+            for price, quantity in snapshot['asks']:
+                self.asks.update(float(price), float(quantity))
+            self.last_update_id = snapshot['lastUpdateId']
+            self._first_diff = True
+            for event in diffs:
+                self._apply_diff(event)
+            self.synced = True
+
+    def apply_diff(self, event):
+        """
+        Apply a depthUpdate event
+
+        Events older than the snapshot are ignored. The first applied event
+        must straddle the snapshot's lastUpdateId and every later one must
+        continue from the previous event (pu == previous u), otherwise the
+        book is marked unsynced and OrderBookGapError is raised.
+        """
+        with self._lock:
+            self._apply_diff(event)
+
+    def _apply_diff(self, event):
+        if event['u'] < self.last_update_id:
+            return
+        if self._first_diff:
+            if event['U'] > self.last_update_id:
+                self.synced = False
+                raise OrderBookGapError(f"{self.symbol}: first diff {event['U']} is past snapshot {self.last_update_id}")
+            self._first_diff = False
+        elif event['pu'] != self.last_update_id:
+            self.synced = False
+            raise OrderBookGapError(f"{self.symbol}: expected pu {self.last_update_id}, got {event['pu']}")
+
+        for price, quantity in event['b']:
+            self.bids.update(float(price), float(quantity))
+        for price, quantity in event['a']:
+            self.asks.update(float(price), float(quantity))
+        self.last_update_id = event['u']
+
+    def best_bid_ask(self):
+        """Return {'bid': (price, qty), 'ask': (price, qty)}"""
+        with self._lock:
+            return {'bid': self.bids.best(), 'ask': self.asks.best()}
+
+    def mid_price(self):
+        """Return the mid price or None if either side is empty"""
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        if not bid or not ask:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def depth(self, n=10):
+        """Return the top n levels of each side as lists of [price, quantity]"""
+        with self._lock:
+            return {
+                'symbol': self.symbol,
+                'lastUpdateId': self.last_update_id,
+                'bids': [[price, quantity] for price, quantity in self.bids.levels(n)],
+                'asks': [[price, quantity] for price, quantity in self.asks.levels(n)],
+            }
+
+    def vwap_to_fill(self, side, quantity):
+        """
+        Walk the book to estimate a market order's fill
+
+        Args:
+            side (str): 'BUY' consumes asks, 'SELL' consumes bids
+            quantity (float): Quantity to fill
+
+        Returns:
+            dict: vwap, filled quantity and the worst price touched
+        """
+        levels = self.asks if side == 'BUY' else self.bids
+        remaining = quantity
+        notional = 0.0
+        worst_price = None
+        with self._lock:
+            for price, level_quantity in levels.levels():
+                take = min(remaining, level_quantity)
+                notional += take * price
+                remaining -= take
+                worst_price = price
+                if remaining <= 0:
+                    break
+        filled = quantity - remaining
+        return {
+            'vwap': notional / filled if filled else None,
+            'filled': filled,
+            'worst_price': worst_price,
+        }
+
+    def quantity_within(self, side, max_slippage_bps):
+        """Return the quantity fillable by a market order without moving past max_slippage_bps from the best price"""
+        levels = self.asks if side == 'BUY' else self.bids
+        with self._lock:
+            best = levels.best()
+            if not best:
+                return 0.0
+            band = best[0] * max_slippage_bps / 10000
+            limit = best[0] + band if side == 'BUY' else best[0] - band
+            total = 0.0
+            for price, level_quantity in levels.levels():
+                if (side == 'BUY' and price > limit) or (side == 'SELL' and price < limit):
+                    break
+                total += level_quantity
+        return total
+
+
+class OrderBookManager(CombinedStream):
+    """
+    Maintains local order books for all symbols from @depth diff streams
+
+    Diffs received before a book has its snapshot are buffered. Snapshots
+    are fetched on a separate thread so a resync never blocks the stream.
+    """
+
+    name = 'order-book-stream'
+
+    def __init__(self, binance_client, symbols=None, url=None):
+        super().__init__(symbols, url)
+        self.binance_client = binance_client
+        self.books = {symbol: OrderBook(symbol) for symbol in self.symbols}
+        self._buffers = {symbol: [] for symbol in self.symbols}
+        self._resync_queue = queue.Queue()
+        self._pending_resync = set()
+        self._resync_thread = None
+
+    def _streams_for(self, symbols):
+        return [f"{symbol.lower()}@depth@{Config.ORDER_BOOK_UPDATE_SPEED}" for symbol in sorted(symbols)]
+
+    def start(self):
+        super().start()
+        if not self._resync_thread or not self._resync_thread.is_alive():
+            self._resync_thread = threading.Thread(target=self._resync_loop, name='order-book-resync', daemon=True)
+            self._resync_thread.start()
+
+    def stop(self):
+        super().stop()
+        self._resync_queue.put(None)
+
+    def add_symbols(self, symbols):
+        with self._lock:
+            for symbol in symbols:
+                if symbol not in self.books:
+                    self.books[symbol] = OrderBook(symbol)
+                    self._buffers[symbol] = []
+        super().add_symbols(symbols)
+
+    def get_book(self, symbol):
+        """Return the synced book of symbol, or None while it is unknown or resyncing"""
+        book = self.books.get(symbol)
+        return book if book and book.synced else None
+
+    def _on_connected(self):
+        # Diffs were lost while disconnected, every book needs a fresh snapshot
+        for symbol in list(self.books):
+            self._request_resync(symbol)
+
+    def _request_resync(self, symbol):
+        with self._lock:
+            self.books[symbol].synced = False
+            self._buffers[symbol] = []
+            if symbol in self._pending_resync:
+                return
+            self._pending_resync.add(symbol)
+        self._resync_queue.put(symbol)
+
+    def _handle_event(self, stream, event):
+        if event.get('e') != 'depthUpdate':
+            return
+        symbol = event['s']
+        book = self.books.get(symbol)
+        if book is None:
+            return
+
+        with self._lock:
+            if symbol in self._pending_resync:
+                self._buffers[symbol].append(event)
+                return
+
+        try:
+            book.apply_diff(event)
+        except OrderBookGapError as e:
+            logger.warning(f"Order book gap detected, resyncing: {str(e)}")
+            self._request_resync(symbol)
+
+    def _resync_loop(self):
+        """Fetch snapshots for books that lost sync and replay buffered diffs"""
+        while True:
+            symbol = self._resync_queue.get()
+            if symbol is None:
+                return
+            try:
+                snapshot = self.binance_client.get_order_book(symbol, limit=Config.ORDER_BOOK_SNAPSHOT_LIMIT)
+                book = self.books[symbol]
+                with self._lock:
+                    buffered = self._buffers[symbol]
+                    self._buffers[symbol] = []
+                    self._pending_resync.discard(symbol)
+                    # Replay under the lock so no live diff can slip in between
+                    book.apply_snapshot(snapshot, buffered)
+                logger.info(f"Order book for {symbol} synced at update {book.last_update_id}")
+            except OrderBookGapError as e:
+                logger.warning(f"Buffered diffs do not continue the snapshot, retrying: {str(e)}")
+                with self._lock:
+                    self._pending_resync.discard(symbol)
+                self._request_resync(symbol)
+            except Exception as e:
+                logger.error(f"Failed to resync order book for {symbol}: {str(e)}")
+                with self._lock:
+                    self._pending_resync.discard(symbol)
+                if not self._stop.is_set():
+                    self._stop.wait(1)
+                    self._request_resync(symbol)
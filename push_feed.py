@@ -0,0 +1,201 @@
+import itertools
+import json
+import threading
+from collections import deque
+
+from config import Config
+from utils.logger import logger
+
+
+def _encode_event(name, payload):
+    """Format one Server-Sent Event"""
+    return f"event: {name}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+class PushClient:
+    """
+    One connected browser: a bounded queue of pending, already encoded events
+
+    When the client reads slower than the feed changes and its queue fills
+    up, the queued deltas are dropped and the next read returns a full
+    snapshot instead, so a slow client never holds back the feed or the
+    other clients.
+    """
+
+    def __init__(self, hub, max_queue):
+        self.hub = hub
+        self.max_queue = max_queue
+        self.needs_snapshot = True
+        self.dropped = 0
+        self._events = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def _push(self, event):
+        with self._condition:
+            if self.needs_snapshot:
+                return
+            if len(self._events) >= self.max_queue:
+                self.dropped += len(self._events)
+                self._events.clear()
+                self.needs_snapshot = True
+            else:
+                self._events.append(event)
+            self._condition.notify()
+
+    def next_event(self, timeout=None):
+        """Return the next encoded event, or None after timeout without changes"""
+        with self._condition:
+            if not self.needs_snapshot and not self._events and not self._closed:
+                self._condition.wait(timeout)
+            if self._closed:
+                return None
+            if self.needs_snapshot:
+                self.needs_snapshot = False
+                self._events.clear()
+                return _encode_event('snapshot', self.hub.get_snapshot())
+            if self._events:
+                return self._events.popleft()
+            return None
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self.hub.unsubscribe(self)
+
+
+class PushHub:
+    """
+    Fans one server-side data feed out to any number of browser connections
+
+    A single thread polls `loader` every Config.PUSH_INTERVAL seconds while
+    at least one client is connected; loader returns {section: {key: record}}
+    (tickers, balances, open orders). Only records that changed or
+    disappeared since the previous poll are sent, as one delta event encoded
+    once and shared by every client, so upstream load, diffing and
+    serialization cost do not grow with the number of connections.
+    """
+
+    def __init__(self, loader, interval=None, max_queue=None):
+        self.loader = loader
+        self.interval = interval or Config.PUSH_INTERVAL
+        self.max_queue = max_queue or Config.PUSH_CLIENT_QUEUE_SIZE
+        self._state = {}
+        self._sequence = itertools.count(1)
+        self._seq = 0
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'polls': 0, 'deltas': 0, 'errors': 0}
+
+    def start(self):
+        """Start the feed thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='push-hub', daemon=True)
+        self._thread.start()
+        logger.info("Push hub started")
+
+    def stop(self):
+        """Stop the feed thread and disconnect every client"""
+        self._stop.set()
+        self._wakeup.set()
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.close()
+
+    def subscribe(self):
+        """Register a new client; its first event is a full snapshot"""
+        client = PushClient(self, self.max_queue)
+        with self._lock:
+            self._clients.add(client)
+            first = len(self._clients) == 1
+        if first:
+            # Idle feeds don't poll; fetch right away for the first client
+            self._wakeup.set()
+        return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def get_snapshot(self):
+        """Return the full current state with its sequence number"""
+        with self._lock:
+            return {'seq': self._seq, 'state': self._state}
+
+    def poll(self):
+        """Load the feed once, diff it against the previous state and fan the delta out"""
+        try:
+            new_state = self.loader()
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"Push feed poll failed: {str(e)}")
+            return None
+        self._stats['polls'] += 1
+
+        changed = {}
+        removed = {}
+        with self._lock:
+            # Sections missing from this poll (e.g. a failed upstream call) keep their last state
+            state = dict(self._state)
+            for section, records in new_state.items():
+                previous = state.get(section, {})
+                section_changed = {key: record for key, record in records.items() if previous.get(key) != record}
+                section_removed = [key for key in previous if key not in records]
+                if section_changed:
+                    changed[section] = section_changed
+                if section_removed:
+                    removed[section] = section_removed
+                state[section] = records
+
+            if not changed and not removed:
+                return None
+            self._seq = next(self._sequence)
+            self._state = state
+            delta = {'seq': self._seq, 'changed': changed, 'removed': removed}
+            clients = list(self._clients)
+
+        self._stats['deltas'] += 1
+        event = _encode_event('delta', delta)
+        for client in clients:
+            client._push(event)
+        return delta
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                has_clients = bool(self._clients)
+            if has_clients:
+                self.poll()
+            self._wakeup.wait(self.interval if has_clients else None)
+            self._wakeup.clear()
+
+    def stream(self, client, heartbeat=None):
+        """Yield a client's events as Server-Sent Events text, with keep-alive comments"""
+        heartbeat = heartbeat or Config.PUSH_HEARTBEAT_INTERVAL
+        try:
+            while not self._stop.is_set():
+                event = client.next_event(timeout=heartbeat)
+                yield event if event is not None else ': keep-alive\n\n'
+        finally:
+            client.close()
+
+    def get_stats(self):
+        """Return connected clients, poll/delta counters and per-client backlog"""
+        with self._lock:
+            clients = list(self._clients)
+        return {
+            'clients': len(clients),
+            'seq': self._seq,
+            'polls': self._stats['polls'],
+            'deltas': self._stats['deltas'],
+            'errors': self._stats['errors'],
+            'queued_events': sum(len(client._events) for client in clients),
+            'dropped_events': sum(client.dropped for client in clients),
+        }
@@ -0,0 +1,371 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+from utils.logger import logger
+from utils.rate_limit import TokenBucket
+
+OPEN_STATUSES = ('NEW', 'PARTIALLY_FILLED')
+
+
+class RiskRejected(ValueError):
+    """An order failed a pre-trade risk check; `check` names which one"""
+
+    def __init__(self, message, check=None):
+        super().__init__(message)
+        self.check = check
+
+
+class _SymbolRisk:
+    """Exposure of one symbol, updated in place on every order event"""
+
+    __slots__ = ('limits', 'position', 'open_buy', 'open_sell', 'open_notional', 'price', 'leverage', 'margin',
+                 'order_rate')
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.position = 0.0  # signed base quantity, net of hedge-mode sides
+        self.open_buy = 0.0
+        self.open_sell = 0.0
+        self.open_notional = 0.0
+        self.price = None  # last known price used to value the position
+        self.leverage = 1.0
+        self.margin = 0.0
+        count, interval = limits['max_orders'] or (None, None)
+        self.order_rate = TokenBucket(count, interval) if count else None
+
+    def to_dict(self):
+        return {
+            'position': self.position,
+            'open_buy': self.open_buy,
+            'open_sell': self.open_sell,
+            'open_notional': self.open_notional,
+            'price': self.price,
+            'leverage': self.leverage,
+            'margin': self.margin,
+            'limits': self.limits,
+        }
+
+
+class RiskEngine:
+    """
+    Pre-trade risk checks against incrementally maintained exposure
+
+    Positions, open-order quantity and notional and margin usage are kept
+    per symbol and updated from order acks, cancels and user data stream
+    order updates, so check_order answers from memory with no request.
+    A passed check reserves the order's exposure until its ack (or
+    failure) settles it, which keeps concurrent and batched orders from
+    each passing against the same headroom.
+
+    A full resync from the account and open orders runs every
+    sync_interval seconds to correct anything the incremental updates
+    missed (e.g. fills while the user stream was down). Orders are
+    rejected until the first sync.
+    """
+
+    def __init__(self, binance_client, user_stream=None, limits=None, sync_interval=None):
+        self.binance_client = binance_client
+        self.user_stream = user_stream
+        self.limits = limits or Config.RISK_LIMITS
+        self.sync_interval = sync_interval or Config.RISK_SYNC_INTERVAL
+        self.max_margin_usage = Config.RISK_MAX_MARGIN_USAGE
+        self.margin_used = 0.0
+        self.margin_balance = None
+        self.synced_at = None
+        self.checked = 0
+        self.rejected = {}  # check name -> count
+        self._symbols = {}
+        # (symbol, orderId) or reservation key -> [symbol, side, remaining qty, price, executed qty];
+        # order IDs are only unique per symbol
+        self._orders = {}
+        self._finished = OrderedDict()  # recently finished (symbol, orderId); late updates for them are ignored
+        self._reservations = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _limits_for(self, symbol):
+        return {**self.limits['default'], **self.limits.get(symbol, {})}
+
+    def _state(self, symbol):
+        state = self._symbols.get(symbol)
+        if state is None:
+            state = self._symbols[symbol] = _SymbolRisk(self._limits_for(symbol))
+        return state
+
+    def _update_margin(self, state):
+        """Re-derive a symbol's margin and move the account total by the difference"""
+        margin = (abs(state.position) * (state.price or 0.0) + state.open_notional) / state.leverage
+        self.margin_used += margin - state.margin
+        state.margin = margin
+
+    def _add_open(self, state, side, quantity, price, sign=1):
+        if side == 'BUY':
+            state.open_buy = max(state.open_buy + sign * quantity, 0.0)
+        else:
+            state.open_sell = max(state.open_sell + sign * quantity, 0.0)
+        state.open_notional = max(state.open_notional + sign * quantity * price, 0.0)
+
+    def _reference_price(self, symbol):
+        """Streamed last price, else the local book mid; no request is made"""
+        client = self.binance_client
+        if client.ticker_store:
+            price = client.ticker_store.get_price(symbol, max_age=Config.STREAM_MAX_AGE)
+            if price:
+                return float(price)
+        book = client._get_local_book(symbol)
+        return book.mid_price() if book is not None else None
+
+    def _reject(self, check, message):
+        self.rejected[check] = self.rejected.get(check, 0) + 1
+        raise RiskRejected(message, check)
+
+    def check_order(self, symbol, side, quantity, price=None, stop_price=None, replaces=None, count_rate=True):
+        """
+        Check an order against the symbol's limits and reserve its exposure
+
+        Args:
+            symbol, side, quantity, price, stop_price: The order
+                as it will be sent (after tick/step rounding)
+            replaces: orderId of an open order of symbol this one modifies; its
+                remaining exposure is not counted
+            count_rate: False for the further orders of a batch, which
+                takes one order rate token per symbol as a whole
+
+        Returns:
+            str: Reservation key to pass to on_order_ack (or release)
+
+        Raises:
+            RiskRejected: The order breaches a limit
+        """
+        quantity = float(quantity)
+        price = float(price) if price else None
+        stop_price = float(stop_price) if stop_price else None
+        reference = self._reference_price(symbol)
+
+        with self._lock:
+            self.checked += 1
+            if self.synced_at is None:
+                self._reject('sync', "Risk engine has not loaded positions and open orders yet")
+            state = self._state(symbol)
+            limits = state.limits
+            reference = reference or state.price
+
+            # Fat-finger guard: limit and stop prices must be near the market
+            band = limits['price_band_bps']
+            if band and reference:
+                for label, value in (('Price', price), ('Stop price', stop_price)):
+                    if value and abs(value - reference) / reference * 10000 > band:
+                        self._reject('price_band', f"{label} {value} is more than {band} bps from the {symbol} "
+                                                   f"reference price {reference}")
+
+            fill_price = price or stop_price or reference
+            notional = quantity * fill_price if fill_price else 0.0
+            if limits['max_order_notional'] and notional > limits['max_order_notional']:
+                self._reject('order_notional', f"Order notional {notional:.2f} is above the {symbol} limit of "
+                                               f"{limits['max_order_notional']}")
+
+            open_buy, open_sell, open_notional = state.open_buy, state.open_sell, state.open_notional
+            replaced = self._orders.get((symbol, replaces)) if replaces is not None else None
+            if replaced:
+                open_buy -= replaced[2] if replaced[1] == 'BUY' else 0.0
+                open_sell -= replaced[2] if replaced[1] == 'SELL' else 0.0
+                open_notional -= replaced[2] * replaced[3]
+
+            # Worst case: every open order on this side fills along with this one.
+            # Orders that bring it closer to flat always pass.
+            before = state.position + open_buy if side == 'BUY' else state.position - open_sell
+            after = before + quantity if side == 'BUY' else before - quantity
+            if limits['max_position'] is not None and abs(after) > limits['max_position'] and abs(after) > abs(before):
+                self._reject('position', f"{symbol} position could reach {after:g}, above the limit of "
+                                         f"{limits['max_position']}")
+
+            exposure = abs(state.position) * (state.price or fill_price or 0.0) + open_notional + notional
+            if limits['max_symbol_notional'] and exposure > limits['max_symbol_notional']:
+                self._reject('symbol_notional', f"{symbol} exposure would be {exposure:.2f}, above the limit of "
+                                                f"{limits['max_symbol_notional']}")
+
+            if self.margin_balance and self.max_margin_usage:
+                required = self.margin_used + notional / state.leverage
+                if required > self.margin_balance * self.max_margin_usage:
+                    self._reject('margin', f"Margin use would be {required:.2f} of a {self.margin_balance:.2f} "
+                                           f"balance, above the {self.max_margin_usage:.0%} limit")
+
+            if state.order_rate and count_rate:
+                now = time.monotonic()
+                if state.order_rate.time_until(1, now) > 0:
+                    self._reject('order_rate', f"More than {limits['max_orders'][0]} {symbol} orders in "
+                                               f"{limits['max_orders'][1]}s")
+                state.order_rate.consume(1, now)
+
+            key = f"reservation-{next(self._reservations)}"
+            self._orders[key] = [symbol, side, quantity, fill_price or 0.0, 0.0]
+            self._add_open(state, side, quantity, fill_price or 0.0)
+            self._update_margin(state)
+            return key
+
+    def release(self, key):
+        """Drop a reservation whose order was never accepted"""
+        with self._lock:
+            self._release(key)
+
+    def _release(self, key):
+        record = self._orders.pop(key, None)
+        if record:
+            state = self._state(record[0])
+            self._add_open(state, record[1], record[2], record[3], sign=-1)
+            self._update_margin(state)
+
+    def on_order_ack(self, key, order=None):
+        """Settle a reservation with the exchange's response (None or an error result releases it)"""
+        with self._lock:
+            self._release(key)
+            if order and order.get('orderId') is not None:
+                self._apply_order(order)
+
+    def on_order_update(self, order):
+        """Apply an order in the REST shape: an ack, a cancel result or a user data stream update"""
+        if not order or order.get('orderId') is None:
+            return
+        with self._lock:
+            self._apply_order(order)
+
+    def _apply_order(self, order, count_fills=True):
+        key = (order['symbol'], order['orderId'])
+        if key in self._finished:
+            return
+        state = self._state(order['symbol'])
+        previous = self._orders.pop(key, None)
+        executed = float(order.get('executedQty') or 0)
+        if previous:
+            self._add_open(state, previous[1], previous[2], previous[3], sign=-1)
+            # Updates can arrive out of order (stream before ack); fills only grow
+            filled = max(executed - previous[4], 0.0)
+            executed = max(executed, previous[4])
+        else:
+            filled = executed if count_fills else 0.0
+
+        if filled:
+            state.position += filled if order['side'] == 'BUY' else -filled
+            avg_price = float(order.get('avgPrice') or 0)
+            if avg_price:
+                state.price = avg_price
+
+        remaining = float(order.get('origQty') or 0) - executed
+        if order.get('status') in OPEN_STATUSES and remaining > 0:
+            price = float(order.get('price') or 0) or float(order.get('stopPrice') or 0) or state.price or 0.0
+            self._orders[key] = [order['symbol'], order['side'], remaining, price, executed]
+            self._add_open(state, order['side'], remaining, price)
+        else:
+            self._finished[key] = None
+            while len(self._finished) > Config.RISK_FINISHED_ORDERS:
+                self._finished.popitem(last=False)
+        self._update_margin(state)
+
+    def on_all_cancelled(self, symbol):
+        """
+        Release the exposure of every tracked open order of symbol after a cancel-all
+
+        The exchange does not list what it cancelled. Each order is kept
+        with nothing remaining, so a late stream update still counts only
+        fills it has not seen; reservations of orders in flight are kept.
+        """
+        with self._lock:
+            state = self._state(symbol)
+            for key, record in self._orders.items():
+                if isinstance(key, tuple) and key[0] == symbol and record[2]:
+                    self._add_open(state, record[1], record[2], record[3], sign=-1)
+                    record[2] = 0.0
+            self._update_margin(state)
+
+    def sync(self):
+        """
+        Rebuild positions, open orders and the margin balance from a snapshot
+
+        The user data store is used while it is ready, REST otherwise.
+        Outstanding reservations and order rate budgets are kept.
+        """
+        store = self.user_stream.store if self.user_stream and self.user_stream.is_ready() else None
+        account = store.get_account() if store else self.binance_client.get_account_info()
+        open_orders = store.get_open_orders() if store else self.binance_client.get_open_orders()
+
+        with self._lock:
+            previous = self._symbols
+            self._symbols = {}
+            for symbol, state in previous.items():
+                # Keep the rate limit budget; everything else comes from the snapshot
+                self._state(symbol).order_rate = state.order_rate
+            reservations = {key: record for key, record in self._orders.items() if not isinstance(key, tuple)}
+            self._orders = {}
+
+            for position in account.get('positions', []):
+                state = self._state(position['symbol'])
+                # Leverage sets the margin of new orders even while the symbol is flat
+                state.leverage = float(position.get('leverage') or 1)
+                amount = float(position.get('positionAmt') or 0)
+                if not amount:
+                    continue
+                state.position += amount
+                state.price = float(position.get('markPrice') or position.get('entryPrice') or 0) or state.price
+            for order in open_orders:
+                # Fills before the snapshot are already in the position
+                self._apply_order(order, count_fills=False)
+            for key, record in reservations.items():
+                self._orders[key] = record
+                self._add_open(self._state(record[0]), record[1], record[2], record[3])
+            self.margin_used = 0.0
+            for state in self._symbols.values():
+                state.margin = 0.0
+                self._update_margin(state)
+
+            self.margin_balance = float(account.get('totalMarginBalance') or 0) or None
+            self.synced_at = time.time()
+        logger.info(f"Risk engine synced {len(open_orders)} open orders across {len(self._symbols)} symbols")
+
+    def start(self):
+        """Resync every sync_interval seconds in a daemon thread, starting now unless already synced"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='risk-engine', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        if self.synced_at and self._stop.wait(max(self.synced_at + self.sync_interval - time.time(), 0)):
+            return
+        while not self._stop.is_set():
+            try:
+                self.sync()
+                wait = self.sync_interval
+            except Exception as e:
+                logger.error(f"Failed to sync risk engine: {str(e)}")
+                wait = min(self.sync_interval, 30)
+            if self._stop.wait(wait):
+                return
+
+    def get_exposure(self, symbol=None):
+        """Return the tracked exposure and limits of a symbol or all symbols"""
+        with self._lock:
+            return {
+                name: state.to_dict() for name, state in self._symbols.items()
+                if symbol is None or name == symbol
+            }
+
+    def get_stats(self):
+        """Return margin usage, check and rejection counts and sync state"""
+        with self._lock:
+            return {
+                'synced_at': self.synced_at,
+                'margin_used': self.margin_used,
+                'margin_balance': self.margin_balance,
+                'max_margin_usage': self.max_margin_usage,
+                'open_orders': len(self._orders),
+                'checked': self.checked,
+                'rejected': dict(self.rejected),
+            }
@@ -2,6 +2,8 @@
 let orderBookData = {};
 let marketData = {};
 let marketDataInterval = null; // Add this global variable
+let pushState = null; // live tickers, balances and open orders from /api/stream
+let pushSeq = 0;
 
 // Document ready function
 $(document).ready(function() {
@@ -84,10 +86,8 @@ function initializeFormHandlers() {
                 // Reset form
                 $('#orderForm')[0].reset();
                 
-                // Refresh order history
-                loadOrderHistory();
-                loadOpenOrders();
-                loadAccountBalance();
+                // Refresh orders and balances
+                loadDashboard();
             },
             error: function(xhr) {
                 let errorMsg = 'Failed to place order';
@@ -125,8 +125,7 @@ function initializeFormHandlers() {
                     alert('Order cancelled successfully');
                     
                     // Refresh order lists
-                    loadOpenOrders();
-                    loadOrderHistory();
+                    loadDashboard();
                 },
                 error: function(xhr) {
                     let errorMsg = 'Failed to cancel order';
@@ -212,6 +211,108 @@ function updateMarketDataUI(data) {
     $('#priceChange').removeClass('text-success text-danger').addClass(priceChangeClass);
 }
 
+// Load account, orders and tickers in one snapshot request
+function loadDashboard() {
+    $.ajax({
+        url: '/api/dashboard',
+        type: 'GET',
+        ifModified: true,  // send If-None-Match; unchanged snapshots come back as 304
+        success: function(response, textStatus) {
+            if (textStatus === 'notmodified' || !response) {
+                return;
+            }
+            
+            const errors = response.errors || {};
+            // orders is left out until the server's order stores are synced
+            if (response.orders && !errors.orders) {
+                updateOrderHistoryTable(response.orders);
+            }
+            if (!errors.open_orders) {
+                updateOpenOrdersTable(response.open_orders);
+            }
+            if (!errors.account) {
+                updateAccountBalanceTable(response.account);
+            }
+            
+            // Update the selected symbol's ticker from the snapshot
+            const symbol = $('#symbol').val();
+            const ticker = (response.tickers || []).find(item => item.symbol === symbol);
+            if (ticker) {
+                marketData = ticker;
+                updateMarketDataUI(ticker);
+            }
+        },
+        error: function(xhr) {
+            console.error('Failed to load dashboard', xhr);
+        }
+    });
+}
+
+// Follow live tickers, balances and open orders over Server-Sent Events
+function startPushStream() {
+    if (!window.EventSource) {
+        return false;
+    }
+    
+    // EventSource reconnects on its own; the server starts every connection with a snapshot
+    const source = new EventSource('/api/stream');
+    
+    source.addEventListener('snapshot', function(e) {
+        const snapshot = JSON.parse(e.data);
+        pushState = snapshot.state;
+        pushSeq = snapshot.seq;
+        renderPushSections(Object.keys(pushState));
+    });
+    
+    source.addEventListener('delta', function(e) {
+        const delta = JSON.parse(e.data);
+        if (!pushState || delta.seq <= pushSeq) {
+            return;
+        }
+        pushSeq = delta.seq;
+        
+        const sections = new Set();
+        Object.entries(delta.changed).forEach(([section, records]) => {
+            pushState[section] = Object.assign(pushState[section] || {}, records);
+            sections.add(section);
+        });
+        Object.entries(delta.removed).forEach(([section, keys]) => {
+            keys.forEach(key => delete pushState[section][key]);
+            sections.add(section);
+        });
+        renderPushSections(Array.from(sections));
+        
+        // Open orders that disappeared were filled or cancelled
+        if (delta.removed.orders) {
+            loadOrderHistory();
+        }
+    });
+    
+    source.onerror = function(e) {
+        console.error('Push stream interrupted, reconnecting', e);
+    };
+    return true;
+}
+
+// Re-render the parts of the page fed by the given push sections
+function renderPushSections(sections) {
+    if (sections.includes('tickers')) {
+        const symbol = $('#symbol').val();
+        const ticker = symbol && pushState.tickers[symbol];
+        if (ticker) {
+            marketData = Object.assign({ symbol: symbol }, ticker);
+            updateMarketDataUI(marketData);
+        }
+    }
+    if (sections.includes('balances')) {
+        const assets = Object.entries(pushState.balances).map(([asset, balance]) => Object.assign({ asset: asset }, balance));
+        updateAccountBalanceTable({ assets: assets });
+    }
+    if (sections.includes('orders')) {
+        updateOpenOrdersTable(Object.values(pushState.orders));
+    }
+}
+
 // Load order history
 function loadOrderHistory() {
     $.ajax({
@@ -509,24 +610,5 @@ function showOrderStatus(response, success) {
 
 // Refresh all data
 function refreshData() {
-    // Get selected symbol
-    const symbol = $('#symbol').val();
-    
-    // Refresh market data if symbol is selected
-    if (symbol) {
-        $.ajax({
-            url: '/api/market-data',
-            type: 'GET',
-            data: { symbol: symbol },
-            success: function(response) {
-                marketData = response;
-                updateMarketDataUI(response);
-            }
-        });
-    }
-    
-    // Refresh order history and account balance
-    loadOrderHistory();
-    loadOpenOrders();
-    loadAccountBalance();
-}
\ No newline at end of file
+    loadDashboard();
+}
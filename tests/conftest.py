@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+import pytest
+
+from config import Config
+
+# Keep test runs out of the app's log file; must run before utils.logger is imported
+Config.LOG_FILE = os.path.join(tempfile.mkdtemp(prefix='trading-bot-tests-'), 'trading_bot.log')
+Config.LOG_CONSOLE = False
+
+from benchmarks.stub_exchange import StubExchange  # noqa: E402
+from binance_client import BinanceClient  # noqa: E402
+
+API_SECRET = 'test-secret'
+
+
+@pytest.fixture
+def exchange():
+    """Stub exchange that verifies request signatures with API_SECRET"""
+    with StubExchange(api_secret=API_SECRET) as exchange:
+        yield exchange
+
+
+@pytest.fixture
+def client(exchange):
+    """BinanceClient pointed at the stub exchange"""
+    client = BinanceClient(api_key='test-key', api_secret=API_SECRET)
+    client.base_url = exchange.url
+    yield client
+    client.transport.close()
@@ -0,0 +1,153 @@
+"""
+Minimal local WebSocket server standing in for the Binance combined stream
+
+Speaks just enough RFC 6455 for websocket-client: the upgrade handshake,
+text frames in both directions, ping/pong and close. Messages received
+from clients are kept in `received` (decoded JSON); send() pushes a message
+to every open connection and drop_connections() cuts them without a close
+frame, like a network failure.
+"""
+import base64
+import hashlib
+import json
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+def _frame(opcode, payload=b''):
+    header = bytes([0x80 | opcode])
+    if len(payload) < 126:
+        header += bytes([len(payload)])
+    elif len(payload) < 65536:
+        header += bytes([126]) + struct.pack('!H', len(payload))
+    else:
+        header += bytes([127]) + struct.pack('!Q', len(payload))
+    return header + payload
+
+
+def _recv_exact(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('closed')
+        data += chunk
+    return data
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sock = self.request
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+        headers = dict(
+            line.split(': ', 1) for line in request.decode().split('\r\n')[1:] if ': ' in line
+        )
+        headers = {name.lower(): value for name, value in headers.items()}
+        accept = base64.b64encode(hashlib.sha1((headers['sec-websocket-key'] + _GUID).encode()).digest()).decode()
+        sock.sendall((
+            'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+            f'Sec-WebSocket-Accept: {accept}\r\n\r\n'
+        ).encode())
+
+        self.server.opened(sock)
+        try:
+            while True:
+                first, second = _recv_exact(sock, 2)
+                opcode, length = first & 0x0F, second & 0x7F
+                if length == 126:
+                    (length,) = struct.unpack('!H', _recv_exact(sock, 2))
+                elif length == 127:
+                    (length,) = struct.unpack('!Q', _recv_exact(sock, 8))
+                mask = _recv_exact(sock, 4) if second & 0x80 else b'\0\0\0\0'
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(_recv_exact(sock, length)))
+                if opcode == 0x1:
+                    self.server.receive(json.loads(payload))
+                elif opcode == 0x9:
+                    self.server.write(sock, _frame(0xA, payload))
+                elif opcode == 0x8:
+                    self.server.write(sock, _frame(0x8, payload))
+                    return
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.server.closed(sock)
+
+
+class FakeWebSocketServer(socketserver.ThreadingTCPServer):
+    """Threaded fake stream server; use as a context manager to run it in the background"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.received = []
+        self.connections_opened = 0
+        self._sockets = set()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.server_address[1]}"
+
+    def opened(self, sock):
+        with self._lock:
+            self._sockets.add(sock)
+            self.connections_opened += 1
+
+    def closed(self, sock):
+        with self._lock:
+            self._sockets.discard(sock)
+
+    def receive(self, message):
+        with self._lock:
+            self.received.append(message)
+
+    def write(self, sock, frame):
+        with self._lock:
+            sock.sendall(frame)
+
+    def send(self, message):
+        """Send a JSON message to every open connection"""
+        frame = _frame(0x1, json.dumps(message).encode())
+        with self._lock:
+            for sock in list(self._sockets):
+                sock.sendall(frame)
+
+    def drop_connections(self):
+        """Cut every open connection without a close handshake"""
+        with self._lock:
+            for sock in self._sockets:
+                sock.shutdown(socket.SHUT_RDWR)
+
+    def subscriptions(self):
+        """Stream names of every SUBSCRIBE request received, in order"""
+        with self._lock:
+            return [message['params'] for message in self.received if message.get('method') == 'SUBSCRIBE']
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.drop_connections()
+        self.shutdown()
+        self.server_close()
+
+
+def wait_until(condition, timeout=5.0):
+    """Poll condition() until it is true; returns its last value"""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
@@ -0,0 +1,42 @@
+"""Flask routes of app.py, imported in a fresh interpreter pointed at the stub exchange"""
+import os
+import subprocess
+import sys
+import textwrap
+
+from benchmarks.stub_exchange import StubExchange
+
+
+def _run_app_script(script, exchange, tmp_path):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, BENCHMARK_EXCHANGE_URL=exchange.url, BENCHMARK_DATA_DIR=str(tmp_path))
+    result = subprocess.run([sys.executable, '-c', textwrap.dedent(script)], cwd=root, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith('ok')
+
+
+def test_dashboard_etag_and_orders_without_a_store(tmp_path):
+    script = """
+        from benchmarks.load import create_app
+
+        client = create_app().test_client()
+        first = client.get('/api/dashboard')
+        assert first.status_code == 200
+        snapshot = first.get_json()
+        assert snapshot['errors'] == {}, snapshot['errors']
+        # No order store is synced, and REST order history needs a symbol
+        assert 'orders' not in snapshot
+        assert first.headers['ETag']
+
+        second = client.get('/api/dashboard', headers={'If-None-Match': first.headers['ETag']})
+        assert second.status_code == 304
+        assert second.data == b''
+
+        assert client.get('/api/orders').get_json() == []
+        assert client.get('/api/orders?symbol=BTCUSDT').status_code == 200
+        print('ok')
+    """
+    with StubExchange() as exchange:
+        _run_app_script(script, exchange, tmp_path)
+        assert exchange.calls['GET /fapi/v1/allOrders'] == 1
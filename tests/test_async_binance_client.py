@@ -0,0 +1,86 @@
+"""AsyncBinanceClient and its SyncAsyncClient facade against the stub exchange, compared with BinanceClient"""
+import asyncio
+import threading
+
+import aiohttp
+import pytest
+import requests
+
+from async_binance_client import AsyncBinanceClient, SyncAsyncClient
+from tests.conftest import API_SECRET
+from utils.metrics import UPSTREAM_ERRORS
+from utils.transport import HttpTransport
+
+_VOLATILE = ('orderId', 'time', 'updateTime', 'closeTime')
+
+
+def _stable(payload):
+    """Drop the fields the stub fills from a clock or counter"""
+    if isinstance(payload, list):
+        return [_stable(item) for item in payload]
+    return {key: value for key, value in payload.items() if key not in _VOLATILE}
+
+
+def _errors(method, endpoint, status):
+    return UPSTREAM_ERRORS._values.get((method, endpoint, status), 0)
+
+
+def test_async_client_answers_like_the_sync_client(exchange, client):
+    async def run():
+        async with AsyncBinanceClient(api_key='test-key', api_secret=API_SECRET) as async_client:
+            async_client.base_url = exchange.url
+            return await asyncio.gather(
+                async_client.get_account_info(),
+                async_client.get_market_data(['BTCUSDT', 'ETHUSDT']),
+                async_client.place_order('BTCUSDT', 'SELL', 'LIMIT', 0.5, price=101),
+            )
+
+    account, tickers, order = asyncio.run(run())
+    assert account == client.get_account_info()
+    assert _stable(tickers) == _stable(client.get_market_data(['BTCUSDT', 'ETHUSDT']))
+    assert _stable(order) == _stable(client.place_order('BTCUSDT', 'SELL', 'LIMIT', 0.5, price=101))
+    assert exchange.calls['POST /fapi/v1/order'] == 2
+
+
+def test_errors_are_counted_once_by_both_clients(exchange, client):
+    before = _errors('GET', '/fapi/v2/account', 503)
+    exchange.failures = 1
+
+    async def run():
+        async with AsyncBinanceClient(api_key='test-key', api_secret=API_SECRET) as async_client:
+            async_client.base_url = exchange.url
+            await async_client.get_account_info()
+
+    with pytest.raises(aiohttp.ClientResponseError) as error:
+        asyncio.run(run())
+    assert error.value.status == 503
+    assert _errors('GET', '/fapi/v2/account', 503) == before + 1
+
+    client.transport = HttpTransport(max_retries=0)
+    exchange.failures = 1
+    with pytest.raises(requests.HTTPError):
+        client.get_account_info()
+    assert _errors('GET', '/fapi/v2/account', 503) == before + 2
+
+
+def test_sync_facade_serves_blocking_callers_from_many_threads(exchange):
+    facade = SyncAsyncClient(api_key='test-key', api_secret=API_SECRET)
+    facade.async_client.base_url = exchange.url
+    try:
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(facade.place_order('BTCUSDT', 'BUY', 'LIMIT', 0.01, 100)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        assert len({order['orderId'] for order in results}) == 8
+        assert facade.get_account_info()['totalWalletBalance'] == '10000'
+        # Plain attributes pass through untouched
+        assert facade.base_url == exchange.url
+        assert exchange.calls['POST /fapi/v1/order'] == 8
+    finally:
+        facade.close()
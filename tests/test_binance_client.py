@@ -0,0 +1,97 @@
+"""BinanceClient request signing, retries and timeouts against the stub exchange"""
+import hashlib
+import hmac
+
+import pytest
+import requests
+
+from binance_client import BinanceClient
+from config import Config
+from utils.signing import RequestSigner
+from utils.transport import HttpTransport
+
+
+def test_signer_matches_exchange_example():
+    # Example from the Binance API documentation
+    signer = RequestSigner('NhqPtmdSJYdKjVHjA7PZj4Mge3R5YNiP1e3UZjInClVN65XAbvqqM6A7H5fATj0j')
+    query = ('symbol=LTCBTC&side=BUY&type=LIMIT&timeInForce=GTC&quantity=1&price=0.1'
+             '&recvWindow=5000&timestamp=1499827319559')
+    assert signer.sign(query) == 'c8db56825ae71d6d79447849e617115f4a920fa2acdcab2b053c4b2838bd6b71'
+
+
+def test_sign_params_appends_timestamp_and_signature(client):
+    signed = client._sign_params({'symbol': 'BTCUSDT'})
+    assert list(signed) == ['symbol', 'timestamp', 'recvWindow', 'signature']
+    payload = f"symbol=BTCUSDT&timestamp={signed['timestamp']}&recvWindow={Config.RECV_WINDOW}"
+    assert signed['signature'] == hmac.new(b'test-secret', payload.encode(), hashlib.sha256).hexdigest()
+
+
+def test_signed_get_and_post_are_accepted(client, exchange):
+    assert client.get_account_info()['totalWalletBalance'] == '10000'
+    order = client.place_order('BTCUSDT', 'BUY', 'LIMIT', 0.01, price=100)
+    assert order['status'] == 'NEW'
+    assert exchange.calls['GET /fapi/v2/account'] == 1
+    assert exchange.calls['POST /fapi/v1/order'] == 1
+
+
+def test_wrong_secret_is_rejected(exchange):
+    client = BinanceClient(api_key='test-key', api_secret='wrong-secret')
+    client.base_url = exchange.url
+    with pytest.raises(requests.HTTPError) as error:
+        client.get_account_info()
+    assert error.value.response.json()['code'] == -1022
+
+
+def test_stale_timestamp_resyncs_clock_and_resends(client, exchange):
+    client.server_clock.offset_ms = -60000
+    assert client.get_account_info()['totalWalletBalance'] == '10000'
+    assert abs(client.server_clock.offset_ms) < 1000
+    assert exchange.calls['GET /fapi/v2/account'] == 2
+    assert exchange.calls['GET /fapi/v1/time'] == Config.CLOCK_SYNC_SAMPLES
+
+
+def test_connections_are_reused(client):
+    client.ping()
+    client.ping()
+    timings = client.transport.get_timings()
+    assert [timing['reused'] for timing in timings] == [False, True]
+
+
+def test_reads_are_retried_on_server_errors(client, exchange):
+    client.transport = HttpTransport(max_retries=3, backoff_factor=0.01)
+    exchange.failures = 2
+    assert client.get_account_info()['totalWalletBalance'] == '10000'
+    assert exchange.calls['GET /fapi/v2/account'] == 3
+
+
+def test_reads_give_up_after_max_retries(client, exchange):
+    client.transport = HttpTransport(max_retries=2, backoff_factor=0.01)
+    exchange.failures = 10
+    with pytest.raises(requests.HTTPError) as error:
+        client.get_account_info()
+    assert error.value.response.status_code == 503
+    assert exchange.calls['GET /fapi/v2/account'] == 3
+
+
+def test_orders_are_never_resent(client, exchange):
+    client.transport = HttpTransport(max_retries=3, backoff_factor=0.01)
+    exchange.failures = 1
+    with pytest.raises(requests.HTTPError):
+        client.place_order('BTCUSDT', 'BUY', 'LIMIT', 0.01, price=100)
+    assert exchange.calls['POST /fapi/v1/order'] == 1
+
+
+def test_read_timeout_is_retried(client, exchange):
+    client.transport = HttpTransport(max_retries=1, backoff_factor=0.01, read_timeout=0.1)
+    exchange.latency = 0.3
+    with pytest.raises(requests.ConnectionError):
+        client.get_account_info()
+    assert exchange.calls['GET /fapi/v2/account'] == 2
+
+
+def test_order_timeout_is_not_retried(client, exchange):
+    client.transport = HttpTransport(max_retries=3, backoff_factor=0.01, read_timeout=0.1)
+    exchange.latency = 0.3
+    with pytest.raises(requests.Timeout):
+        client.place_order('BTCUSDT', 'BUY', 'LIMIT', 0.01, price=100)
+    assert exchange.calls['POST /fapi/v1/order'] == 1
@@ -0,0 +1,75 @@
+"""Local order rounding and validation against the stub exchange's trading rules"""
+import pytest
+
+from benchmarks.stub_exchange import _exchange_info
+from exchange_info import ExchangeInfoCache
+
+
+@pytest.fixture
+def exchange_info(client, tmp_path):
+    exchange_info = ExchangeInfoCache(client, cache_file=str(tmp_path / 'exchange_info.json'))
+    exchange_info.load()
+    client.exchange_info = exchange_info
+    return exchange_info
+
+
+def test_prices_round_to_the_tick_in_the_traders_favour(exchange_info):
+    # BTCUSDT tick size is 0.10, step size 0.001 (0.001 for market orders too)
+    buy = exchange_info.prepare_order('BTCUSDT', 'BUY', 'LIMIT', 0.0529, price=100.07)
+    sell = exchange_info.prepare_order('BTCUSDT', 'SELL', 'LIMIT', 0.0529, price=100.07)
+    assert buy == {'quantity': '0.052', 'price': '100', 'stop_price': None}
+    assert sell['price'] == '100.1'
+    stop = exchange_info.prepare_order('BTCUSDT', 'SELL', 'STOP_MARKET', '1.0009', stop_price='99.91')
+    assert stop == {'quantity': '1', 'price': None, 'stop_price': '100'}
+
+
+def test_filters_are_checked_after_rounding(exchange_info):
+    with pytest.raises(ValueError, match='below the BTCUSDT minimum of 0.001'):
+        exchange_info.prepare_order('BTCUSDT', 'BUY', 'LIMIT', 0.0009, price=100)
+    with pytest.raises(ValueError, match='above the BTCUSDT maximum of 120'):
+        exchange_info.prepare_order('BTCUSDT', 'BUY', 'MARKET', 121)
+    with pytest.raises(ValueError, match='rounds to 0'):
+        exchange_info.prepare_order('BTCUSDT', 'BUY', 'LIMIT', 1, price=0.05)
+
+
+def test_min_notional_uses_the_rounded_order(exchange_info):
+    # 0.0509 rounds down to 0.050 and 99.99 to 99.9, which is just below the notional of 5
+    with pytest.raises(ValueError, match='notional 4.995 is below the BTCUSDT minimum of 5'):
+        exchange_info.prepare_order('BTCUSDT', 'BUY', 'LIMIT', 0.0509, price=99.99)
+    assert exchange_info.prepare_order('BTCUSDT', 'BUY', 'LIMIT', 0.05, price=100)['quantity'] == '0.05'
+
+    # Market orders are checked against the reference price when there is one
+    with pytest.raises(ValueError, match='notional'):
+        exchange_info.prepare_order('BTCUSDT', 'BUY', 'MARKET', 0.01, reference_price=100)
+    assert exchange_info.prepare_order('BTCUSDT', 'BUY', 'MARKET', 0.01)['quantity'] == '0.01'
+
+
+def test_missing_or_malformed_numbers_raise_value_error(exchange_info):
+    rules = exchange_info.get_rules('BTCUSDT')
+    for value in (None, 'abc', float('nan'), float('inf')):
+        with pytest.raises(ValueError, match='Price must be a number'):
+            rules.round_price(value, 'BUY')
+        with pytest.raises(ValueError, match='Quantity must be a number'):
+            exchange_info.prepare_order('BTCUSDT', 'BUY', 'LIMIT', value, price=100)
+
+
+def test_unknown_and_halted_symbols_are_rejected(client, tmp_path):
+    payload = _exchange_info()
+    payload['symbols'][0]['status'] = 'BREAK'
+    exchange_info = ExchangeInfoCache(client, cache_file=str(tmp_path / 'exchange_info.json'))
+    exchange_info._index(payload, 0)
+    with pytest.raises(ValueError, match='BTCUSDT is not trading'):
+        exchange_info.prepare_order('BTCUSDT', 'BUY', 'LIMIT', 1, price=100)
+    with pytest.raises(ValueError, match='Unknown symbol'):
+        exchange_info.prepare_order('FOOUSDT', 'BUY', 'LIMIT', 1, price=100)
+
+
+def test_batch_modifications_are_rounded_and_validated(client, exchange, exchange_info):
+    results = client.modify_batch_orders([
+        {'symbol': 'BTCUSDT', 'order_id': 1, 'side': 'BUY', 'quantity': 0.1239, 'price': 100.07},
+        {'symbol': 'BTCUSDT', 'order_id': 2, 'side': 'SELL', 'quantity': 0.01, 'price': 100},
+    ])
+    assert results[0]['origQty'] == '0.123'
+    assert results[0]['price'] == '100'
+    assert 'notional' in results[1]['error']
+    assert exchange.calls['PUT /fapi/v1/batchOrders'] == 1
@@ -0,0 +1,118 @@
+"""Execution quality metrics of hand-computed buy and sell jobs, and their aggregation"""
+import numpy as np
+import pytest
+
+from execution_analytics import ExecutionAnalyticsStore, compute_metrics
+from market_history import KLINE_DTYPE
+
+
+def _slice(executed_qty, fill_price, market_price, drift_secs):
+    return {'executed_qty': executed_qty, 'fill_price': fill_price, 'market_price': market_price,
+            'drift_secs': drift_secs}
+
+
+def _job(job_id, side, total_quantity, arrival_price, slices):
+    return {'job_id': job_id, 'algo': 'TWAP', 'symbol': 'BTCUSDT', 'side': side, 'status': 'COMPLETED',
+            'created_at': 1000.0, 'finished_at': 1060.0, 'total_quantity': total_quantity,
+            'arrival_price': arrival_price, 'slices': slices}
+
+
+def _klines(rows):
+    """(high, low, close, volume) rows as KLINE_DTYPE klines"""
+    klines = np.zeros(len(rows), dtype=KLINE_DTYPE)
+    for field, values in zip(('high', 'low', 'close', 'volume'), zip(*rows)):
+        klines[field] = values
+    return klines
+
+
+# A buy of 3 with arrival 100: two slices filled at 101 and 102, the last one did not fill
+PARTIAL_BUY = _job('buy', 'BUY', 3, 100.0, [
+    _slice(1, 101.0, 100.5, 0.5),
+    _slice(1, 102.0, 101.0, -1.5),
+    _slice(0, None, 104.0, 2.0),
+])
+
+# A sell of 2 with arrival 100, filled at 99 and 98.5
+SELL = _job('sell', 'SELL', 2, 100.0, [
+    _slice(1, 99.0, 99.5, 0.0),
+    _slice(1, 98.5, 99.0, 1.0),
+])
+
+
+def test_partial_buy_without_klines():
+    metrics = compute_metrics(PARTIAL_BUY)
+
+    assert metrics['filled_quantity'] == 2
+    assert metrics['fill_ratio'] == pytest.approx(2 / 3)
+    assert metrics['avg_fill_price'] == pytest.approx(101.5)
+    # Paid 3 over arrival on the fills, and the unfilled 1 is marked at the last seen 104
+    assert metrics['shortfall_bps'] == pytest.approx((3 + 4) / 300 * 10000)
+    # Paying above the reference price is a positive (worse) slippage
+    assert metrics['slice_slippage_bps'] == pytest.approx(((101 - 100.5) / 100.5 + (102 - 101) / 101) / 2 * 10000)
+    # Without klines TWAP is the mean reference price; there is no VWAP or market volume
+    twap = (100.5 + 101 + 104) / 3
+    assert metrics['twap_benchmark'] == pytest.approx(twap)
+    assert metrics['twap_slippage_bps'] == pytest.approx((101.5 - twap) / twap * 10000)
+    assert metrics['twap_slippage_bps'] < 0
+    assert metrics['vwap_benchmark'] is None
+    assert metrics['participation_rate'] is None
+    assert metrics['mean_drift_secs'] == pytest.approx((0.5 + 1.5 + 2) / 3)
+    assert metrics['max_drift_secs'] == 2
+
+
+def test_sell_with_klines():
+    # Typical prices 99 and 98 traded 10 and 30: VWAP 98.25, TWAP of the closes 98.5
+    klines = _klines([(100, 98, 99, 10), (99, 97, 98, 30)])
+    metrics = compute_metrics(SELL, klines)
+
+    assert metrics['avg_fill_price'] == pytest.approx(98.75)
+    # Receiving less than arrival on a sell is a positive (worse) shortfall
+    assert metrics['shortfall_bps'] == pytest.approx(2.5 / 200 * 10000)
+    assert metrics['slice_slippage_bps'] == pytest.approx(((99.5 - 99) / 99.5 + (99 - 98.5) / 99) / 2 * 10000)
+    assert metrics['vwap_benchmark'] == pytest.approx(98.25)
+    assert metrics['twap_benchmark'] == pytest.approx(98.5)
+    # Selling above the market averages is a negative (better) slippage
+    assert metrics['vwap_slippage_bps'] == pytest.approx(-(98.75 - 98.25) / 98.25 * 10000)
+    assert metrics['twap_slippage_bps'] == pytest.approx(-(98.75 - 98.5) / 98.5 * 10000)
+    assert metrics['participation_rate'] == pytest.approx(2 / 40)
+    assert metrics['fill_ratio'] == 1
+    assert metrics['max_drift_secs'] == 1
+
+
+def test_nothing_filled_and_no_prices():
+    job = _job('idle', 'BUY', 1, None, [_slice(0, None, None, None)])
+    metrics = compute_metrics(job, _klines([(100, 100, 100, 0)]))
+    assert metrics['filled_quantity'] == 0
+    assert metrics['fill_ratio'] == 0
+    for name in ('avg_fill_price', 'shortfall_bps', 'slice_slippage_bps', 'twap_slippage_bps',
+                 'vwap_benchmark', 'participation_rate', 'mean_drift_secs'):
+        assert metrics[name] is None, name
+
+
+def test_aggregate_skips_missing_metrics(tmp_path):
+    store = ExecutionAnalyticsStore(path=str(tmp_path / 'analytics.db'))
+    buy = store.record(PARTIAL_BUY)
+    no_arrival = store.record(dict(SELL, job_id='no-arrival', arrival_price=None, slices=SELL['slices'][:1]))
+    store.record(_job('idle', 'BUY', 1, None, [_slice(0, None, None, None)]))
+
+    summary = store.aggregate()
+    assert summary['runs'] == 3
+    metrics = summary['metrics']
+    # Only the buy has an arrival price
+    assert metrics['shortfall_bps']['count'] == 1
+    assert metrics['shortfall_bps']['mean'] == pytest.approx(buy['shortfall_bps'])
+    # Weighted by filled quantity (2 and 1); the idle run has no slippage
+    buy_slippage, sell_slippage = buy['slice_slippage_bps'], no_arrival['slice_slippage_bps']
+    assert sell_slippage == pytest.approx((99.5 - 99) / 99.5 * 10000)
+    assert metrics['slice_slippage_bps']['count'] == 2
+    assert metrics['slice_slippage_bps']['mean'] == pytest.approx((buy_slippage + sell_slippage) / 2)
+    assert metrics['slice_slippage_bps']['weighted_mean'] == pytest.approx((2 * buy_slippage + sell_slippage) / 3)
+    # fill_ratio of the idle run is 0 but present; with no fill it has no weight
+    assert metrics['fill_ratio']['count'] == 3
+    assert metrics['fill_ratio']['mean'] == pytest.approx((2 / 3 + 1 / 2 + 0) / 3)
+    assert metrics['fill_ratio']['weighted_mean'] == pytest.approx((2 * 2 / 3 + 1 / 2) / 3)
+    # No run had klines
+    assert 'vwap_slippage_bps' not in metrics
+    assert 'participation_rate' not in metrics
+
+    assert store.aggregate(symbol='ETHUSDT') == {'runs': 0, 'metrics': {}}
@@ -0,0 +1,190 @@
+"""ExecutionEngine scheduling, slice carry, pause/resume and cancel on a simulated clock"""
+import math
+import threading
+
+import pytest
+
+from execution_engine import CANCELLED, COMPLETED, PAUSED, RUNNING, ExecutionEngine
+from tests.fake_websocket import wait_until
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    """Fills market orders at 100 after rounding the quantity down to a 0.001 step"""
+
+    def __init__(self):
+        self.orders = []
+        self.on_order = None
+
+    def _get_local_book(self, symbol):
+        return None
+
+    def get_market_price(self, symbol):
+        return {'symbol': symbol, 'price': '100.0'}
+
+    def get_fillable_quantity(self, symbol, side):
+        return None
+
+    def place_order(self, symbol, side, order_type, quantity):
+        quantity = math.floor(quantity * 1000 + 1e-6) / 1000
+        self.orders.append((symbol, quantity))
+        if self.on_order:
+            self.on_order()
+        return {'orderId': len(self.orders), 'status': 'FILLED', 'origQty': str(quantity),
+                'executedQty': str(quantity), 'avgPrice': '100.0'}
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def engine(client, clock):
+    engine = ExecutionEngine(client, clock=clock, max_workers=1)
+    yield engine
+    engine.stop()
+
+
+def test_slices_of_concurrent_jobs_run_in_due_order(engine, client, clock):
+    engine.submit_twap('BTCUSDT', 'BUY', 4, num_orders=4, duration_mins=4)  # every 60s
+    engine.submit_twap('ETHUSDT', 'BUY', 2, num_orders=2, duration_mins=1)  # every 30s
+
+    assert engine.run_pending() == 2
+    clock.now = 30
+    assert engine.run_pending() == 1
+    assert client.orders[-1] == ('ETHUSDT', 1.0)
+    clock.now = 59
+    assert engine.run_pending() == 0
+
+    # A late run sends every overdue slice, each keeping its own due time
+    clock.now = 185
+    assert engine.run_pending() == 3
+    assert [symbol for symbol, _ in client.orders] == ['BTCUSDT', 'ETHUSDT', 'ETHUSDT', 'BTCUSDT', 'BTCUSDT', 'BTCUSDT']
+    btc = next(job for job in engine.list_jobs() if job['symbol'] == 'BTCUSDT')
+    assert btc['status'] == COMPLETED
+    assert [s['drift_secs'] for s in btc['slices']] == [0, 125, 65, 5]
+
+
+def test_carry_follows_the_rounded_quantity_sent(engine, client, clock):
+    job = engine.submit_twap('BTCUSDT', 'BUY', 1, num_orders=3, duration_mins=3)
+    for clock.now in (0, 60, 120):
+        engine.run_pending()
+
+    job = engine.get_job(job['job_id'])
+    assert [s['quantity'] for s in job['slices']] == [0.333, 0.333, 0.334]
+    assert job['sent_quantity'] == pytest.approx(1.0)
+    assert job['filled_quantity'] == pytest.approx(1.0)
+
+
+def test_pause_and_resume_shift_the_remaining_slices(engine, client, clock):
+    job_id = engine.submit_twap('BTCUSDT', 'BUY', 3, num_orders=3, duration_mins=3)['job_id']
+    engine.run_pending()
+    clock.now = 30
+    assert engine.pause_job(job_id)['status'] == PAUSED
+
+    clock.now = 300
+    assert engine.run_pending() == 0
+    assert engine.resume_job(job_id)['status'] == RUNNING
+    # 270s paused: slice 2 moves from 60s to 330s
+    assert engine.run_pending() == 0
+    clock.now = 330
+    assert engine.run_pending() == 1
+    assert len(client.orders) == 2
+
+
+def test_cancel_between_slices_finishes_the_job(engine, client, clock):
+    finished = []
+    engine.listeners.append(finished.append)
+    job_id = engine.submit_twap('BTCUSDT', 'BUY', 3, num_orders=3, duration_mins=3)['job_id']
+    engine.run_pending()
+
+    assert engine.cancel_job(job_id)['status'] == CANCELLED
+    clock.now = 600
+    assert engine.run_pending() == 0
+    assert [job.id for job in finished] == [job_id]
+    with pytest.raises(ValueError):
+        engine.cancel_job(job_id)
+
+
+def test_cancel_during_an_in_flight_slice_waits_for_its_fill(engine, client, clock):
+    finished = []
+
+    def listener(job):
+        # Listeners run after the engine lock is released
+        reader = threading.Thread(target=engine.list_jobs)
+        reader.start()
+        reader.join(timeout=1)
+        finished.append((job.to_dict(), reader.is_alive()))
+
+    engine.listeners.append(listener)
+    job_id = engine.submit_twap('BTCUSDT', 'BUY', 3, num_orders=3, duration_mins=3)['job_id']
+    client.on_order = lambda: engine.cancel_job(job_id)
+    engine.run_pending()
+
+    assert len(finished) == 1
+    job, blocked = finished[0]
+    assert not blocked
+    assert job['status'] == CANCELLED
+    assert job['finished_at'] is not None
+    assert job['filled_quantity'] == 1.0
+
+
+def test_slices_overdue_when_paused_are_not_sent_in_a_burst_on_resume(engine, client, clock):
+    job_id = engine.submit_twap('BTCUSDT', 'BUY', 4, num_orders=4, duration_mins=4)['job_id']
+    engine.run_pending()
+    # The scheduler fell behind: slices 2 and 3 were due at 60s and 120s
+    clock.now = 130
+    engine.pause_job(job_id)
+
+    clock.now = 200
+    engine.resume_job(job_id)
+    assert engine.run_pending() == 1
+    clock.now = 259
+    assert engine.run_pending() == 0
+    clock.now = 260
+    assert engine.run_pending() == 1
+    assert [s['scheduled_at'] for s in engine.get_job(job_id)['slices']] == [0, 200, 260]
+
+
+def test_stop_while_a_slice_is_being_dispatched(client):
+    engine = ExecutionEngine(client, max_workers=1)
+    errors = []
+    previous_hook = threading.excepthook
+    threading.excepthook = errors.append
+    stopper = threading.Thread(target=engine.stop)
+    submit = engine._executor.submit
+
+    def stop_then_submit(*args):
+        # stop() from another thread right as the slice is handed to the pool
+        if stopper.ident is None:
+            stopper.start()
+            stopper.join(0.2)
+        return submit(*args)
+
+    engine._executor.submit = stop_then_submit
+    try:
+        engine.start()
+        scheduler = engine._thread
+        engine._thread = None  # stop() shuts the pool down without joining, as after a join timeout
+        engine.submit_twap('BTCUSDT', 'BUY', 2, num_orders=2, duration_mins=0.01)
+        assert wait_until(lambda: stopper.ident is not None, timeout=5)
+        stopper.join(5)
+        scheduler.join(5)
+    finally:
+        threading.excepthook = previous_hook
+    assert not scheduler.is_alive()
+    assert errors == []
+    assert wait_until(lambda: len(client.orders) == 1, timeout=5)
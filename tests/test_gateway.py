@@ -0,0 +1,95 @@
+"""Gateway call whitelist and the workers' lazy connect"""
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+
+from gateway import GatewayClient, GatewayError, GatewayServer
+from risk_engine import RiskRejected
+
+
+class Service:
+    def __init__(self):
+        self.store = self
+
+    def get_stats(self):
+        return {'ok': True}
+
+    def reset(self):
+        raise AssertionError('must not be reachable')
+
+    def place_order(self):
+        raise RiskRejected('Too many orders', 'order_rate')
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / 'gateway.sock')
+
+
+@pytest.fixture
+def server(socket_path):
+    server = GatewayServer({'service': Service()}, socket_path, calls={'service.get_stats'})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_only_whitelisted_calls_are_dispatched(server, socket_path):
+    services = GatewayClient(socket_path).connect()
+    assert services['service'].get_stats() == {'ok': True}
+    for path in ('service.reset', 'service.store.reset', 'service.__init__', 'service'):
+        with pytest.raises(GatewayError):
+            GatewayClient(socket_path).call(path)
+
+
+def test_worker_is_not_ready_until_the_gateway_answers(socket_path, tmp_path):
+    # A fresh interpreter, so app.py is imported in gateway mode without touching this process
+    script = textwrap.dedent(f"""
+        import threading
+        from config import Config
+        Config.GATEWAY_ENABLED = True
+        Config.GATEWAY_SOCKET = {socket_path!r}
+        Config.WARMUP_RETRY_INTERVAL = 0.1
+        Config.STREAM_ENABLED = False
+        Config.LOG_CONSOLE = False
+        Config.LOG_FILE = {str(tmp_path / 'worker.log')!r}
+        import app
+        from gateway import GatewayServer
+
+        client = app.app.test_client()
+        assert client.get('/readyz').status_code == 503
+        assert app.binance_client is None
+
+        class Warmup:
+            def get_status(self):
+                return {{'ready': True, 'steps': {{}}}}
+
+        server = GatewayServer({{'warmup': Warmup(), 'load_account': lambda: {{'remote': True}}}}, Config.GATEWAY_SOCKET)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        assert app.gateway_warmup.wait(5)
+        assert client.get('/readyz').status_code == 200
+        assert app.load_account() == {{'remote': True}}
+        print('ok')
+    """)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith('ok')
+
+
+def test_risk_rejections_keep_their_check(socket_path):
+    server = GatewayServer({'binance_client': Service()}, socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with pytest.raises(RiskRejected) as error:
+            GatewayClient(socket_path).call('binance_client.place_order')
+        assert str(error.value) == 'Too many orders'
+        assert error.value.check == 'order_rate'
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,102 @@
+"""OrderHistoryStore incremental sync against an in-memory order book of the exchange"""
+import pytest
+
+from history_store import OrderHistoryStore
+
+
+class FakeClient:
+    def __init__(self):
+        self.orders = {}  # (symbol, orderId) -> order
+        self.history_requests = []
+        self.order_requests = []
+        self.failing = False
+
+    def add(self, order_id, status, symbol='BTCUSDT'):
+        self.orders[symbol, order_id] = {'orderId': order_id, 'symbol': symbol, 'status': status, 'side': 'BUY',
+                                 'type': 'LIMIT', 'time': order_id, 'updateTime': order_id}
+
+    def update(self, order_id, status, symbol='BTCUSDT'):
+        order = self.orders[symbol, order_id]
+        self.orders[symbol, order_id] = dict(order, status=status, updateTime=order['updateTime'] + 100)
+
+    def get_order_history(self, symbol, limit, order_id):
+        if self.failing:
+            raise ConnectionError('exchange unreachable')
+        self.history_requests.append(order_id)
+        return [self.orders[key] for key in sorted(self.orders) if key[0] == symbol and key[1] >= order_id][:limit]
+
+    def get_open_orders(self, symbol):
+        return [order for order in self.orders.values() if order['symbol'] == symbol and order['status'] == 'NEW']
+
+    def get_order(self, symbol, order_id):
+        self.order_requests.append(order_id)
+        return self.orders[symbol, order_id]
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def store(client, tmp_path):
+    return OrderHistoryStore(client, path=str(tmp_path / 'history.db'), symbols=['BTCUSDT'], page_size=2)
+
+
+def _statuses(store):
+    return {order['orderId']: order['status'] for order in store.query_orders()}
+
+
+def test_backfill_pages_through_the_full_history(store, client):
+    for order_id in range(1, 6):
+        client.add(order_id, 'FILLED')
+    assert store.sync() == 5
+    assert client.history_requests == [1, 3, 5]
+    assert store.get_stats()['symbols']['BTCUSDT']['cursor'] == 6
+
+
+def test_a_long_lived_open_order_does_not_pin_the_cursor(store, client):
+    client.add(1, 'NEW')
+    for order_id in range(2, 5):
+        client.add(order_id, 'FILLED')
+    store.sync()
+    client.history_requests.clear()
+
+    client.add(5, 'FILLED')
+    store.sync()
+    assert client.history_requests == [5]
+    assert client.order_requests == []
+
+    # Once it is no longer open its final state is fetched on its own
+    client.update(1, 'CANCELED')
+    client.history_requests.clear()
+    store.sync()
+    assert client.history_requests == [6]
+    assert client.order_requests == [1]
+    assert _statuses(store) == {1: 'CANCELED', 2: 'FILLED', 3: 'FILLED', 4: 'FILLED', 5: 'FILLED'}
+
+
+def test_not_ready_until_a_symbol_synced(store, client):
+    client.failing = True
+    store.sync()
+    assert not store.is_ready()
+
+    client.failing = False
+    store.sync()
+    assert store.is_ready()
+
+
+def test_order_ids_are_only_unique_per_symbol(client, tmp_path):
+    store = OrderHistoryStore(client, path=str(tmp_path / 'history.db'), symbols=['BTCUSDT', 'ETHUSDT'])
+    client.add(7, 'FILLED')
+    client.add(7, 'NEW', symbol='ETHUSDT')
+    store.sync()
+
+    assert [order['symbol'] for order in store.query_orders(symbol='BTCUSDT')] == ['BTCUSDT']
+    assert [order['status'] for order in store.query_orders(symbol='ETHUSDT')] == ['NEW']
+    assert store.get_stats()['orders'] == 2
+
+    client.update(7, 'CANCELED', symbol='ETHUSDT')
+    store.sync()
+    assert [order['status'] for order in store.query_orders(symbol='BTCUSDT')] == ['FILLED']
+    assert [order['status'] for order in store.query_orders(symbol='ETHUSDT')] == ['CANCELED']
@@ -0,0 +1,25 @@
+"""Background log writer across fork()"""
+import os
+
+from tests.fake_websocket import wait_until
+from utils.logger import setup_logger
+
+
+def test_forked_child_gets_its_own_writer_thread(tmp_path):
+    log_file = tmp_path / 'fork.log'
+    log = setup_logger('fork-test', log_file=str(log_file), console=False)
+    log.info('from parent')
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            log.info('from child')
+            log.handlers[0].listener.stop()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert wait_until(lambda: 'from parent' in log_file.read_text())
+    lines = log_file.read_text().splitlines()
+    assert sum('from parent' in line for line in lines) == 1
+    assert any('from child' in line for line in lines)
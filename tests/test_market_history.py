@@ -0,0 +1,105 @@
+"""MarketHistory day partitioning and paging against a fake exchange, and the rolling statistics"""
+import threading
+
+import numpy as np
+import pytest
+
+from config import Config
+from market_history import DAY_MS, KLINE_DTYPE, MarketHistory, rolling_volatility, rolling_vwap
+
+DAY = 19723 * DAY_MS  # 2024-01-01, a completed day
+HOUR_MS = 3600000
+TRADE_EVERY_MS = 600000
+
+
+class FakeClient:
+    """Hourly klines and one aggregate trade every ten minutes, served the way the exchange pages them"""
+
+    def __init__(self):
+        self.kline_requests = []
+        self.agg_trade_requests = []
+        self._lock = threading.Lock()
+
+    def get_klines(self, symbol, interval, start_time=None, end_time=None, limit=500):
+        with self._lock:
+            self.kline_requests.append((start_time, end_time))
+        first = -(-start_time // HOUR_MS) * HOUR_MS
+        open_times = range(first, end_time + 1, HOUR_MS)[:limit]
+        return [[t, '1', '1', '1', str(t // HOUR_MS), '1', t + HOUR_MS - 1, '1', 1, '1', '1'] for t in open_times]
+
+    def _trade(self, trade_id):
+        return {'a': trade_id, 'p': '100', 'q': '1', 'f': trade_id, 'l': trade_id,
+                'T': trade_id * TRADE_EVERY_MS, 'm': False}
+
+    def get_agg_trades(self, symbol, start_time=None, end_time=None, from_id=None, limit=500):
+        with self._lock:
+            self.agg_trade_requests.append('from_id' if from_id is not None else 'time')
+        if from_id is None:
+            from_id = -(-start_time // TRADE_EVERY_MS)
+            last_id = end_time // TRADE_EVERY_MS
+        else:
+            last_id = from_id + limit
+        return [self._trade(i) for i in range(from_id, last_id + 1)][:limit]
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def history(client, tmp_path):
+    return MarketHistory(client, data_dir=str(tmp_path))
+
+
+def test_a_range_across_midnight_is_sliced_from_both_days(history, client, monkeypatch):
+    monkeypatch.setattr(Config, 'MARKET_HISTORY_KLINE_LIMIT', 10)
+    start, end = DAY + 22 * HOUR_MS, DAY + DAY_MS + 2 * HOUR_MS
+
+    klines = history.get_klines('BTCUSDT', '1h', start, end)
+    assert klines.dtype == KLINE_DTYPE
+    assert list((klines['open_time'] - DAY) // HOUR_MS) == [22, 23, 24, 25]
+    # Each day of 24 klines took three pages of 10
+    assert len(client.kline_requests) == 6
+
+    # Both days are cached now; a range inside one day is a view of its memory map
+    client.kline_requests.clear()
+    inside = history.get_klines('BTCUSDT', '1h', DAY + HOUR_MS, DAY + 3 * HOUR_MS)
+    assert list((inside['open_time'] - DAY) // HOUR_MS) == [1, 2]
+    assert isinstance(inside, np.memmap)
+    assert client.kline_requests == []
+
+
+def test_full_agg_trade_pages_continue_by_trade_id(history, client, monkeypatch):
+    # Six trades an hour: every hour's first page of four is full and continues by id
+    monkeypatch.setattr(Config, 'MARKET_HISTORY_AGG_TRADE_LIMIT', 4)
+    start, end = DAY + 23 * HOUR_MS, DAY + DAY_MS + HOUR_MS
+
+    trades = history.get_agg_trades('BTCUSDT', start, end)
+    expected = np.arange(start // TRADE_EVERY_MS, end // TRADE_EVERY_MS)
+    assert list(trades['agg_id']) == list(expected)
+    assert (np.diff(trades['time']) > 0).all()
+    # Two days of 24 one-hour windows, each paged once by time and once by id
+    assert client.agg_trade_requests.count('time') == 48
+    assert client.agg_trade_requests.count('from_id') == 48
+
+
+def test_rolling_vwap():
+    klines = np.zeros(4, dtype=KLINE_DTYPE)
+    klines['high'] = klines['low'] = klines['close'] = [1, 2, 3, 4]
+    klines['volume'] = [1, 1, 2, 0]
+    assert rolling_vwap(klines) == pytest.approx([1, 1.5, 9 / 4, 9 / 4])
+    assert rolling_vwap(klines, window=2) == pytest.approx([1, 1.5, 8 / 3, 3])
+
+    klines['volume'] = 0
+    assert np.isnan(rolling_vwap(klines)).all()
+
+
+def test_rolling_volatility():
+    log_returns = np.array([0.1, 0.2, 0.0, -0.1])
+    close = 100 * np.exp(np.concatenate(([0.0], np.cumsum(log_returns))))
+    expected = [np.std(log_returns[i:i + 2], ddof=1) for i in range(3)]
+    assert rolling_volatility(close, 2) == pytest.approx(expected)
+    assert rolling_volatility(close, 2, periods_per_year=365) == pytest.approx(np.array(expected) * np.sqrt(365))
+    assert rolling_volatility(close, 4) == pytest.approx([np.std(log_returns, ddof=1)])
+    assert len(rolling_volatility(close, 5)) == 0
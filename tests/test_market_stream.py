@@ -0,0 +1,82 @@
+"""MarketStream subscription, event handling, reconnect and resubscribe against a fake WebSocket server"""
+import pytest
+
+from config import Config
+from market_stream import MarketStream, TickerStore
+from tests.fake_websocket import FakeWebSocketServer, wait_until
+
+
+def _ticker_event(symbol, price):
+    return {
+        'stream': f"{symbol.lower()}@ticker",
+        'data': {
+            'e': '24hrTicker', 'E': 1, 's': symbol, 'c': price, 'p': '1.0', 'P': '1.0',
+            'o': '99.0', 'h': '101.0', 'l': '98.0', 'v': '1000', 'q': '100000',
+        },
+    }
+
+
+@pytest.fixture
+def server():
+    with FakeWebSocketServer() as server:
+        yield server
+
+
+@pytest.fixture
+def stream(server, monkeypatch):
+    # The socket read loop only notices a close from another thread when its
+    # select() times out, which is the ping timeout
+    monkeypatch.setattr(Config, 'STREAM_PING_TIMEOUT', 0.5)
+    stream = MarketStream(['BTCUSDT', 'ETHUSDT'], url=server.url)
+    stream.start()
+    yield stream
+    stream.stop()
+
+
+def test_subscribes_to_every_symbol_on_connect(server, stream):
+    assert stream.wait_until_connected(5)
+    assert wait_until(server.subscriptions)
+    assert server.subscriptions() == [[
+        'btcusdt@ticker', 'btcusdt@markPrice@1s', 'ethusdt@ticker', 'ethusdt@markPrice@1s',
+    ]]
+
+
+def test_events_update_the_ticker_store(server, stream):
+    assert wait_until(server.subscriptions)
+    server.send(_ticker_event('BTCUSDT', '101.5'))
+    server.send({'stream': 'btcusdt@markPrice@1s',
+                 'data': {'e': 'markPriceUpdate', 'E': 2, 's': 'BTCUSDT', 'p': '101.4', 'r': '0.0001'}})
+    assert wait_until(lambda: (stream.store.get('BTCUSDT') or {}).get('markPrice') == '101.4')
+    ticker = stream.store.get('BTCUSDT')
+    assert ticker['lastPrice'] == '101.5'
+    assert ticker['closeTime'] == 2
+    assert stream.store.get('ETHUSDT') is None
+
+
+def test_reconnects_and_resubscribes_after_a_dropped_connection(server, stream):
+    assert wait_until(server.subscriptions)
+    stream.add_symbols(['BNBUSDT'])
+    assert wait_until(lambda: len(server.subscriptions()) == 2)
+    assert server.subscriptions()[1] == ['bnbusdt@ticker', 'bnbusdt@markPrice@1s']
+
+    server.drop_connections()
+    assert wait_until(lambda: not stream.is_connected())
+    # The first reconnect waits one second
+    assert wait_until(lambda: len(server.subscriptions()) == 3, timeout=5)
+    assert stream.reconnects == 1
+    assert server.connections_opened == 2
+    assert server.subscriptions()[2] == [
+        'bnbusdt@ticker', 'bnbusdt@markPrice@1s', 'btcusdt@ticker', 'btcusdt@markPrice@1s',
+        'ethusdt@ticker', 'ethusdt@markPrice@1s',
+    ]
+
+    server.send(_ticker_event('BNBUSDT', '300.0'))
+    assert wait_until(lambda: stream.store.get_price('BNBUSDT') == '300.0')
+
+
+def test_stale_tickers_are_not_served():
+    store = TickerStore()
+    store.update_ticker(_ticker_event('BTCUSDT', '100.0')['data'])
+    assert store.get_price('BTCUSDT', max_age=10) == '100.0'
+    assert store.get_many(['BTCUSDT', 'ETHUSDT']) is None
+    assert store.get_price('BTCUSDT', max_age=-1) is None
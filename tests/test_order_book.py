@@ -0,0 +1,48 @@
+"""OrderBook snapshot and diff synchronization"""
+import pytest
+
+from order_book import OrderBook, OrderBookGapError, PriceLevels
+
+SNAPSHOT = {'lastUpdateId': 100, 'bids': [['99.0', '1.0'], ['98.0', '2.0']], 'asks': [['101.0', '1.5']]}
+
+
+def _diff(first, last, previous, bids=(), asks=()):
+    return {'e': 'depthUpdate', 's': 'BTCUSDT', 'U': first, 'u': last, 'pu': previous,
+            'b': list(bids), 'a': list(asks)}
+
+
+def test_price_levels_walk_from_the_best_level():
+    bids = PriceLevels(descending=True)
+    for price in (98.0, 100.0, 99.0):
+        bids.update(price, 1.0)
+    bids.update(100.0, 0)
+    assert list(bids.levels()) == [(99.0, 1.0), (98.0, 1.0)]
+    assert bids.best() == (99.0, 1.0)
+
+
+def test_snapshot_replays_buffered_diffs_before_it_is_synced():
+    book = OrderBook('BTCUSDT')
+    book.apply_snapshot(SNAPSHOT, [
+        _diff(90, 95, 89, bids=[['97.0', '1.0']]),  # older than the snapshot
+        _diff(99, 102, 98, bids=[['99.0', '0']]),
+        _diff(103, 104, 102, asks=[['100.5', '3.0']]),
+    ])
+    assert book.synced
+    assert book.last_update_id == 104
+    assert book.best_bid_ask() == {'bid': (98.0, 2.0), 'ask': (100.5, 3.0)}
+
+
+def test_snapshot_stays_unsynced_when_buffered_diffs_have_a_gap():
+    book = OrderBook('BTCUSDT')
+    with pytest.raises(OrderBookGapError):
+        book.apply_snapshot(SNAPSHOT, [_diff(99, 102, 98), _diff(105, 106, 104)])
+    assert not book.synced
+
+
+def test_live_diff_gap_unsyncs_the_book():
+    book = OrderBook('BTCUSDT')
+    book.apply_snapshot(SNAPSHOT)
+    book.apply_diff(_diff(100, 101, 99))
+    with pytest.raises(OrderBookGapError):
+        book.apply_diff(_diff(103, 104, 102))
+    assert not book.synced
@@ -0,0 +1,103 @@
+"""Request cost per call, and the RateLimiter governing BinanceClient against the stub exchange"""
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from benchmarks.stub_exchange import StubExchange
+from binance_client import BinanceClient
+from tests.conftest import API_SECRET
+from utils.rate_limit import HIGH, LOW, RateLimiter, RateLimitExceeded, request_cost
+
+
+def test_batch_orders_count_every_order_in_the_batch():
+    batch = {'batchOrders': json.dumps([{'symbol': 'BTCUSDT'}] * 3)}
+    assert request_cost('POST', '/fapi/v1/batchOrders', batch) == (5, 3)
+    assert request_cost('PUT', '/fapi/v1/batchOrders', batch) == (5, 3)
+    assert request_cost('DELETE', '/fapi/v1/batchOrders', {'orderIdList': '[1,2]'}) == (1, 0)
+
+
+def test_single_orders_and_reads():
+    assert request_cost('POST', '/fapi/v1/order', {'symbol': 'BTCUSDT'}) == (0, 1)
+    assert request_cost('GET', '/fapi/v1/openOrders') == (40, 0)
+    assert request_cost('GET', '/fapi/v1/openOrders', {'symbol': 'BTCUSDT'}) == (1, 0)
+    assert request_cost('GET', '/fapi/v1/depth', {'limit': 1000}) == (20, 0)
+
+
+@pytest.fixture
+def limiter(client):
+    client.rate_limiter = RateLimiter(weight_limits={'1m': (100, 60)}, order_limits={'10s': (20, 10)},
+                                      low_priority_reserve=0.2, max_wait={HIGH: 5, LOW: 0.1})
+    return client.rate_limiter
+
+
+def test_buckets_follow_the_usage_headers(exchange, client, limiter):
+    # Another process on the same IP and account already used most of the budget
+    exchange.charge(80, 5)
+    client.ping()
+    client.place_order('BTCUSDT', 'BUY', 'LIMIT', 0.01, 100)
+
+    stats = limiter.get_stats()
+    assert stats['weight']['1m']['available'] == pytest.approx(100 - 81, abs=0.1)
+    assert stats['orders']['10s']['available'] == pytest.approx(20 - 6, abs=0.1)
+
+
+def test_reads_are_shed_before_they_eat_into_the_order_reserve(exchange, client, limiter):
+    exchange.charge(85, 0)
+    client.ping()  # calibrates to 14 left, below the reserve of 20
+    with pytest.raises(RateLimitExceeded):
+        client.ping()
+    assert exchange.calls['GET /fapi/v1/ping'] == 1
+
+    client.place_order('BTCUSDT', 'BUY', 'LIMIT', 0.01, 100)
+    stats = limiter.get_stats()['priorities']
+    assert stats[LOW]['shed'] == 1
+    assert stats[HIGH]['sent'] == 1
+
+
+def test_queued_orders_go_ahead_of_queued_reads(exchange, client):
+    # Two weight per second and nothing left: each request waits for the refill
+    limiter = client.rate_limiter = RateLimiter(weight_limits={'1s': (2, 1)}, low_priority_reserve=0,
+                                                max_wait={HIGH: 5, LOW: 5})
+    limiter.weight_buckets['1s'].consume(2, time.monotonic())
+    sent = []
+
+    def send(name, call):
+        call()
+        sent.append(name)
+
+    read = threading.Thread(target=send, args=('read', client.ping))
+    order = threading.Thread(target=send, args=('order', lambda: client.cancel_order('BTCUSDT', 1)))
+    read.start()
+    time.sleep(0.1)
+    order.start()
+    read.join(5)
+    order.join(5)
+    assert sent == ['order', 'read']
+    assert limiter.get_stats()['priorities'][LOW]['queued'] == 1
+
+
+def test_a_429_pauses_traffic_until_retry_after():
+    with StubExchange(api_secret=API_SECRET, weight_limit=1, weight_window=1) as exchange:
+        client = BinanceClient(api_key='test-key', api_secret=API_SECRET)
+        client.base_url = exchange.url
+        client.rate_limiter = RateLimiter(max_wait={HIGH: 5, LOW: 0.1})
+        try:
+            client.ping()
+            with pytest.raises(requests.HTTPError) as error:
+                client.ping()
+            assert error.value.response.status_code == 429
+            assert client.get_rate_limit_stats()['blocked_for_secs'] > 0.5
+
+            # Reads give up rather than wait out the ban; orders wait for it
+            with pytest.raises(RateLimitExceeded):
+                client.ping()
+            start = time.monotonic()
+            client.cancel_order('BTCUSDT', 1)
+            assert time.monotonic() - start >= 0.8
+            assert exchange.rejected == 1
+            assert exchange.calls['GET /fapi/v1/ping'] == 2
+        finally:
+            client.transport.close()
@@ -0,0 +1,129 @@
+"""RiskEngine order rate, sync and cancel accounting through BinanceClient and the stub exchange"""
+import asyncio
+
+import pytest
+
+from async_binance_client import AsyncBinanceClient
+from config import Config
+from risk_engine import RiskEngine, RiskRejected
+from tests.conftest import API_SECRET
+
+
+def _ladder(count, symbol='BTCUSDT'):
+    return [{'symbol': symbol, 'side': 'BUY', 'order_type': 'LIMIT', 'quantity': 0.01, 'price': 100 - i * 0.1}
+            for i in range(count)]
+
+
+@pytest.fixture
+def risk_engine(client):
+    risk_engine = RiskEngine(client)
+    client.risk_engine = risk_engine
+    risk_engine.sync()
+    return risk_engine
+
+
+def test_a_batch_takes_one_order_rate_token_per_symbol(client, risk_engine):
+    limit = risk_engine.limits['default']['max_orders'][0]
+    results = client.place_batch_orders(_ladder(10 * limit) + _ladder(2, symbol='ETHUSDT'))
+    assert all('orderId' in result for result in results)
+
+    # The batch used one token of each symbol; single orders use one each
+    for order in _ladder(limit - 1):
+        client.place_order(order['symbol'], order['side'], order['order_type'], order['quantity'], order['price'])
+    with pytest.raises(RiskRejected) as error:
+        client.place_order('BTCUSDT', 'BUY', 'LIMIT', 0.01, 99)
+    assert error.value.check == 'order_rate'
+    assert risk_engine.rejected == {'order_rate': 1}
+
+
+def test_cancel_all_releases_open_order_exposure(client, risk_engine):
+    results = client.place_batch_orders(_ladder(3))
+    assert risk_engine.get_exposure('BTCUSDT')['BTCUSDT']['open_buy'] == pytest.approx(0.03)
+
+    client.cancel_all_orders('BTCUSDT')
+    exposure = risk_engine.get_exposure('BTCUSDT')['BTCUSDT']
+    assert exposure['open_buy'] == 0
+    assert exposure['open_notional'] == 0
+
+    # A late stream update for a cancelled order counts only fills it had not seen
+    risk_engine.on_order_update(dict(results[0], status='CANCELED', executedQty='0.004', avgPrice='100'))
+    exposure = risk_engine.get_exposure('BTCUSDT')['BTCUSDT']
+    assert exposure['position'] == pytest.approx(0.004)
+    assert exposure['open_buy'] == 0
+
+
+class SnapshotClient:
+    ticker_store = None
+    open_orders = []
+
+    def _get_local_book(self, symbol):
+        return None
+
+    def get_account_info(self):
+        return {
+            'totalMarginBalance': '1000',
+            'positions': [
+                {'symbol': 'BTCUSDT', 'positionAmt': '0', 'leverage': '20'},
+                {'symbol': 'ETHUSDT', 'positionAmt': '1', 'leverage': '5', 'markPrice': '100'},
+            ],
+        }
+
+    def get_open_orders(self):
+        return self.open_orders
+
+
+def test_sync_reads_the_leverage_of_flat_symbols():
+    risk_engine = RiskEngine(SnapshotClient())
+    risk_engine.sync()
+    exposure = risk_engine.get_exposure()
+    assert exposure['BTCUSDT']['leverage'] == 20
+    assert exposure['BTCUSDT']['position'] == 0
+    assert exposure['ETHUSDT']['leverage'] == 5
+    assert exposure['ETHUSDT']['margin'] == pytest.approx(20)
+
+
+def _open_order(symbol, order_id, quantity, price):
+    return {'symbol': symbol, 'orderId': order_id, 'side': 'BUY', 'status': 'NEW', 'origQty': str(quantity),
+            'executedQty': '0', 'price': str(price)}
+
+
+def test_orders_are_tracked_per_symbol_as_order_ids_overlap():
+    client = SnapshotClient()
+    client.open_orders = [_open_order('BTCUSDT', 7, 0.01, 100), _open_order('ETHUSDT', 7, 2, 100)]
+    limits = {'default': dict(Config.RISK_LIMITS['default'], price_band_bps=None), 'BTCUSDT': {'max_position': 0.02}}
+    risk_engine = RiskEngine(client, limits=limits)
+    risk_engine.sync()
+
+    # Replacing BTCUSDT #7 frees only its own 0.01
+    risk_engine.release(risk_engine.check_order('BTCUSDT', 'BUY', 0.02, 100, replaces=7))
+    with pytest.raises(RiskRejected) as error:
+        risk_engine.check_order('BTCUSDT', 'BUY', 0.03, 100, replaces=7)
+    assert error.value.check == 'position'
+
+    risk_engine.on_order_update(dict(client.open_orders[1], status='CANCELED'))
+    exposure = risk_engine.get_exposure()
+    assert exposure['BTCUSDT']['open_buy'] == pytest.approx(0.01)
+    assert exposure['ETHUSDT']['open_buy'] == 0
+
+    risk_engine.on_all_cancelled('BTCUSDT')
+    assert risk_engine.get_exposure('BTCUSDT')['BTCUSDT']['open_buy'] == 0
+    # A late update for BTCUSDT #7 is not mistaken for the finished ETHUSDT order
+    risk_engine.on_order_update(dict(client.open_orders[0], status='CANCELED', executedQty='0.004', avgPrice='100'))
+    assert risk_engine.get_exposure('BTCUSDT')['BTCUSDT']['position'] == pytest.approx(0.004)
+
+
+def test_async_orders_are_risk_checked(exchange, client, risk_engine):
+    async def place():
+        async with AsyncBinanceClient(api_key='test-key', api_secret=API_SECRET) as async_client:
+            async_client.base_url = exchange.url
+            async_client.risk_engine = risk_engine
+            order = await async_client.place_order('BTCUSDT', 'BUY', 'LIMIT', 0.01, 100)
+            with pytest.raises(RiskRejected) as error:
+                await async_client.place_order('BTCUSDT', 'BUY', 'LIMIT', 1000, 100)
+            return order, error.value.check
+
+    order, check = asyncio.run(place())
+    assert check == 'order_notional'
+    assert exchange.calls['POST /fapi/v1/order'] == 1
+    assert risk_engine.get_exposure('BTCUSDT')['BTCUSDT']['open_buy'] == pytest.approx(0.01)
+    assert order['orderId'] is not None
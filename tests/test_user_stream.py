@@ -0,0 +1,71 @@
+"""UserDataStream connect and REST reconciliation against the stub exchange and a fake WebSocket server"""
+import time
+
+import pytest
+import requests
+
+from config import Config
+from tests.fake_websocket import FakeWebSocketServer, wait_until
+from user_stream import UserDataStore, UserDataStream
+
+
+def _order_event(symbol, order_id, status='NEW'):
+    return {
+        'e': 'ORDER_TRADE_UPDATE', 'E': 1,
+        'o': {'s': symbol, 'i': order_id, 'c': 'x', 'S': 'BUY', 'o': 'LIMIT', 'q': '1', 'p': '10',
+              'X': status, 'x': 'NEW', 'T': 1},
+    }
+
+
+def test_order_history_needs_a_symbol(client):
+    with pytest.raises(requests.HTTPError) as error:
+        client.get_order_history()
+    assert error.value.response.json()['code'] == -1102
+
+
+def test_reconcile_fetches_history_of_every_tracked_symbol(exchange, client):
+    stream = UserDataStream(client)
+    stream.store.apply_order_update(_order_event('SOLUSDT', 7))
+
+    stream.reconcile()
+
+    assert exchange.calls['GET /fapi/v1/allOrders'] == len(Config.SUPPORTED_SYMBOLS) + 1
+    assert stream.reconciled_at is not None
+    assert [order['orderId'] for order in stream.store.get_orders('SOLUSDT')] == [7]
+
+
+def test_failed_listen_key_drops_the_connection_and_retries(exchange, client, monkeypatch):
+    monkeypatch.setattr(Config, 'STREAM_PING_TIMEOUT', 0.5)
+    exchange.failures = 1  # the first listen key request fails
+    with FakeWebSocketServer() as server:
+        stream = UserDataStream(client, url=server.url)
+        stream.start()
+        try:
+            assert wait_until(server.subscriptions, timeout=5)
+            assert server.subscriptions() == [['stub-listen-key']]
+            assert server.connections_opened == 2
+            assert stream.reconnects == 1
+            assert wait_until(stream.is_ready, timeout=5)
+        finally:
+            stream.stop()
+
+
+def test_snapshots_match_stream_updates_by_symbol_and_order_id():
+    store = UserDataStore()
+    since_ms = time.time() * 1000
+    store.apply_order_update(_order_event('BTCUSDT', 7, status='FILLED'))
+
+    # ETHUSDT #7 is not the order the stream just updated
+    eth_order = {'symbol': 'ETHUSDT', 'orderId': 7, 'status': 'NEW', 'side': 'BUY', 'type': 'LIMIT', 'updateTime': 1}
+    store.reconcile_orders([eth_order, dict(eth_order, symbol='BTCUSDT')], since_ms, open_only=True)
+    assert [order['orderId'] for order in store.get_open_orders('ETHUSDT')] == [7]
+    assert store.get_open_orders('BTCUSDT') == []
+
+
+def test_reconcile_forgets_stream_updates_it_covered(client):
+    stream = UserDataStream(client)
+    stream.store.apply_order_update(_order_event('SOLUSDT', 7))
+    stream.store.apply_account_update({'E': 1, 'a': {'B': [{'a': 'USDT', 'wb': '1'}], 'P': []}})
+
+    stream.reconcile()
+    assert stream.store._touched == {}
@@ -0,0 +1,368 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+from config import Config
+from market_stream import CombinedStream
+from utils.logger import logger
+
+OPEN_STATUSES = ('NEW', 'PARTIALLY_FILLED')
+
+
+def _order_from_event(o):
+    """Convert the 'o' object of an ORDER_TRADE_UPDATE event to the REST order shape"""
+    return {
+        'orderId': o['i'],
+        'symbol': o['s'],
+        'clientOrderId': o.get('c'),
+        'side': o['S'],
+        'type': o['o'],
+        'timeInForce': o.get('f'),
+        'origQty': o['q'],
+        'price': o['p'],
+        'avgPrice': o.get('ap', '0'),
+        'stopPrice': o.get('sp', '0'),
+        'executedQty': o.get('z', '0'),
+        'status': o['X'],
+        'reduceOnly': o.get('R', False),
+        'positionSide': o.get('ps'),
+        'updateTime': o['T'],
+    }
+
+
+def _fill_from_event(o):
+    """Convert a TRADE execution report to a fill record"""
+    return {
+        'id': o.get('t'),
+        'orderId': o['i'],
+        'symbol': o['s'],
+        'side': o['S'],
+        'price': o['L'],
+        'qty': o['l'],
+        'commission': o.get('n'),
+        'commissionAsset': o.get('N'),
+        'realizedPnl': o.get('rp'),
+        'maker': o.get('m'),
+        'time': o['T'],
+    }
+
+
+class UserDataStore:
+    """
+    Thread-safe in-memory account state: open and recent orders, fills,
+    balances and positions, indexed by symbol
+
+    Stream events are applied as they arrive. REST snapshots passed to the
+    reconcile_* methods only overwrite records that no event has touched
+    since the snapshot was requested, so a reconciliation never rolls back
+    a newer update.
+    """
+
+    def __init__(self, max_orders=None, max_fills=None):
+        self.max_orders = max_orders or Config.USER_STREAM_MAX_ORDERS
+        self.max_fills = max_fills or Config.USER_STREAM_MAX_FILLS
+        self._orders = {}  # symbol -> OrderedDict(orderId -> order), oldest first
+        self._open_orders = {}  # symbol -> {orderId: order}
+        self._fills = {}  # symbol -> deque of fills
+        self._account = {}
+        self._assets = {}  # asset -> asset dict in the /fapi/v2/account shape
+        self._positions = {}  # (symbol, positionSide) -> position dict
+        self._touched = {}  # record key -> local time (ms) of the last stream update, until reconciled
+        self.last_event_time = 0
+        self._lock = threading.Lock()
+
+    def _touch(self, key):
+        self._touched[key] = time.time() * 1000
+
+    def _is_newer_than(self, key, since_ms):
+        return self._touched.get(key, 0) >= since_ms
+
+    def prune_touched(self, before_ms):
+        """Forget stream updates older than a completed reconciliation fetched at before_ms"""
+        with self._lock:
+            self._touched = {key: touched for key, touched in self._touched.items() if touched >= before_ms}
+
+    def _store_order(self, order):
+        symbol = order['symbol']
+        orders = self._orders.setdefault(symbol, OrderedDict())
+        previous = orders.pop(order['orderId'], None)
+        if previous and 'time' in previous:
+            order.setdefault('time', previous['time'])
+        order.setdefault('time', order.get('updateTime'))
+        orders[order['orderId']] = order
+        while len(orders) > self.max_orders:
+            orders.popitem(last=False)
+
+        open_orders = self._open_orders.setdefault(symbol, {})
+        if order['status'] in OPEN_STATUSES:
+            open_orders[order['orderId']] = order
+        else:
+            open_orders.pop(order['orderId'], None)
+
+    def apply_order_update(self, event):
+        """Apply an ORDER_TRADE_UPDATE event and return the updated order"""
+        o = event['o']
+        order = _order_from_event(o)
+        with self._lock:
+            self._store_order(order)
+            self._touch(('order', o['s'], o['i']))
+            if o.get('x') == 'TRADE':
+                fills = self._fills.setdefault(o['s'], deque(maxlen=self.max_fills))
+                fills.append(_fill_from_event(o))
+            self.last_event_time = max(self.last_event_time, event.get('E', 0))
+        return dict(order)
+
+    def apply_account_update(self, event):
+        """Apply an ACCOUNT_UPDATE event (balance and position changes)"""
+        update = event['a']
+        with self._lock:
+            for balance in update.get('B', []):
+                asset = self._assets.setdefault(balance['a'], {'asset': balance['a']})
+                asset['walletBalance'] = balance['wb']
+                asset['crossWalletBalance'] = balance.get('cw', asset.get('crossWalletBalance'))
+                self._touch(('asset', balance['a']))
+            for p in update.get('P', []):
+                key = (p['s'], p.get('ps', 'BOTH'))
+                position = self._positions.setdefault(key, {'symbol': p['s'], 'positionSide': key[1]})
+                position['positionAmt'] = p['pa']
+                position['entryPrice'] = p['ep']
+                position['unrealizedProfit'] = p['up']
+                position['marginType'] = p.get('mt', position.get('marginType'))
+                position['isolatedWallet'] = p.get('iw', position.get('isolatedWallet'))
+                self._touch(('position', key))
+            self.last_event_time = max(self.last_event_time, event.get('E', 0))
+
+    def reconcile_orders(self, orders, since_ms, open_only=False):
+        """
+        Merge a REST order list fetched at since_ms
+
+        With open_only, open orders the snapshot no longer lists (and no
+        event touched since) are closed locally; their final state comes
+        with the next order history reconciliation.
+        """
+        with self._lock:
+            listed = set()
+            for order in orders:
+                key = ('order', order['symbol'], order['orderId'])
+                listed.add(key)
+                if not self._is_newer_than(key, since_ms):
+                    self._store_order(dict(order))
+            if open_only:
+                for symbol, open_orders in self._open_orders.items():
+                    for order_id in list(open_orders):
+                        key = ('order', symbol, order_id)
+                        if key not in listed and not self._is_newer_than(key, since_ms):
+                            del open_orders[order_id]
+
+    def reconcile_account(self, account, since_ms):
+        """Merge a REST /fapi/v2/account payload fetched at since_ms"""
+        with self._lock:
+            self._account = {k: v for k, v in account.items() if k not in ('assets', 'positions')}
+            for asset in account.get('assets', []):
+                if not self._is_newer_than(('asset', asset['asset']), since_ms):
+                    self._assets[asset['asset']] = dict(asset)
+            for position in account.get('positions', []):
+                key = (position['symbol'], position.get('positionSide', 'BOTH'))
+                if not self._is_newer_than(('position', key), since_ms):
+                    self._positions[key] = dict(position)
+
+    def get_open_orders(self, symbol=None):
+        """Return open orders of a symbol or all symbols"""
+        with self._lock:
+            if symbol:
+                return list(self._open_orders.get(symbol, {}).values())
+            return [order for orders in self._open_orders.values() for order in orders.values()]
+
+    def get_orders(self, symbol=None, limit=50):
+        """Return the most recent orders of a symbol or all symbols, newest first"""
+        with self._lock:
+            if symbol:
+                orders = list(self._orders.get(symbol, {}).values())
+            else:
+                orders = [order for orders in self._orders.values() for order in orders.values()]
+        orders.sort(key=lambda order: order.get('updateTime') or order.get('time') or 0, reverse=True)
+        return orders[:limit]
+
+    def get_fills(self, symbol=None, limit=50):
+        """Return the most recent fills of a symbol or all symbols, newest first"""
+        with self._lock:
+            if symbol:
+                fills = list(self._fills.get(symbol, []))
+            else:
+                fills = [fill for fills in self._fills.values() for fill in fills]
+        fills.sort(key=lambda fill: fill['time'], reverse=True)
+        return fills[:limit]
+
+    def get_symbols(self):
+        """Return the symbols with stored orders or an open position"""
+        with self._lock:
+            symbols = {symbol for symbol, orders in self._orders.items() if orders}
+            symbols.update(
+                symbol for (symbol, _), position in self._positions.items()
+                if float(position.get('positionAmt') or 0) != 0
+            )
+            return symbols
+
+    def get_positions(self, symbol=None):
+        """Return positions of a symbol or all symbols"""
+        with self._lock:
+            return [
+                dict(position) for (position_symbol, _), position in self._positions.items()
+                if symbol is None or position_symbol == symbol
+            ]
+
+    def get_account(self):
+        """Return account information in the /fapi/v2/account shape"""
+        with self._lock:
+            account = dict(self._account)
+            account['assets'] = [dict(asset) for asset in self._assets.values()]
+            account['positions'] = [dict(position) for position in self._positions.values()]
+            return account
+
+
+class UserDataStream(CombinedStream):
+    """
+    Listen-key user data stream feeding a UserDataStore
+
+    The listen key is subscribed on the combined stream connection and kept
+    alive every Config.USER_STREAM_KEEPALIVE_INTERVAL seconds; a key that
+    expired or was rejected is replaced and resubscribed. A maintenance
+    thread also reconciles the store from REST after every (re)connect and
+    every Config.USER_STREAM_RECONCILE_INTERVAL seconds to catch missed events.
+    """
+
+    name = 'user-data-stream'
+
+    def __init__(self, binance_client, store=None, url=None):
+        super().__init__([], url)
+        self.binance_client = binance_client
+        self.store = store or UserDataStore()
+        self.listen_key = None
+        self.reconciled_at = None
+        self._key_renewed_at = 0.0
+        self._synced = False
+        self._reconcile_needed = threading.Event()
+        self._maintenance_thread = None
+        self._key_lock = threading.Lock()
+        self.listeners = []  # callables notified with each order update (REST order shape)
+
+    def _ensure_listen_key(self):
+        with self._key_lock:
+            if self.listen_key is None:
+                self.listen_key = self.binance_client.create_listen_key()
+                self._key_renewed_at = time.monotonic()
+            return self.listen_key
+
+    def _streams_for(self, symbols):
+        return [self._ensure_listen_key()]
+
+    def start(self):
+        super().start()
+        if not self._maintenance_thread or not self._maintenance_thread.is_alive():
+            self._maintenance_thread = threading.Thread(
+                target=self._maintenance_loop, name='user-data-maintenance', daemon=True
+            )
+            self._maintenance_thread.start()
+
+    def stop(self):
+        super().stop()
+        if self.listen_key:
+            try:
+                self.binance_client.close_listen_key()
+            except Exception as e:
+                logger.warning(f"Failed to close listen key: {str(e)}")
+
+    def is_ready(self):
+        """True while connected and reconciled since the last (re)connect"""
+        return self.is_connected() and self._synced
+
+    def _on_connected(self):
+        # Events were lost while disconnected
+        self._synced = False
+        self._reconcile_needed.set()
+
+    def _handle_event(self, stream, event):
+        event_type = event.get('e')
+        if event_type == 'ORDER_TRADE_UPDATE':
+            order = self.store.apply_order_update(event)
+            for listener in self.listeners:
+                try:
+                    listener(order)
+                except Exception as e:
+                    logger.error(f"User data stream listener failed: {str(e)}")
+        elif event_type == 'ACCOUNT_UPDATE':
+            self.store.apply_account_update(event)
+        elif event_type == 'listenKeyExpired':
+            logger.warning("Listen key expired, subscribing a new one")
+            self._renew_listen_key()
+
+    def _renew_listen_key(self):
+        """Replace the listen key and subscribe the new one on the live connection"""
+        with self._key_lock:
+            self.listen_key = None
+        key = self._ensure_listen_key()
+        if self.is_connected():
+            self._subscribe([key])
+            self._reconcile_needed.set()
+
+    def _keepalive(self):
+        try:
+            self.binance_client.keepalive_listen_key()
+            self._key_renewed_at = time.monotonic()
+        except Exception as e:
+            logger.warning(f"Listen key keepalive failed, renewing: {str(e)}")
+            self._renew_listen_key()
+
+    def reconcile(self):
+        """
+        Refresh the store from REST: account, open orders and recent order history
+
+        allOrders only answers for one symbol, so history is fetched for the
+        supported symbols and every symbol the store holds orders or a
+        position of.
+        """
+        since_ms = time.time() * 1000
+        self._reconcile_needed.clear()
+        try:
+            self.store.reconcile_account(self.binance_client.get_account_info(), since_ms)
+            self.store.reconcile_orders(self.binance_client.get_open_orders(), since_ms, open_only=True)
+            for symbol in sorted(set(Config.SUPPORTED_SYMBOLS) | self.store.get_symbols()):
+                self.store.reconcile_orders(
+                    self.binance_client.get_order_history(symbol=symbol, limit=Config.USER_STREAM_MAX_ORDERS),
+                    since_ms,
+                )
+            self.store.prune_touched(since_ms)
+            self.reconciled_at = time.time()
+            self._synced = True
+            logger.info("User data store reconciled from REST")
+        except Exception:
+            self._reconcile_needed.set()
+            raise
+
+    def _maintenance_loop(self):
+        """Keep the listen key alive and reconcile periodically and after reconnects"""
+        next_reconcile = 0.0
+        while not self._stop.is_set():
+            now = time.monotonic()
+            try:
+                if self.listen_key and now - self._key_renewed_at >= Config.USER_STREAM_KEEPALIVE_INTERVAL:
+                    self._keepalive()
+                if self.is_connected() and (self._reconcile_needed.is_set() or now >= next_reconcile):
+                    self.reconcile()
+                    next_reconcile = now + Config.USER_STREAM_RECONCILE_INTERVAL
+            except Exception as e:
+                logger.error(f"User data stream maintenance failed: {str(e)}")
+                self._stop.wait(5)
+                continue
+            self._stop.wait(1)
+
+    def get_stats(self):
+        """Return connection, reconciliation and store size information"""
+        return {
+            'connected': self.is_connected(),
+            'ready': self.is_ready(),
+            'reconnects': self.reconnects,
+            'reconciled_at': self.reconciled_at,
+            'last_event_time': self.store.last_event_time,
+            'open_orders': len(self.store.get_open_orders()),
+        }
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """A load in progress that concurrent callers for the same key wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Thread-safe TTL cache with LRU eviction and single-flight loading
+
+    Keys are tuples whose first element names the endpoint (namespace), e.g.
+    ('market-data', 'BTCUSDT'). Concurrent misses on the same key share one
+    loader call; everyone else waits for its result.
+    """
+
+    def __init__(self, max_entries=1000, default_ttl=5):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (value, stored_at, expires_at)
+        self._inflight = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._evictions = 0
+
+    def _namespace_stats(self, key):
+        """Return the counters of the key's namespace, creating them if needed"""
+        namespace = key[0] if isinstance(key, tuple) else key
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0, 'hit_age_total': 0.0}
+            self._stats[namespace] = stats
+        return stats
+
+    def get_or_load(self, key, loader, ttl=None):
+        """Return the cached value for key, calling loader() once on a miss"""
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.monotonic()
+
+        with self._lock:
+            stats = self._namespace_stats(key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at, expires_at = entry
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    stats['hits'] += 1
+                    stats['hit_age_total'] += now - stored_at
+                    return value
+                del self._entries[key]
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                stats['coalesced'] += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._inflight[key] = flight
+                stats['misses'] += 1
+                generation = self._generation
+                leader = True
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                # A load that raced with an invalidation may hold stale data,
+                # hand it to the waiters but don't keep it
+                if flight.error is None and generation == self._generation and ttl > 0:
+                    stored_at = time.monotonic()
+                    self._entries[key] = (flight.value, stored_at, stored_at + ttl)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self._evictions += 1
+            flight.event.set()
+
+        return flight.value
+
+    def invalidate(self, *namespaces):
+        """Drop cached entries of the given namespaces, or everything if none are given"""
+        with self._lock:
+            self._generation += 1
+            if not namespaces:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                namespace = key[0] if isinstance(key, tuple) else key
+                if namespace in namespaces:
+                    del self._entries[key]
+
+    def get_stats(self):
+        """Return hit/miss counters and entry ages per namespace"""
+        now = time.monotonic()
+        with self._lock:
+            ages = {}
+            for key, (_, stored_at, _) in self._entries.items():
+                namespace = key[0] if isinstance(key, tuple) else key
+                ages.setdefault(namespace, []).append(now - stored_at)
+
+            namespaces = {}
+            for namespace, stats in self._stats.items():
+                lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+                entry_ages = ages.get(namespace, [])
+                namespaces[namespace] = {
+                    'hits': stats['hits'],
+                    'misses': stats['misses'],
+                    'coalesced': stats['coalesced'],
+                    'errors': stats['errors'],
+                    'hit_rate': (stats['hits'] + stats['coalesced']) / lookups if lookups else 0.0,
+                    'avg_hit_age': stats['hit_age_total'] / stats['hits'] if stats['hits'] else 0.0,
+                    'entries': len(entry_ages),
+                    'max_entry_age': max(entry_ages) if entry_ages else 0.0,
+                }
+
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'evictions': self._evictions,
+                'namespaces': namespaces,
+            }
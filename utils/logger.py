@@ -1,34 +1,149 @@
+import atexit
+import itertools
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from config import Config
 
-def setup_logger():
-    """Configure and return a logger instance"""
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any extra= fields"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread as they are
+
+    Messages are neither formatted nor copied on the logging thread, and a
+    record that does not fit in the bounded queue is dropped and counted
+    instead of blocking the caller.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def get_stats(self):
+        """Return queued and dropped record counts"""
+        return {'queued': self.queue.qsize(), 'capacity': self.queue.maxsize, 'dropped': self.dropped}
+
+
+class RequestLog:
+    """
+    Structured log of upstream REST calls
+
+    Failures are always logged at WARNING. Successful calls are logged at
+    INFO once every `sample_every` calls and at DEBUG otherwise, each with
+    endpoint, status, latency and weight fields.
+    """
+
+    def __init__(self, logger, sample_every=None):
+        self.logger = logger
+        self.sample_every = sample_every or Config.LOG_REQUEST_SAMPLE_EVERY
+        self._counter = itertools.count()
+
+    def record(self, method, endpoint, status, latency_ms, weight):
+        if status >= 400:
+            level = logging.WARNING
+        elif next(self._counter) % self.sample_every == 0:
+            level = logging.INFO
+        else:
+            level = logging.DEBUG
+        if not self.logger.isEnabledFor(level):
+            return
+        self.logger.log(
+            level, "%s %s -> %s in %.1f ms", method, endpoint, status, latency_ms,
+            extra={
+                'method': method, 'endpoint': endpoint, 'status': status,
+                'latency_ms': round(latency_ms, 2), 'weight': weight,
+                'sample_every': self.sample_every if level == logging.INFO else 1,
+            },
+        )
+
+
+def _start_writer(queue_handler, handlers):
+    listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    queue_handler.listener = listener
+
+
+def _restart_writer_after_fork(queue_handler, handlers):
+    """The writer thread does not survive fork() (gunicorn --preload), so the child starts its own on a fresh queue"""
+    queue_handler.queue = queue.Queue(maxsize=queue_handler.queue.maxsize)
+    _start_writer(queue_handler, handlers)
+
+
+def setup_logger(name='trading_bot', log_file=None, console=None):
+    """
+    Configure and return a logger instance
+
+    Records go through a bounded queue to a background writer thread that
+    formats them and writes to the rotating log file (and the console).
+    Each forked process (e.g. a gunicorn worker under --preload) gets its
+    own writer thread.
+    """
     # Create logger
-    logger = logging.getLogger('trading_bot')
+    logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, Config.LOG_LEVEL))
-    
+
     # Create formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    
+    if Config.LOG_FORMAT == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
     # File handler
     file_handler = RotatingFileHandler(
-        Config.LOG_FILE,
+        log_file or Config.LOG_FILE,
         maxBytes=10485760,  # 10MB
         backupCount=5
     )
     file_handler.setFormatter(formatter)
-    
+    handlers = [file_handler]
+
     # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+    if Config.LOG_CONSOLE if console is None else console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    # Writer thread behind a non-blocking queue, restarted in forked children; flushed on exit
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=Config.LOG_QUEUE_SIZE))
+    _start_writer(queue_handler, handlers)
+    os.register_at_fork(after_in_child=lambda: _restart_writer_after_fork(queue_handler, handlers))
+    atexit.register(lambda: queue_handler.listener.stop())
+
+    logger.addHandler(queue_handler)
+
     return logger
 
 # Create the logger instance to be imported by other modules
-logger = setup_logger()
\ No newline at end of file
+logger = setup_logger()
+request_log = RequestLog(logger)
@@ -0,0 +1,247 @@
+import cProfile
+import io
+import itertools
+import pstats
+import threading
+import time
+from bisect import bisect_left
+
+from config import Config
+
+# Upper bounds in seconds; +Inf is implicit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in itertools.chain(zip(names, values), extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+                for labels, value in sorted(values.items())]
+
+
+class Histogram:
+    """
+    Bucketed distribution per label combination
+
+    observe() only bumps one bucket, the sum and the count; cumulative
+    bucket counts are built when the registry is scraped.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, *labels):
+        """Context manager observing the duration of its block when it completes without error"""
+        return _Timer(self, labels)
+
+    def collect(self):
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        lines = []
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Gauge:
+    """
+    Values read from a callback at scrape time
+
+    The callback returns {label values tuple: value}, so state that already
+    lives elsewhere (cache counters, job progress) costs nothing until scraped.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labelnames=(), callback=None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def collect(self):
+        values = self.callback() if self.callback else {}
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+                for labels, value in sorted(values.items()) if value is not None]
+
+
+class Registry:
+    """Named metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name, help_text, labelnames=(), callback=None):
+        """Register (or replace the callback of) a callback gauge"""
+        gauge = self.register(Gauge(name, help_text, labelnames))
+        gauge.callback = callback
+        return gauge
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.collect()
+            except Exception as e:
+                samples = [f"# {metric.name} collection failed: {_escape(e)}"]
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+class RequestProfiler:
+    """
+    Optional cProfile hook for request handlers, switched on at runtime
+
+    While enabled, one in every `sample_every` requests is profiled (only
+    one at a time; requests arriving meanwhile run unprofiled) and the
+    stats accumulate until reset.
+    """
+
+    def __init__(self, sample_every=None):
+        self.enabled = False
+        self.sample_every = sample_every or Config.PROFILING_SAMPLE_EVERY
+        self.profiled = 0
+        self._counter = itertools.count()
+        self._active = threading.Lock()
+        self._stats = None
+        self._stats_lock = threading.Lock()
+
+    def configure(self, enabled=None, sample_every=None, reset=False):
+        if sample_every:
+            self.sample_every = int(sample_every)
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        if reset:
+            with self._stats_lock:
+                self._stats = None
+                self.profiled = 0
+
+    def start(self):
+        """Return a running profile for this request, or None when it is not sampled"""
+        if not self.enabled or next(self._counter) % self.sample_every:
+            return None
+        if not self._active.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active in this interpreter
+            self._active.release()
+            return None
+        return profile
+
+    def stop(self, profile):
+        profile.disable()
+        self._active.release()
+        with self._stats_lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.profiled += 1
+
+    def report(self, limit=30, sort='cumulative'):
+        """Top functions of the accumulated profile as pstats text"""
+        with self._stats_lock:
+            if self._stats is None:
+                return ''
+            out = io.StringIO()
+            self._stats.stream = out
+            self._stats.sort_stats(sort).print_stats(limit)
+            return out.getvalue()
+
+    def get_stats(self):
+        return {'enabled': self.enabled, 'sample_every': self.sample_every, 'profiled': self.profiled}
+
+
+registry = Registry()
+profiler = RequestProfiler()
+
+# Metrics recorded by the REST clients
+UPSTREAM_LATENCY = registry.histogram(
+    'binance_request_duration_seconds', 'Upstream REST call latency', ('method', 'endpoint'),
+)
+UPSTREAM_ERRORS = registry.counter(
+    'binance_request_errors_total', 'Upstream REST calls that failed, by HTTP status (0 for no response)',
+    ('method', 'endpoint', 'status'),
+)
+ORDER_ACK_LATENCY = registry.histogram(
+    'binance_order_ack_seconds', 'Order submission to exchange acknowledgement, including validation and rate limit wait',
+    ('type',),
+)
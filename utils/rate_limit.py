@@ -0,0 +1,270 @@
+import asyncio
+import json
+import threading
+import time
+
+from config import Config
+from utils.logger import logger
+
+HIGH = 'high'
+LOW = 'low'
+
+# Request weight of the endpoints BinanceClient calls; anything else costs 1
+_ENDPOINT_WEIGHTS = {
+    ('GET', '/fapi/v2/account'): 5,
+    ('GET', '/fapi/v1/allOrders'): 5,
+    ('GET', '/fapi/v2/positionRisk'): 5,
+    ('GET', '/fapi/v1/aggTrades'): 20,
+    ('POST', '/fapi/v1/order'): 0,
+    ('POST', '/fapi/v1/batchOrders'): 5,
+    ('PUT', '/fapi/v1/batchOrders'): 5,
+}
+
+# Endpoints whose weight jumps when they are called for every symbol at once
+_ALL_SYMBOLS_WEIGHTS = {
+    '/fapi/v1/ticker/24hr': 40,
+    '/fapi/v1/ticker/price': 2,
+    '/fapi/v1/openOrders': 40,
+}
+
+# Batch endpoints count every order of the batch
+_ORDER_COUNTS = {
+    ('POST', '/fapi/v1/order'): 1,
+}
+_BATCH_ENDPOINTS = {('POST', '/fapi/v1/batchOrders'), ('PUT', '/fapi/v1/batchOrders')}
+
+
+def request_cost(method, endpoint, params=None):
+    """Return the (request weight, order count) a call is charged by the exchange"""
+    params = params or {}
+    if endpoint in _ALL_SYMBOLS_WEIGHTS and 'symbol' not in params:
+        weight = _ALL_SYMBOLS_WEIGHTS[endpoint]
+    elif endpoint == '/fapi/v1/depth':
+        limit = int(params.get('limit', 500))
+        weight = 2 if limit <= 50 else 5 if limit <= 100 else 10 if limit <= 500 else 20
+    elif endpoint == '/fapi/v1/klines':
+        limit = int(params.get('limit', 500))
+        weight = 1 if limit < 100 else 2 if limit < 500 else 5 if limit <= 1000 else 10
+    else:
+        weight = _ENDPOINT_WEIGHTS.get((method, endpoint), 1)
+    if (method, endpoint) in _BATCH_ENDPOINTS:
+        batch = params.get('batchOrders') or '[]'
+        order_count = len(json.loads(batch) if isinstance(batch, str) else batch)
+    else:
+        order_count = _ORDER_COUNTS.get((method, endpoint), 0)
+    return weight, order_count
+
+
+class RateLimitExceeded(Exception):
+    """A request was shed because the rate limit budget would not allow it in time"""
+
+
+class TokenBucket:
+    """Budget of `capacity` units refilled evenly over `interval` seconds"""
+
+    def __init__(self, capacity, interval):
+        self.capacity = capacity
+        self.interval = interval
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / self.interval)
+            self._updated = now
+
+    def time_until(self, amount, now, reserve=0):
+        """Seconds until `amount` tokens can be taken without dipping into `reserve`"""
+        self._refill(now)
+        missing = amount + reserve - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing * self.interval / self.capacity
+
+    def consume(self, amount, now):
+        self._refill(now)
+        self.tokens -= amount
+
+    def calibrate(self, used, now):
+        """Never assume more budget than the exchange reports as unused"""
+        self._refill(now)
+        self.tokens = min(self.tokens, self.capacity - used)
+
+    def to_dict(self):
+        return {
+            'capacity': self.capacity,
+            'interval_secs': self.interval,
+            'available': max(self.tokens, 0.0),
+        }
+
+
+class RateLimiter:
+    """
+    Client-side governor for the exchange's request weight and order count limits
+
+    Every call takes its cost from token buckets mirroring the exchange limits
+    before it is sent, and the used weight / order count headers of each
+    response pull the buckets down to what the exchange has actually counted.
+    High priority (order) traffic may spend the whole budget and goes first;
+    low priority reads leave a reserve for orders, wait at most
+    Config.RATE_LIMIT_MAX_WAIT['low'] seconds and are shed after that.
+    A 429/418 response blocks all traffic until its Retry-After has passed.
+    """
+
+    def __init__(self, weight_limits=None, order_limits=None, low_priority_reserve=None, max_wait=None):
+        # Buckets are keyed by the interval label used in the response headers, e.g. '1m'
+        self.weight_buckets = {
+            label: TokenBucket(capacity, interval)
+            for label, (capacity, interval) in (weight_limits or Config.RATE_LIMIT_WEIGHT).items()
+        }
+        self.order_buckets = {
+            label: TokenBucket(capacity, interval)
+            for label, (capacity, interval) in (order_limits or Config.RATE_LIMIT_ORDERS).items()
+        }
+        self.low_priority_reserve = (
+            Config.RATE_LIMIT_LOW_PRIORITY_RESERVE if low_priority_reserve is None else low_priority_reserve
+        )
+        self.max_wait = max_wait or Config.RATE_LIMIT_MAX_WAIT
+        self.blocked_until = 0.0
+        self._high_waiting = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            HIGH: {'sent': 0, 'queued': 0, 'shed': 0, 'wait_total': 0.0},
+            LOW: {'sent': 0, 'queued': 0, 'shed': 0, 'wait_total': 0.0},
+        }
+        self._rejections = 0
+
+    def _wait_time(self, weight, orders, priority, now):
+        """Seconds until the buckets (and any ban) allow this request"""
+        wait = max(self.blocked_until - now, 0.0)
+        for bucket in self.weight_buckets.values():
+            reserve = bucket.capacity * self.low_priority_reserve if priority == LOW else 0
+            wait = max(wait, bucket.time_until(weight, now, reserve))
+        if orders:
+            for bucket in self.order_buckets.values():
+                wait = max(wait, bucket.time_until(orders, now))
+        return wait
+
+    def _try_acquire(self, weight, orders, priority, start, deadline):
+        """Take the budget and return 0, or return the seconds to wait; call with the lock held"""
+        now = time.monotonic()
+        wait = self._wait_time(weight, orders, priority, now)
+        # Reads also hold back while orders are queued for the budget
+        if priority == LOW and self._high_waiting:
+            wait = max(wait, 0.05)
+        if wait > 0:
+            if now + wait > deadline:
+                self._stats[priority]['shed'] += 1
+                raise RateLimitExceeded(
+                    f"Rate limit budget exhausted, {priority} priority request shed "
+                    f"(would wait {wait:.2f}s)"
+                )
+            return wait
+
+        for bucket in self.weight_buckets.values():
+            bucket.consume(weight, now)
+        if orders:
+            for bucket in self.order_buckets.values():
+                bucket.consume(orders, now)
+        self._stats[priority]['sent'] += 1
+        self._stats[priority]['wait_total'] += now - start
+        return 0
+
+    def acquire(self, weight, orders=0, priority=LOW):
+        """Block until the request may be sent; raise RateLimitExceeded if it is shed"""
+        start = time.monotonic()
+        deadline = start + self.max_wait[priority]
+        queued = False
+
+        with self._cond:
+            if priority == HIGH:
+                self._high_waiting += 1
+            try:
+                while True:
+                    wait = self._try_acquire(weight, orders, priority, start, deadline)
+                    if not wait:
+                        return
+                    if not queued:
+                        queued = True
+                        self._stats[priority]['queued'] += 1
+                    self._cond.wait(wait)
+            finally:
+                if priority == HIGH:
+                    self._high_waiting -= 1
+                    self._cond.notify_all()
+
+    async def acquire_async(self, weight, orders=0, priority=LOW):
+        """Like acquire(), but waits with asyncio.sleep instead of blocking the thread"""
+        start = time.monotonic()
+        deadline = start + self.max_wait[priority]
+        queued = False
+
+        with self._cond:
+            if priority == HIGH:
+                self._high_waiting += 1
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_acquire(weight, orders, priority, start, deadline)
+                    if wait and not queued:
+                        queued = True
+                        self._stats[priority]['queued'] += 1
+                if not wait:
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            if priority == HIGH:
+                with self._cond:
+                    self._high_waiting -= 1
+                    self._cond.notify_all()
+
+    def update_from_response(self, status_code, headers):
+        """Calibrate the buckets from the used weight / order count headers of a response"""
+        now = time.monotonic()
+        with self._cond:
+            for name, value in headers.items():
+                name = name.lower()
+                if name.startswith('x-mbx-used-weight-'):
+                    bucket = self.weight_buckets.get(name[len('x-mbx-used-weight-'):])
+                elif name.startswith('x-mbx-order-count-'):
+                    bucket = self.order_buckets.get(name[len('x-mbx-order-count-'):])
+                else:
+                    continue
+                if bucket is not None:
+                    try:
+                        bucket.calibrate(int(value), now)
+                    except ValueError:
+                        continue
+
+            if status_code in (418, 429):
+                self._rejections += 1
+                try:
+                    retry_after = float(headers.get('Retry-After', 60))
+                except ValueError:
+                    retry_after = 60.0
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                logger.warning(f"Rate limit hit ({status_code}), pausing requests for {retry_after:.0f}s")
+            self._cond.notify_all()
+
+    def get_stats(self):
+        """Return the remaining budget per bucket and per-priority sent/queued/shed counters"""
+        now = time.monotonic()
+        with self._cond:
+            for bucket in list(self.weight_buckets.values()) + list(self.order_buckets.values()):
+                bucket._refill(now)
+            priorities = {}
+            for priority, stats in self._stats.items():
+                priorities[priority] = {
+                    'sent': stats['sent'],
+                    'queued': stats['queued'],
+                    'shed': stats['shed'],
+                    'avg_wait_ms': stats['wait_total'] / stats['sent'] * 1000 if stats['sent'] else 0.0,
+                }
+            return {
+                'weight': {label: bucket.to_dict() for label, bucket in self.weight_buckets.items()},
+                'orders': {label: bucket.to_dict() for label, bucket in self.order_buckets.items()},
+                'blocked_for_secs': max(self.blocked_until - now, 0.0),
+                'rejections': self._rejections,
+                'priorities': priorities,
+            }
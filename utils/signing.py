@@ -0,0 +1,100 @@
+import hashlib
+import hmac
+import threading
+import time
+
+from config import Config
+from utils.logger import logger
+
+
+class RequestSigner:
+    """HMAC-SHA256 request signer keyed once and copied per request"""
+
+    def __init__(self, api_secret):
+        self._keyed = hmac.new(api_secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+    def sign(self, query_string):
+        """Return the hex signature of a query string"""
+        mac = self._keyed.copy()
+        mac.update(query_string.encode('utf-8'))
+        return mac.hexdigest()
+
+
+class ServerClock:
+    """
+    Drift-corrected exchange timestamps from a periodically estimated clock offset
+
+    Each sync takes several server time samples and keeps the one with the
+    lowest round trip, assuming the server read its clock at the midpoint of
+    that round trip. Timestamps are then local time plus the offset, with no
+    extra request on the signing path.
+    """
+
+    def __init__(self, fetch_server_time, samples=None, resync_interval=None):
+        self.fetch_server_time = fetch_server_time
+        self.samples = samples or Config.CLOCK_SYNC_SAMPLES
+        self.resync_interval = resync_interval or Config.CLOCK_SYNC_INTERVAL
+        self.offset_ms = 0.0
+        self.rtt_ms = None
+        self.synced_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def timestamp(self):
+        """Return the estimated current exchange time in milliseconds"""
+        return int(time.time() * 1000 + self.offset_ms)
+
+    def sync(self):
+        """Re-estimate the offset; returns it in milliseconds"""
+        samples = []
+        for _ in range(self.samples):
+            sent = time.time()
+            server_ms = self.fetch_server_time()
+            samples.append((sent, server_ms, time.time()))
+        return self.update(samples)
+
+    def update(self, samples):
+        """Set the offset from (sent, server time ms, received) samples, keeping the lowest round trip"""
+        sent, server_ms, received = min(samples, key=lambda sample: sample[2] - sample[0])
+        with self._lock:
+            self.rtt_ms = (received - sent) * 1000
+            self.offset_ms = server_ms - (sent + received) / 2 * 1000
+            self.synced_at = time.time()
+        logger.info(f"Server clock offset {self.offset_ms:.1f} ms (rtt {self.rtt_ms:.1f} ms)")
+        return self.offset_ms
+
+    def start(self):
+        """Sync every resync_interval seconds in a daemon thread, starting now unless already synced"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='server-clock', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background resync thread"""
+        self._stop.set()
+
+    def _run(self):
+        # A clock synced before start() (e.g. during warm-up) is not resynced right away
+        if self.synced_at and self._stop.wait(max(self.synced_at + self.resync_interval - time.time(), 0)):
+            return
+        while not self._stop.is_set():
+            try:
+                self.sync()
+                wait = self.resync_interval
+            except Exception as e:
+                logger.error(f"Failed to sync server clock: {str(e)}")
+                wait = min(self.resync_interval, 30)
+            if self._stop.wait(wait):
+                return
+
+    def get_stats(self):
+        """Return the current offset, round trip and last sync time"""
+        with self._lock:
+            return {
+                'offset_ms': self.offset_ms,
+                'rtt_ms': self.rtt_ms,
+                'synced_at': self.synced_at,
+            }
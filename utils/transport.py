@@ -0,0 +1,197 @@
+import socket
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from config import Config
+from utils.logger import logger
+
+# Per-thread scratch space the connection classes write their phase timings into
+_phase_timings = threading.local()
+
+
+def _record_phase(name, seconds):
+    """Add a connection phase duration to the current thread's timing record"""
+    setattr(_phase_timings, name, getattr(_phase_timings, name, 0.0) + seconds)
+
+
+class _TimedConnectionMixin:
+    """Measure DNS, TCP connect and TLS handshake time of new connections"""
+
+    def _new_conn(self):
+        # Resolve up front so DNS time can be separated from the TCP connect.
+        # Only the socket target is swapped; Host header and SNI keep self.host.
+        start = time.perf_counter()
+        address = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        resolved = time.perf_counter()
+        _record_phase('dns', resolved - start)
+
+        dns_host = self._dns_host
+        self._dns_host = address
+        try:
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+        _record_phase('connect', time.perf_counter() - resolved)
+        self._new_conn_secs = time.perf_counter() - start
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        # Whatever connect() spent outside _new_conn() is the TLS handshake
+        elapsed = time.perf_counter() - start
+        if isinstance(self, HTTPSConnection):
+            _record_phase('tls', max(elapsed - getattr(self, '_new_conn_secs', 0.0), 0.0))
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools hand out timing-aware connections"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+class HttpTransport:
+    """
+    Persistent, pooled HTTP session used for all Binance REST traffic
+
+    Keeps TCP/TLS connections alive between calls, retries connection failures
+    and idempotent reads with exponential backoff, applies connect/read
+    timeouts and records per-request phase timings.
+    """
+
+    def __init__(self, pool_size=None, max_retries=None, backoff_factor=None,
+                 connect_timeout=None, read_timeout=None, timing_history=None):
+        self.pool_size = pool_size or Config.HTTP_POOL_SIZE
+        self.max_retries = Config.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_factor = Config.HTTP_BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+        self.timeout = (
+            connect_timeout or Config.HTTP_CONNECT_TIMEOUT,
+            read_timeout or Config.HTTP_READ_TIMEOUT,
+        )
+        self._timings = deque(maxlen=timing_history or Config.HTTP_TIMING_HISTORY)
+        self._lock = threading.Lock()
+        self.session = self._build_session()
+
+    def _build_session(self):
+        """Create a requests session with a pooled, retrying adapter"""
+        # Orders must never be resent after the request reached the exchange,
+        # so read/status retries only apply to GET; connect errors are always
+        # safe to retry because nothing was sent. A 429/418 is never retried here:
+        # it goes back to the RateLimiter, which pauses all traffic for its Retry-After.
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False,
+            respect_retry_after_header=False,
+        )
+        adapter = _TimedHTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def request(self, method, url, params=None, data=None, headers=None):
+        """Send a request over the pooled session and record its timing"""
+        _phase_timings.__dict__.clear()
+        start = time.perf_counter()
+        response = self.session.request(
+            method,
+            url,
+            params=params,
+            data=data,
+            headers=headers,
+            timeout=self.timeout,
+        )
+        total = time.perf_counter() - start
+
+        dns = getattr(_phase_timings, 'dns', 0.0)
+        connect = getattr(_phase_timings, 'connect', 0.0)
+        tls = getattr(_phase_timings, 'tls', 0.0)
+        timing = {
+            'method': method,
+            'url': url.split('?', 1)[0],
+            'status': response.status_code,
+            'reused': dns == 0.0 and connect == 0.0,
+            'dns_ms': dns * 1000,
+            'connect_ms': connect * 1000,
+            'tls_ms': tls * 1000,
+            'first_byte_ms': response.elapsed.total_seconds() * 1000,
+            'total_ms': total * 1000,
+        }
+        response.timing = timing
+        with self._lock:
+            self._timings.append(timing)
+
+        logger.debug(
+            "%s %s took %.1f ms (dns %.1f, connect %.1f, tls %.1f, first byte %.1f, reused=%s)",
+            method, timing['url'], timing['total_ms'], timing['dns_ms'], timing['connect_ms'],
+            timing['tls_ms'], timing['first_byte_ms'], timing['reused'],
+        )
+        return response
+
+    def get_timings(self):
+        """Return the most recent per-request timing records"""
+        with self._lock:
+            return list(self._timings)
+
+    def get_timing_summary(self):
+        """Summarize recorded timings, split by new vs reused connections"""
+        timings = self.get_timings()
+        summary = {'requests': len(timings)}
+        for label, group in (
+            ('new_connections', [t for t in timings if not t['reused']]),
+            ('reused_connections', [t for t in timings if t['reused']]),
+        ):
+            if not group:
+                summary[label] = {'count': 0}
+                continue
+            summary[label] = {
+                'count': len(group),
+                'avg_total_ms': sum(t['total_ms'] for t in group) / len(group),
+                'avg_first_byte_ms': sum(t['first_byte_ms'] for t in group) / len(group),
+                'avg_dns_ms': sum(t['dns_ms'] for t in group) / len(group),
+                'avg_connect_ms': sum(t['connect_ms'] for t in group) / len(group),
+                'avg_tls_ms': sum(t['tls_ms'] for t in group) / len(group),
+            }
+        return summary
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
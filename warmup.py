@@ -0,0 +1,94 @@
+import threading
+import time
+
+from config import Config
+from utils.logger import logger
+
+
+class Warmup:
+    """
+    Background startup tasks that gate readiness, not import
+
+    Steps run in order in a daemon thread. A failing step is retried every
+    Config.WARMUP_RETRY_INTERVAL seconds until it succeeds, so a worker
+    started while the exchange is slow or down boots at once and becomes
+    ready when the exchange comes back. Only required steps gate is_ready().
+    """
+
+    def __init__(self, retry_interval=None):
+        self.retry_interval = retry_interval or Config.WARMUP_RETRY_INTERVAL
+        self.started_at = None
+        self.ready_at = None
+        self._steps = []
+        self._status = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_step(self, name, func, required=True):
+        """Register a step; steps run in the order they were added"""
+        self._steps.append((name, func, required))
+        self._status[name] = {
+            'state': 'pending', 'required': required, 'attempts': 0, 'duration_ms': None, 'error': None,
+        }
+
+    def start(self):
+        """Run the steps in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        for name, func, required in self._steps:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                try:
+                    func()
+                except Exception as e:
+                    self._record(name, 'failed', start, str(e))
+                    if not required:
+                        logger.warning(f"Optional warm-up step {name} failed: {str(e)}")
+                        break
+                    logger.warning(f"Warm-up step {name} failed, retrying in {self.retry_interval}s: {str(e)}")
+                    self._stop.wait(self.retry_interval)
+                    continue
+                self._record(name, 'ok', start)
+                break
+        self.ready_at = time.time()
+        self._done.set()
+        logger.info(f"Warm-up finished in {self.ready_at - self.started_at:.2f}s")
+
+    def _record(self, name, state, start, error=None):
+        with self._lock:
+            status = self._status[name]
+            status['state'] = state
+            status['attempts'] += 1
+            status['duration_ms'] = (time.perf_counter() - start) * 1000
+            status['error'] = error
+
+    def is_ready(self):
+        """True once every required step has succeeded"""
+        with self._lock:
+            return all(status['state'] == 'ok' for status in self._status.values() if status['required'])
+
+    def wait(self, timeout=None):
+        """Block until all steps have run; returns is_ready()"""
+        self._done.wait(timeout)
+        return self.is_ready()
+
+    def get_status(self):
+        """Return readiness and per-step state, attempts, duration and last error"""
+        with self._lock:
+            steps = {name: dict(status) for name, status in self._status.items()}
+        return {
+            'ready': self.is_ready(),
+            'started_at': self.started_at,
+            'ready_at': self.ready_at,
+            'steps': steps,
+        }